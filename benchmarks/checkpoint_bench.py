@@ -0,0 +1,273 @@
+"""checkpoint_bench.py -- Checkpoint throughput on synthetic long campaigns.
+
+Builds a synthetic session per timeline size (characters with sheets, regions,
+NPC memories, a long timeline and journal), plays N turns on top of it and
+times every checkpoint operation. Results are written as JSON so runs can be
+diffed before/after a checkpoint change.
+
+With LOREKIT_ASYNC_CHECKPOINTS=1 the per-turn timing is create_checkpoint_async
+(capture and enqueue, what turn_save waits for); the time to drain the
+background writer afterwards is reported as flush_checkpoints.
+
+Usage:
+    uv run python benchmarks/checkpoint_bench.py
+    uv run python benchmarks/checkpoint_bench.py --timeline 1000,10000,50000 --turns 2000 --output bench_output.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from lorekit.db import get_db, init_schema
+from lorekit.support import checkpoint
+
+WORDS = (
+    "ancient temple storm river blade oath tavern shadow crown market forest ruin "
+    "dragon whisper lantern harbor merchant siege spell relic bridge wolf ember"
+).split()
+
+
+def _sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _stats(samples):
+    """Summarize a list of durations (seconds) in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _sizes(db, session_id):
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    cp_bytes = db.execute(
+        "SELECT COALESCE(SUM(LENGTH(snapshot)), 0) FROM checkpoints WHERE session_id = ?", (session_id,)
+    ).fetchone()[0]
+    return page_count * page_size, cp_bytes
+
+
+def build_session(db, rng, timeline, characters, memories):
+    """Populate a fresh session with synthetic campaign data. Returns (session_id, npc_ids, char_ids)."""
+    sid = db.execute(
+        "INSERT INTO sessions (name, setting, system_type) VALUES ('Bench', 'Synthetic realm', 'pf2e')"
+    ).lastrowid
+    db.execute(
+        "INSERT INTO session_meta (session_id, key, value) VALUES (?, 'narrative_time', '1000-01-01T08:00')", (sid,)
+    )
+    region_ids = [
+        db.execute("INSERT INTO regions (session_id, name) VALUES (?, ?)", (sid, f"Region {i}")).lastrowid
+        for i in range(20)
+    ]
+
+    char_ids = []
+    for i in range(characters):
+        ctype = "pc" if i < 4 else "npc"
+        cid = db.execute(
+            "INSERT INTO characters (session_id, name, type, level, region_id) VALUES (?, ?, ?, ?, ?)",
+            (sid, f"Character {i}", ctype, rng.randint(1, 20), rng.choice(region_ids)),
+        ).lastrowid
+        char_ids.append(cid)
+        db.executemany(
+            "INSERT INTO character_attributes (character_id, category, key, value) VALUES (?, ?, ?, ?)",
+            [(cid, "stat", f"attr_{k}", str(rng.randint(1, 30))) for k in range(12)],
+        )
+        db.executemany(
+            "INSERT INTO character_inventory (character_id, name, description) VALUES (?, ?, ?)",
+            [(cid, f"Item {k}", _sentence(rng, 6)) for k in range(3)],
+        )
+        db.executemany(
+            "INSERT INTO character_abilities (character_id, name, description, category) VALUES (?, ?, ?, 'feat')",
+            [(cid, f"Ability {k}", _sentence(rng, 8)) for k in range(2)],
+        )
+    npc_ids = char_ids[4:] or char_ids
+
+    db.executemany(
+        "INSERT INTO npc_memories (session_id, npc_id, content, importance, memory_type, entities, narrative_time) "
+        "VALUES (?, ?, ?, ?, 'observation', '[]', '1000-01-01T08:00')",
+        [(sid, rng.choice(npc_ids), _sentence(rng), rng.random()) for _ in range(memories)],
+    )
+    db.executemany(
+        "INSERT INTO timeline (session_id, entry_type, content, summary) VALUES (?, ?, ?, ?)",
+        [
+            (sid, "narration" if i % 2 else "player_choice", _sentence(rng, 40), _sentence(rng, 8) if i % 2 else "")
+            for i in range(timeline)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO journal (session_id, entry_type, content) VALUES (?, 'note', ?)",
+        [(sid, _sentence(rng, 20)) for _ in range(max(timeline // 10, 1))],
+    )
+    db.commit()
+    return sid, npc_ids, char_ids
+
+
+def play_turn(db, rng, sid, turn, npc_ids, char_ids):
+    """Mutate the session the way a typical turn does (no checkpoint)."""
+    db.execute(
+        "INSERT INTO timeline (session_id, entry_type, content) VALUES (?, 'player_choice', ?)",
+        (sid, _sentence(rng, 10)),
+    )
+    db.execute(
+        "INSERT INTO timeline (session_id, entry_type, content, summary) VALUES (?, 'narration', ?, ?)",
+        (sid, _sentence(rng, 40), _sentence(rng, 8)),
+    )
+    if turn % 5 == 0:
+        db.execute(
+            "INSERT INTO journal (session_id, entry_type, content) VALUES (?, 'event', ?)", (sid, _sentence(rng))
+        )
+    db.execute(
+        "UPDATE character_attributes SET value = ? WHERE character_id = ? AND key = 'attr_0'",
+        (str(rng.randint(1, 30)), rng.choice(char_ids)),
+    )
+    if turn % 3 == 0:
+        db.execute(
+            "INSERT INTO npc_memories (session_id, npc_id, content, importance, memory_type, entities, narrative_time) "
+            "VALUES (?, ?, ?, ?, 'observation', '[]', '1000-01-01T08:00')",
+            (sid, rng.choice(npc_ids), _sentence(rng), rng.random()),
+        )
+    db.execute(
+        "UPDATE session_meta SET value = ? WHERE session_id = ? AND key = 'narrative_time'",
+        (f"1000-01-{1 + turn // 100:02d}T08:00", sid),
+    )
+    db.commit()
+
+
+def run(timeline, args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        init_schema(path)
+        db = get_db(path)
+
+        start = time.perf_counter()
+        sid, npc_ids, char_ids = build_session(db, rng, timeline, args.characters, args.memories)
+        setup_seconds = time.perf_counter() - start
+
+        if checkpoint.async_checkpoints_enabled():
+            create = checkpoint.create_checkpoint_async
+        else:
+            create = checkpoint.create_checkpoint
+        create_times, size_series, saves = [], [], []
+        create(db, sid)  # pre-game checkpoint, as turn_save does
+        for turn in range(1, args.turns + 1):
+            play_turn(db, rng, sid, turn, npc_ids, char_ids)
+            elapsed, _ = _timed(create, db, sid)
+            create_times.append(elapsed)
+            if turn % args.save_every == 0:
+                name = f"bench-{turn}"
+                checkpoint.manual_save(db, sid, name)
+                saves.append(name)
+            if turn % args.size_every == 0 and turn != args.turns:
+                checkpoint.flush_checkpoints()
+                db_bytes, cp_bytes = _sizes(db, sid)
+                size_series.append({"turn": turn, "db_bytes": db_bytes, "checkpoint_bytes": cp_bytes})
+        # Whatever the background writer still holds (nothing when synchronous)
+        flush_seconds, _ = _timed(checkpoint.flush_checkpoints)
+        db_bytes, cp_bytes = _sizes(db, sid)
+        size_series.append({"turn": args.turns, "db_bytes": db_bytes, "checkpoint_bytes": cp_bytes})
+
+        cp_ids = [r[0] for r in db.execute("SELECT id FROM checkpoints WHERE session_id = ?", (sid,)).fetchall()]
+        reconstruct_times = [
+            _timed(checkpoint.reconstruct_state, db, cp_id)[0]
+            for cp_id in rng.sample(cp_ids, min(args.samples, len(cp_ids)))
+        ]
+
+        revert_times, advance_times = [], []
+        for _ in range(args.samples):
+            revert_times.append(_timed(checkpoint.revert_to_previous, db, sid, 1)[0])
+            advance_times.append(_timed(checkpoint.advance_to_next, db, sid, 1)[0])
+
+        load_times = [
+            _timed(checkpoint.save_load, db, sid, name)[0] for name in rng.sample(saves, min(args.samples, len(saves)))
+        ]
+
+        compact_result = None
+        if args.compact:
+            elapsed, compact_result = _timed(checkpoint.compact_checkpoints, db, sid)
+            compact_result = {"seconds": round(elapsed, 3), "result": compact_result}
+
+        db_bytes, cp_bytes = _sizes(db, sid)
+        db.close()
+
+    return {
+        "timeline_entries": timeline,
+        "characters": args.characters,
+        "npc_memories": args.memories,
+        "turns": args.turns,
+        "setup_seconds": round(setup_seconds, 3),
+        "create_checkpoint": _stats(create_times),
+        "flush_checkpoints_seconds": round(flush_seconds, 3),
+        "reconstruct_state": _stats(reconstruct_times),
+        "revert_to_previous": _stats(revert_times),
+        "advance_to_next": _stats(advance_times),
+        "save_load": _stats(load_times),
+        "size_over_turns": size_series,
+        "final_db_bytes": db_bytes,
+        "final_checkpoint_bytes": cp_bytes,
+        "compaction": compact_result,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark checkpoint operations on synthetic campaigns.")
+    parser.add_argument("--timeline", default="1000,10000,50000", help="comma-separated timeline sizes")
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=20, help="timed samples for reconstruct/revert/load")
+    parser.add_argument("--save-every", type=int, default=100, help="named save interval (turns)")
+    parser.add_argument("--size-every", type=int, default=100, help="DB size sampling interval (turns)")
+    parser.add_argument("--compact", action="store_true", help="also time compact_checkpoints at the end")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "checkpoint",
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "async_checkpoints": checkpoint.async_checkpoints_enabled(),
+        "runs": [],
+    }
+    for size in (int(s) for s in args.timeline.split(",") if s.strip()):
+        print(f"timeline={size} ...", file=sys.stderr, flush=True)
+        run_result = run(size, args)
+        results["runs"].append(run_result)
+        print(
+            f"  create_checkpoint p50={run_result['create_checkpoint']['p50_ms']}ms "
+            f"revert p50={run_result['revert_to_previous']['p50_ms']}ms "
+            f"checkpoint_bytes={run_result['final_checkpoint_bytes']}",
+            file=sys.stderr,
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""recall_bench.py -- Vector storage modes: recall@k against float, latency and size.
+
+Indexes a synthetic multi-campaign corpus once, then switches the database
+through every storage mode (float, int8, int8+rerank, bit, bit+rerank) with
+vectordb.set_vector_storage and runs the same queries against each. The float
+index is the reference: recall@k is the overlap of each mode's top-k with the
+float top-k. Results are written as JSON.
+
+Uses the hashing embedder by default so it runs offline; pass
+--embedder sentence-transformers (or onnx) to measure the real model.
+
+Usage:
+    uv run python benchmarks/recall_bench.py
+    uv run python benchmarks/recall_bench.py --docs 20000 --sessions 8 --queries 200 --k 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+WORDS = (
+    "ancient temple storm river blade oath tavern shadow crown market forest ruin dragon whisper "
+    "lantern harbor merchant siege spell relic bridge wolf ember castle throne plague harvest "
+    "bandit priest oracle swamp giant tower mirror crypt feast treaty rebellion comet"
+).split()
+
+MODES = [("float", False), ("int8", False), ("int8", True), ("bit", False), ("bit", True)]
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _stats_ms(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+    }
+
+
+def _vec_bytes(db):
+    row = db.execute("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name LIKE 'vec_embeddings%'").fetchone()
+    return row[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector storage against float.")
+    parser.add_argument("--docs", type=int, default=5000, help="documents per run (spread across sessions)")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--embedder", default="hashing", help="sentence-transformers, onnx or hashing")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="recall_bench.json")
+    args = parser.parse_args(argv)
+
+    os.environ["LOREKIT_EMBEDDER"] = args.embedder
+
+    from lorekit.db import get_db, init_schema
+    from lorekit.support import vectordb
+
+    if vectordb._get_model() is None:
+        print(f"Embedder '{args.embedder}' is not available", file=sys.stderr)
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    results = {
+        "benchmark": "vector_storage",
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "modes": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        init_schema(path)
+        db = get_db(path)
+        session_ids = [
+            db.execute(
+                "INSERT INTO sessions (name, setting, system_type) VALUES (?, 'Synthetic realm', 'pf2e')", (f"S{i}",)
+            ).lastrowid
+            for i in range(args.sessions)
+        ]
+        items = [
+            ("journal", i, session_ids[i % len(session_ids)], _sentence(rng, rng.randint(8, 30)), None, None)
+            for i in range(1, args.docs + 1)
+        ]
+        start = time.perf_counter()
+        vectordb.index_many(db, items)
+        print(f"indexed {len(items)} docs in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        queries = [(rng.choice(session_ids), _sentence(rng, rng.randint(2, 5))) for _ in range(args.queries)]
+        reference = None
+        for storage, rerank in MODES:
+            start = time.perf_counter()
+            vectordb.set_vector_storage(db, storage, rerank)
+            build_seconds = time.perf_counter() - start
+
+            latencies, tops = [], []
+            for sid, text in queries:
+                t0 = time.perf_counter()
+                hits = vectordb.search(text, sid, db, collection_name="journal", n_results=args.k)
+                latencies.append(time.perf_counter() - t0)
+                tops.append([h["metadata"]["sql_id"] for h in hits])
+            if reference is None:
+                reference = tops
+
+            recall = statistics.fmean(
+                len(set(got) & set(want)) / len(want) if want else 1.0 for got, want in zip(tops, reference)
+            )
+            mode = f"{storage}+rerank" if rerank else storage
+            entry = {
+                "mode": mode,
+                f"recall_at_{args.k}": round(recall, 4),
+                "search": _stats_ms(latencies),
+                "rebuild_seconds": round(build_seconds, 3),
+                "vec_bytes": _vec_bytes(db),
+            }
+            results["modes"].append(entry)
+            print(
+                f"{mode:>12}: recall@{args.k}={entry[f'recall_at_{args.k}']:.3f} "
+                f"p50={entry['search']['p50_ms']}ms vec_bytes={entry['vec_bytes']}",
+                file=sys.stderr,
+            )
+        db.close()
+
+    results["embedding_cache"] = vectordb.cache_stats()
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
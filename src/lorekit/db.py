@@ -92,9 +92,35 @@ CREATE TABLE IF NOT EXISTS timeline (
     summary         TEXT    NOT NULL DEFAULT '',
     narrative_time  TEXT    NOT NULL DEFAULT '',
     scope           TEXT    NOT NULL DEFAULT 'participants',
+    original_summary TEXT,
     created_at      TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
+-- Timeline/journal rows hidden by a checkpoint restore (reverted or on another
+-- branch). Kept so a later restore can bring them back without snapshots
+-- having to carry the full narrative.
+CREATE TABLE IF NOT EXISTS journal_archive (
+    id              INTEGER PRIMARY KEY,
+    session_id      INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    entry_type      TEXT    NOT NULL,
+    content         TEXT    NOT NULL,
+    narrative_time  TEXT    NOT NULL DEFAULT '',
+    scope           TEXT    NOT NULL DEFAULT 'participants',
+    created_at      TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS timeline_archive (
+    id              INTEGER PRIMARY KEY,
+    session_id      INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    entry_type      TEXT    NOT NULL,
+    content         TEXT    NOT NULL,
+    summary         TEXT    NOT NULL DEFAULT '',
+    narrative_time  TEXT    NOT NULL DEFAULT '',
+    scope           TEXT    NOT NULL DEFAULT 'participants',
+    original_summary TEXT,
+    created_at      TEXT    NOT NULL
+);
+
 CREATE TABLE IF NOT EXISTS stories (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
     session_id  INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
@@ -179,11 +205,34 @@ CREATE TABLE IF NOT EXISTS embeddings (
     UNIQUE(source, source_id)
 );
 
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model       TEXT    NOT NULL,
+    text_hash   TEXT    NOT NULL,
+    vector      BLOB    NOT NULL,
+    created_at  TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS embedding_index (
+    name        TEXT    PRIMARY KEY,
+    backend     TEXT    NOT NULL,
+    dim         INTEGER NOT NULL,
+    storage     TEXT    NOT NULL DEFAULT 'float',
+    rerank      INTEGER NOT NULL DEFAULT 0,
+    created_at  TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS entity_versions (
+    session_id  INTEGER PRIMARY KEY,
+    version     INTEGER NOT NULL DEFAULT 0
+);
+
 CREATE TABLE IF NOT EXISTS checkpoint_branches (
     id                 INTEGER PRIMARY KEY AUTOINCREMENT,
     session_id         INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
     parent_branch_id   INTEGER REFERENCES checkpoint_branches(id),
     fork_checkpoint_id INTEGER REFERENCES checkpoints(id),
+    compacted_through  INTEGER NOT NULL DEFAULT 0,
     created_at         TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
@@ -212,9 +261,17 @@ CREATE TABLE IF NOT EXISTS npc_memories (
     access_count    INTEGER NOT NULL DEFAULT 0,
     last_accessed   TEXT,
     source_ids      TEXT,
-    created_at      TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+    created_at      TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    tier            TEXT NOT NULL DEFAULT 'raw'
 );
 
+CREATE TABLE IF NOT EXISTS memory_entities (
+    memory_id   INTEGER NOT NULL REFERENCES npc_memories(id) ON DELETE CASCADE,
+    npc_id      INTEGER NOT NULL,
+    entity      TEXT    NOT NULL,
+    PRIMARY KEY (npc_id, entity, memory_id)
+) WITHOUT ROWID;
+
 CREATE TABLE IF NOT EXISTS character_aliases (
     id           INTEGER PRIMARY KEY AUTOINCREMENT,
     character_id INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
@@ -262,6 +319,8 @@ CREATE TABLE IF NOT EXISTS pending_resolutions (
 INDEXES_SQL = """\
 CREATE INDEX IF NOT EXISTS idx_timeline_session ON timeline(session_id, entry_type);
 CREATE INDEX IF NOT EXISTS idx_journal_session ON journal(session_id, entry_type);
+CREATE INDEX IF NOT EXISTS idx_timeline_archive_session ON timeline_archive(session_id);
+CREATE INDEX IF NOT EXISTS idx_journal_archive_session ON journal_archive(session_id);
 CREATE INDEX IF NOT EXISTS idx_characters_session ON characters(session_id, type);
 CREATE INDEX IF NOT EXISTS idx_char_attrs ON character_attributes(character_id);
 CREATE INDEX IF NOT EXISTS idx_char_inventory ON character_inventory(character_id);
@@ -279,6 +338,7 @@ CREATE INDEX IF NOT EXISTS idx_encounter_zones ON encounter_zones(encounter_id);
 CREATE INDEX IF NOT EXISTS idx_character_zone ON character_zone(encounter_id);
 CREATE INDEX IF NOT EXISTS idx_npc_memories_npc ON npc_memories(npc_id, session_id);
 CREATE INDEX IF NOT EXISTS idx_npc_memories_importance ON npc_memories(importance);
+CREATE INDEX IF NOT EXISTS idx_memory_entities_memory ON memory_entities(memory_id);
 CREATE INDEX IF NOT EXISTS idx_npc_core_npc ON npc_core(session_id, npc_id);
 CREATE INDEX IF NOT EXISTS idx_character_aliases ON character_aliases(character_id);
 CREATE INDEX IF NOT EXISTS idx_entry_entities_entity ON entry_entities(entity_type, entity_id);
@@ -312,6 +372,15 @@ ADD_COLUMN_MIGRATIONS = [
     ("checkpoints", "parent_id", "ALTER TABLE checkpoints ADD COLUMN parent_id INTEGER REFERENCES checkpoints(id)"),
     ("checkpoints", "name", "ALTER TABLE checkpoints ADD COLUMN name TEXT"),
     ("checkpoints", "is_anchor", "ALTER TABLE checkpoints ADD COLUMN is_anchor INTEGER NOT NULL DEFAULT 1"),
+    ("timeline", "original_summary", "ALTER TABLE timeline ADD COLUMN original_summary TEXT"),
+    (
+        "checkpoint_branches",
+        "compacted_through",
+        "ALTER TABLE checkpoint_branches ADD COLUMN compacted_through INTEGER NOT NULL DEFAULT 0",
+    ),
+    ("npc_memories", "tier", "ALTER TABLE npc_memories ADD COLUMN tier TEXT NOT NULL DEFAULT 'raw'"),
+    ("embedding_index", "storage", "ALTER TABLE embedding_index ADD COLUMN storage TEXT NOT NULL DEFAULT 'float'"),
+    ("embedding_index", "rerank", "ALTER TABLE embedding_index ADD COLUMN rerank INTEGER NOT NULL DEFAULT 0"),
 ]
 
 DROP_COLUMN_MIGRATIONS = [
@@ -340,6 +409,9 @@ def get_db(db_path=None):
     if db_path is None:
         db_path, _ = resolve_db_path()
     conn = sqlite3.connect(db_path)
+    # Only takes effect on a brand-new file; existing databases are converted
+    # by checkpoint compaction (see support/checkpoint.py).
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
     conn.execute("PRAGMA journal_mode = WAL")
     conn.execute("PRAGMA foreign_keys = ON")
     try:
@@ -476,9 +548,20 @@ _CASCADE_MIGRATIONS = {
             summary         TEXT    NOT NULL DEFAULT '',
             narrative_time  TEXT    NOT NULL DEFAULT '',
             scope           TEXT    NOT NULL DEFAULT 'participants',
+            original_summary TEXT,
             created_at      TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
         )""",
-        ["id", "session_id", "entry_type", "content", "summary", "narrative_time", "scope", "created_at"],
+        [
+            "id",
+            "session_id",
+            "entry_type",
+            "content",
+            "summary",
+            "narrative_time",
+            "scope",
+            "original_summary",
+            "created_at",
+        ],
     ),
     "stories": (
         """CREATE TABLE stories (
@@ -618,17 +701,209 @@ _NEW_TABLE_MIGRATIONS = [
         session_id         INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
         parent_branch_id   INTEGER REFERENCES checkpoint_branches(id),
         fork_checkpoint_id INTEGER REFERENCES checkpoints(id),
+        compacted_through  INTEGER NOT NULL DEFAULT 0,
         created_at         TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
     )""",
+    """CREATE TABLE IF NOT EXISTS journal_archive (
+        id              INTEGER PRIMARY KEY,
+        session_id      INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+        entry_type      TEXT    NOT NULL,
+        content         TEXT    NOT NULL,
+        narrative_time  TEXT    NOT NULL DEFAULT '',
+        scope           TEXT    NOT NULL DEFAULT 'participants',
+        created_at      TEXT    NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS timeline_archive (
+        id              INTEGER PRIMARY KEY,
+        session_id      INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+        entry_type      TEXT    NOT NULL,
+        content         TEXT    NOT NULL,
+        summary         TEXT    NOT NULL DEFAULT '',
+        narrative_time  TEXT    NOT NULL DEFAULT '',
+        scope           TEXT    NOT NULL DEFAULT 'participants',
+        original_summary TEXT,
+        created_at      TEXT    NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_timeline_archive_session ON timeline_archive(session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_journal_archive_session ON journal_archive(session_id)",
+    """CREATE TABLE IF NOT EXISTS embedding_cache (
+        model       TEXT    NOT NULL,
+        text_hash   TEXT    NOT NULL,
+        vector      BLOB    NOT NULL,
+        created_at  TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+        PRIMARY KEY (model, text_hash)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS embedding_index (
+        name        TEXT    PRIMARY KEY,
+        backend     TEXT    NOT NULL,
+        dim         INTEGER NOT NULL,
+        storage     TEXT    NOT NULL DEFAULT 'float',
+        rerank      INTEGER NOT NULL DEFAULT 0,
+        created_at  TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+    )""",
+    """CREATE TABLE IF NOT EXISTS entity_versions (
+        session_id  INTEGER PRIMARY KEY,
+        version     INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS memory_entities (
+        memory_id   INTEGER NOT NULL REFERENCES npc_memories(id) ON DELETE CASCADE,
+        npc_id      INTEGER NOT NULL,
+        entity      TEXT    NOT NULL,
+        PRIMARY KEY (npc_id, entity, memory_id)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_memory_entities_memory ON memory_entities(memory_id)",
 ]
 
 
+# External-content FTS5 indexes over timeline/journal content, kept in sync by
+# triggers. Created after the cascade migration, which drops the base tables
+# (and with them the triggers).
+_FTS_TABLES = ("timeline", "journal")
+
+
+def _fts_statements(table):
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"content, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts} (rowid, content) VALUES (new.id, new.content); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, content) VALUES ('delete', old.id, old.content); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, content) VALUES ('delete', old.id, old.content); "
+        f"INSERT INTO {fts} (rowid, content) VALUES (new.id, new.content); END",
+    ]
+
+
+def _ensure_fts(conn):
+    """Create missing FTS5 tables/triggers and rebuild any index whose triggers were absent.
+
+    Returns True if anything was (re)built.
+    """
+    changed = False
+    for table in _FTS_TABLES:
+        has_trigger = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name = ?", (f"{table}_fts_ai",)
+        ).fetchone()
+        if has_trigger:
+            continue
+        for sql in _fts_statements(table):
+            conn.execute(sql)
+        conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+        changed = True
+    return changed
+
+
+# Per-session counter bumped whenever a character name, alias or region name
+# changes; prefetch.extract_entities rebuilds its cached matcher when it moves.
+# No FK to sessions: deleting a session cascades into these triggers.
+_ENTITY_VERSION_BUMP = "ON CONFLICT(session_id) DO UPDATE SET version = version + 1"
+_ENTITY_VERSION_TRIGGERS = {
+    "characters": ("name", "VALUES ({row}.session_id, 1)"),
+    "regions": ("name", "VALUES ({row}.session_id, 1)"),
+    "character_aliases": ("alias", "SELECT session_id, 1 FROM characters WHERE id = {row}.character_id"),
+}
+
+
+def _entity_version_statements(table):
+    column, source = _ENTITY_VERSION_TRIGGERS[table]
+    stmts = []
+    for suffix, event, rows in (
+        ("ai", "INSERT", ("new",)),
+        ("ad", "DELETE", ("old",)),
+        ("au", f"UPDATE OF {column}", ("old", "new")),
+    ):
+        body = " ".join(
+            f"INSERT INTO entity_versions (session_id, version) {source.format(row=row)} {_ENTITY_VERSION_BUMP};"
+            for row in rows
+        )
+        stmts.append(f"CREATE TRIGGER IF NOT EXISTS {table}_entver_{suffix} AFTER {event} ON {table} BEGIN {body} END")
+    return stmts
+
+
+def _ensure_entity_triggers(conn):
+    """Create the entity_versions triggers where missing (e.g. after the cascade migration).
+
+    Returns True if any were created.
+    """
+    changed = False
+    for table in _ENTITY_VERSION_TRIGGERS:
+        has_trigger = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name = ?", (f"{table}_entver_ai",)
+        ).fetchone()
+        if has_trigger:
+            continue
+        for sql in _entity_version_statements(table):
+            conn.execute(sql)
+        changed = True
+    return changed
+
+
+VEC_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0("
+    "session_id integer partition key, source text, npc_id integer, embedding {kind}[{dim}]{extra})"
+)
+
+# Vector column type per storage mode (see vectordb.set_vector_storage)
+VEC_STORAGE_TYPES = {"float": "float", "int8": "int8", "bit": "bit"}
+
+
+def vec_table_sql(dim=384, storage="float", rerank=False):
+    """DDL for vec_embeddings with *dim*-wide vectors stored as *storage*.
+
+    With rerank, quantized tables keep the float vector in an auxiliary
+    column for re-scoring the KNN candidates.
+    """
+    extra = ", +embedding_full blob" if rerank and storage != "float" else ""
+    return VEC_TABLE_SQL.format(kind=VEC_STORAGE_TYPES[storage], dim=dim, extra=extra)
+
+
+def _migrate_vec_partitions(conn):
+    """Rebuild a pre-partition vec_embeddings table so KNN filters by session/source in the index.
+
+    Returns True if the table was rebuilt.
+    """
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='vec_embeddings'").fetchone()
+    if ddl is None or "partition key" in ddl[0]:
+        return False
+    rows = conn.execute(
+        "SELECT v.rowid, e.session_id, e.source, COALESCE(e.npc_id, 0), v.embedding "
+        "FROM vec_embeddings v JOIN embeddings e ON e.id = v.rowid"
+    ).fetchall()
+    dim = len(rows[0][4]) // 4 if rows else 384
+    conn.execute("DROP TABLE vec_embeddings")
+    conn.execute(vec_table_sql(dim))
+    conn.executemany(
+        "INSERT INTO vec_embeddings (rowid, session_id, source, npc_id, embedding) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    return True
+
+
+def _has_table(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _backfill_memory_entities(conn):
+    """Index the entities of NPC memories written before memory_entities existed."""
+    from lorekit.npc.memory import index_memory_entities
+
+    for memory_id, npc_id, entities in conn.execute(
+        "SELECT id, npc_id, entities FROM npc_memories WHERE entities IS NOT NULL"
+    ).fetchall():
+        index_memory_entities(conn, memory_id, npc_id, entities)
+
+
 def _run_migrations(db_path):
     """Run column migrations on an existing database (fast, idempotent)."""
     conn = get_db(db_path)
     changed = False
+    backfill_entities = not _has_table(conn, "memory_entities")
     for sql in _NEW_TABLE_MIGRATIONS:
         conn.execute(sql)
+    if backfill_entities:
+        _backfill_memory_entities(conn)
+        conn.commit()
     for table, column, sql in ADD_COLUMN_MIGRATIONS:
         cols = [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
         if column not in cols:
@@ -639,6 +914,13 @@ def _run_migrations(db_path):
         if column in cols:
             conn.execute(sql)
             changed = True
+    try:
+        if _migrate_vec_partitions(conn):
+            conn.commit()
+    except (sqlite3.OperationalError, sqlite3.DatabaseError):
+        pass
+    if _ensure_fts(conn) | _ensure_entity_triggers(conn):
+        conn.commit()
     # Data migration: backfill prefetch=1 for existing PCs
     if changed:
         conn.execute("UPDATE characters SET prefetch = 1 WHERE type = 'pc' AND prefetch = 0")
@@ -693,10 +975,14 @@ def init_schema(db_path=None):
         db_dir = os.path.dirname(db_path)
     os.makedirs(db_dir, exist_ok=True)
     conn = get_db(db_path)
+    backfill_entities = _has_table(conn, "npc_memories") and not _has_table(conn, "memory_entities")
     conn.executescript(SCHEMA_SQL)
+    if backfill_entities:
+        _backfill_memory_entities(conn)
     # Create vec0 virtual table if sqlite-vec is loaded
     try:
-        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(embedding float[384])")
+        _migrate_vec_partitions(conn)
+        conn.execute(vec_table_sql())
     except (sqlite3.OperationalError, sqlite3.DatabaseError):
         pass
     # Run column migrations before indexes (indexes may reference new columns)
@@ -717,6 +1003,8 @@ def init_schema(db_path=None):
             _migrate_table_with_cascade(conn, table, ddl, columns)
         conn.execute("PRAGMA foreign_keys = ON")
         conn.executescript(INDEXES_SQL)
+    _ensure_fts(conn)
+    _ensure_entity_triggers(conn)
     conn.commit()
     conn.close()
     return db_path
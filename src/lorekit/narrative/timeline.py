@@ -104,8 +104,10 @@ def set_summary(db, timeline_id: int, summary: str) -> str:
     if not row:
         raise LoreKitError(f"Timeline entry {timeline_id} not found")
     session_id, entry_type = row
+    # original_summary remembers the creation-time summary so a checkpoint
+    # restore can undo edits made after it (see support/checkpoint.py).
     db.execute(
-        "UPDATE timeline SET summary = ? WHERE id = ?",
+        "UPDATE timeline SET original_summary = COALESCE(original_summary, summary), summary = ? WHERE id = ?",
         (summary, timeline_id),
     )
     db.commit()
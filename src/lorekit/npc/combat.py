@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import json
 import re
+from functools import partial
 
 from lorekit.db import LoreKitError
 from lorekit.npc.config import REACTION_TIMEOUT
@@ -26,11 +27,13 @@ def query_npc_reaction(
     effect: str,
     attacker,
     defender,
+    fresh: bool = False,
 ) -> bool:
     """Ask an NPC whether to use a reaction via a lightweight Claude call.
 
     Builds a minimal prompt with the combat situation and the reaction
     choice, parses a YES/NO response. Returns True to use, False to decline.
+    fresh=True skips the LLM response cache lookup.
 
     Falls back to True (use reaction) if the query fails or times out.
     """
@@ -62,17 +65,24 @@ def query_npc_reaction(
 
     # Try provider first, fall back to legacy subprocess
     from lorekit._mcp_app import get_provider_name
+    from lorekit.support import llm_cache
 
     provider_name = get_provider_name()
+    label = provider_name or "claude-cli"
+    cached = llm_cache.get(label, model, system_prompt, prompt, kind="reaction", fresh=fresh)
+    if cached is not None:
+        return "NO" not in cached.strip().upper()
+
     if provider_name:
         from lorekit.providers import load_provider
 
         provider = load_provider(provider_name)
         try:
-            answer = provider.run_ephemeral_sync(system_prompt, model, prompt).strip().upper()
-            return "NO" not in answer
+            answer = provider.run_ephemeral_sync(system_prompt, model, prompt)
         except Exception:
             return True  # fallback: use reaction
+        llm_cache.put(label, model, system_prompt, prompt, answer, kind="reaction")
+        return "NO" not in answer.strip().upper()
 
     try:
         proc = subprocess.run(
@@ -99,6 +109,7 @@ def query_npc_reaction(
         if proc.returncode != 0:
             return True  # fallback: use reaction
 
+        llm_cache.put(label, model, system_prompt, prompt, proc.stdout, kind="reaction")
         answer = proc.stdout.strip().upper()
         return "NO" not in answer
     except (subprocess.TimeoutExpired, FileNotFoundError):
@@ -860,11 +871,13 @@ def execute_combat_turn(
     intent: dict,
     combat_cfg: dict,
     system_path: str,
+    fresh: bool = False,
 ) -> list[str]:
     """Execute the mechanical part of an NPC combat turn.
 
     Dispatches steps by executor type from the intent schema.
-    advance_turn auto-calls end_turn on the NPC.
+    advance_turn auto-calls end_turn on the NPC. fresh is passed on to
+    reaction queries (see query_npc_reaction).
 
     Returns list of result lines.
     """
@@ -983,7 +996,9 @@ def execute_combat_turn(
                         action_opts["combat_options"] = npc_combat_opts
 
                     # Wire reaction query callback for "ask" mode reactions
-                    action_opts["reaction_query"] = query_npc_reaction
+                    action_opts["reaction_query"] = (
+                        partial(query_npc_reaction, fresh=True) if fresh else query_npc_reaction
+                    )
 
                     try:
                         lines.append(
@@ -23,12 +23,24 @@ FALLBACK_RECENT = 10
 # --- Memory scoring ---
 DEFAULT_IMPORTANCE = 0.5
 RECENCY_DECAY = 0.995
+NUMPY_SCORING_MIN = 96  # candidates at or above this are scored with NumPy when available (lorekit[fast])
 
 # --- Reflection & pruning ---
 REFLECTION_THRESHOLD = 5.0
 PRUNE_IMPORTANCE = 0.3
 PRUNE_RECENCY = 0.01
 
+# --- Consolidation & cap ---
+MEMORY_CAP = 500  # hard per-NPC limit; add_memory evicts the weakest memories beyond it
+CORE_IMPORTANCE = 0.9  # raw memories at or above this are promoted to the core tier
+CORE_ACCESS_COUNT = 5  # ...as are raw memories retrieved this often
+CONSOLIDATE_MIN_MEMORIES = 60  # raw memories an NPC needs before consolidation runs
+CONSOLIDATE_AGE_HOURS = 168  # narrative hours before a memory may be merged
+CONSOLIDATE_MAX_ACCESS = 1  # memories retrieved more often than this are left alone
+CONSOLIDATE_MIN_CLUSTER = 3
+CONSOLIDATE_MAX_CLUSTER = 12
+CONSOLIDATE_MAX_GROUPS = 8  # clusters summarized per LLM call
+
 # --- Core identity ---
 CORE_FIELD_CAP = 2000
 
@@ -36,3 +48,11 @@ CORE_FIELD_CAP = 2000
 INTERACT_TIMEOUT = 120
 REFLECT_TIMEOUT = 120
 REACTION_TIMEOUT = 30
+
+# --- Concurrency ---
+INTERACT_CONCURRENCY = 4  # NPC agents npc_interact_many runs at once
+REFLECT_CONCURRENCY = 4  # reflection LLM calls reflect_all runs at once
+
+# --- Warm NPC process pool (LOREKIT_NPC_POOL=<size> enables it) ---
+POOL_IDLE_TTL = 600  # seconds a warm process (or a model nobody uses) is kept
+POOL_MAINTAIN_INTERVAL = 30  # seconds between background health/eviction sweeps
@@ -0,0 +1,251 @@
+"""consolidate.py -- NPC memory consolidation: tier promotion, clustering, LLM merge.
+
+Memories live in three tiers (see memory.MEMORY_TIERS). Consolidation promotes
+important or often-retrieved raw memories to ``core``, groups old,
+rarely-retrieved raw memories that share a subject, and has the LLM rewrite
+each group as one ``summary`` memory that replaces it. Together with the
+MEMORY_CAP enforced by add_memory this keeps per-NPC memory counts -- and so
+prefetch and scoring cost -- bounded over long campaigns.
+
+Like reflection it is split into prepare (DB reads, prompt), the LLM call and
+apply (writes), so reflect_all can run the calls concurrently.
+"""
+
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
+import lorekit.npc.memory as npc_memory
+from lorekit.npc.config import (
+    CONSOLIDATE_AGE_HOURS,
+    CONSOLIDATE_MAX_ACCESS,
+    CONSOLIDATE_MAX_CLUSTER,
+    CONSOLIDATE_MAX_GROUPS,
+    CONSOLIDATE_MIN_CLUSTER,
+    CONSOLIDATE_MIN_MEMORIES,
+    CORE_ACCESS_COUNT,
+    CORE_IMPORTANCE,
+)
+from lorekit.npc.memory import MEMORY_SELECT, memory_row_to_dict
+
+
+def consolidate_memories(db, session_id, npc_id, narrative_now="", commit=True, fresh=False):
+    """Prepare, summarize and apply consolidation for one NPC.
+
+    fresh=True skips the LLM response cache lookup. Returns {"npc_name", "merged", "summaries", "promoted"}.
+    """
+    from lorekit.npc.reflect import _call_llm
+
+    job = prepare_consolidation(db, session_id, npc_id, narrative_now)
+    llm_output = _call_llm(job["prompt"], job["kind"], fresh=fresh) if job["prompt"] is not None else ""
+    return apply_consolidation(db, session_id, npc_id, job, llm_output, commit=commit)
+
+
+def prepare_consolidation(db, session_id, npc_id, narrative_now=""):
+    """Find mergeable memory clusters and build the summary prompt (DB reads only).
+
+    job["prompt"] is None when there is nothing to merge; apply_consolidation
+    still promotes core memories for such jobs.
+    """
+    from lorekit.npc.memory import narrative_hours_since, parse_time
+
+    if not narrative_now:
+        meta_row = db.execute(
+            "SELECT value FROM session_meta WHERE session_id = ? AND key = 'narrative_time'",
+            (session_id,),
+        ).fetchone()
+        narrative_now = meta_row[0] if meta_row else ""
+
+    name_row = db.execute("SELECT name FROM characters WHERE id = ?", (npc_id,)).fetchone()
+    job = {
+        "npc_name": name_row[0] if name_row else f"#{npc_id}",
+        "kind": "consolidation",
+        "clusters": [],
+        "prompt": None,
+    }
+
+    (raw_count,) = db.execute(
+        "SELECT COUNT(*) FROM npc_memories WHERE npc_id = ? AND session_id = ? AND tier = 'raw'",
+        (npc_id, session_id),
+    ).fetchone()
+    if raw_count < CONSOLIDATE_MIN_MEMORIES:
+        return job
+
+    now_dt = parse_time(narrative_now) or datetime.now(timezone.utc)
+    rows = db.execute(
+        f"SELECT {MEMORY_SELECT} FROM npc_memories WHERE npc_id = ? AND session_id = ? AND tier = 'raw' "
+        "AND memory_type != 'reflection' AND importance < ? AND access_count <= ? ORDER BY id",
+        (npc_id, session_id, CORE_IMPORTANCE, CONSOLIDATE_MAX_ACCESS),
+    ).fetchall()
+    candidates = [
+        m
+        for m in map(memory_row_to_dict, rows)
+        if m["narrative_time"] and narrative_hours_since(m["narrative_time"], now_dt) >= CONSOLIDATE_AGE_HOURS
+    ]
+    job["clusters"] = cluster_memories(db, npc_id, candidates)[:CONSOLIDATE_MAX_GROUPS]
+    if job["clusters"]:
+        job["prompt"] = _build_consolidation_prompt(job["npc_name"], job["clusters"])
+    return job
+
+
+def cluster_memories(db, npc_id, memories):
+    """Group memories by shared subject. Returns [{"subject", "memories"}] oldest first.
+
+    Each memory joins the cluster of its most common entity among *memories*
+    (memories without entities group by memory_type). Clusters are split into
+    chunks of at most CONSOLIDATE_MAX_CLUSTER; chunks smaller than
+    CONSOLIDATE_MIN_CLUSTER are left alone.
+    """
+    if not memories:
+        return []
+    by_id = {m["id"]: m for m in memories}
+    entities: dict[int, list[str]] = {}
+    for memory_id, entity in db.execute(
+        "SELECT me.memory_id, me.entity FROM memory_entities me "
+        "JOIN npc_memories m ON m.id = me.memory_id WHERE me.npc_id = ? AND m.tier = 'raw'",
+        (npc_id,),
+    ):
+        if memory_id in by_id:
+            entities.setdefault(memory_id, []).append(entity)
+    frequency = Counter(e for names in entities.values() for e in names)
+
+    groups: dict[str, list[dict]] = {}
+    for m in memories:
+        names = entities.get(m["id"])
+        subject = min(names, key=lambda e: (-frequency[e], e)) if names else f"({m['memory_type']})"
+        groups.setdefault(subject, []).append(m)
+
+    clusters = []
+    for subject, members in groups.items():
+        for start in range(0, len(members), CONSOLIDATE_MAX_CLUSTER):
+            chunk = members[start : start + CONSOLIDATE_MAX_CLUSTER]
+            if len(chunk) >= CONSOLIDATE_MIN_CLUSTER:
+                clusters.append({"subject": subject, "memories": chunk})
+    clusters.sort(key=lambda c: c["memories"][0]["id"])
+    return clusters
+
+
+def apply_consolidation(db, session_id, npc_id, job, llm_output, commit=True):
+    """Promote core memories and replace each summarized cluster with its summary.
+
+    Clusters the LLM did not summarize are kept as they are. With commit=False
+    every write stays in the caller's transaction.
+    """
+    promoted = db.execute(
+        "UPDATE npc_memories SET tier = 'core' WHERE npc_id = ? AND session_id = ? AND tier = 'raw' "
+        "AND (importance >= ? OR access_count >= ?)",
+        (npc_id, session_id, CORE_IMPORTANCE, CORE_ACCESS_COUNT),
+    ).rowcount
+
+    merged = summaries = 0
+    parsed = parse_consolidation_output(llm_output, len(job["clusters"])) if job["prompt"] is not None else {}
+    for number, cluster in enumerate(job["clusters"], 1):
+        if number not in parsed:
+            continue
+        ids = [m["id"] for m in cluster["memories"]]
+        ph = ",".join("?" * len(ids))
+        # Pruning or the cap may have removed some members since prepare
+        live = {r[0] for r in db.execute(f"SELECT id FROM npc_memories WHERE id IN ({ph}) AND tier = 'raw'", ids)}
+        members = [m for m in cluster["memories"] if m["id"] in live]
+        if not members:
+            continue
+        content, importance = parsed[number]
+        if importance is None:
+            importance = max(float(m["importance"]) for m in members)
+        npc_memory.add_memory(
+            db,
+            session_id,
+            npc_id,
+            content=content,
+            importance=importance,
+            memory_type=Counter(m["memory_type"] for m in members).most_common(1)[0][0],
+            entities=_merged_entities(members),
+            narrative_time=members[-1]["narrative_time"],
+            source_ids=[m["id"] for m in members],
+            commit=False,
+            tier="summary",
+        )
+        npc_memory.delete_memories(db, [m["id"] for m in members], commit=False)
+        merged += len(members)
+        summaries += 1
+
+    if commit:
+        db.commit()
+    return {"npc_name": job["npc_name"], "merged": merged, "summaries": summaries, "promoted": promoted}
+
+
+def _merged_entities(memories):
+    """Union of the memories' entity lists, first spelling wins."""
+    seen = {}
+    for m in memories:
+        try:
+            names = json.loads(m["entities"] or "[]")
+        except json.JSONDecodeError:
+            continue
+        for name in names if isinstance(names, list) else []:
+            if isinstance(name, str) and name.strip():
+                seen.setdefault(name.strip().lower(), name.strip())
+    return list(seen.values())
+
+
+# ---------------------------------------------------------------------------
+# Prompt & parser
+# ---------------------------------------------------------------------------
+
+
+def _build_consolidation_prompt(npc_name, clusters):
+    """Build the summary prompt for the LLM."""
+    sections = []
+    for number, cluster in enumerate(clusters, 1):
+        lines = [f"## Group {number} (about: {cluster['subject']})"]
+        for m in cluster["memories"]:
+            when = f" [{m['narrative_time']}]" if m["narrative_time"] else ""
+            lines.append(f"- [{m['memory_type']}]{when} (importance: {m['importance']}) {m['content']}")
+        sections.append("\n".join(lines))
+    groups_text = "\n\n".join(sections)
+
+    return f"""You are consolidating the long-term memories of {npc_name}, a character in a tabletop RPG.
+
+Each numbered group below holds older memories {npc_name} has about the same subject. Rewrite each group as ONE memory, in {npc_name}'s perspective, that keeps every fact, name, promise and feeling that still matters and drops the repetition.
+
+{groups_text}
+
+Format your response EXACTLY as:
+
+[SUMMARIES]
+- group: 1 | content: "merged memory text" | importance: 0.0-1.0
+- group: 2 | content: "merged memory text" | importance: 0.5
+
+Write one line per group. Importance is how much the merged memory matters to {npc_name} now."""
+
+
+def parse_consolidation_output(text, group_count):
+    """Parse [SUMMARIES] lines into {group number: (content, importance or None)}."""
+    summaries = {}
+    match = re.search(r"\[SUMMARIES\]\s*\n(.*?)(?=\n\[[A-Z_]+\]|\Z)", text or "", re.DOTALL)
+    if not match:
+        return summaries
+    for line in match.group(1).strip().splitlines():
+        line = line.strip()
+        if not line.startswith("- "):
+            continue
+        parts = {}
+        for segment in line[2:].split("|"):
+            key, sep, val = segment.partition(":")
+            if sep:
+                parts[key.strip()] = val.strip()
+        content = parts.get("content", "").strip('"').strip("'")
+        try:
+            number = int(parts.get("group", ""))
+        except ValueError:
+            continue
+        if not content or not 1 <= number <= group_count or number in summaries:
+            continue
+        importance = None
+        try:
+            importance = max(0.0, min(1.0, float(parts["importance"])))
+        except (KeyError, ValueError):
+            pass
+        summaries[number] = (content, importance)
+    return summaries
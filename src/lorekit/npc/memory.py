@@ -4,9 +4,13 @@ import json
 import math
 
 from lorekit.db import LoreKitError
-from lorekit.npc.config import CORE_FIELD_CAP, DEFAULT_IMPORTANCE, RECENCY_DECAY
+from lorekit.npc.config import CORE_FIELD_CAP, DEFAULT_IMPORTANCE, MEMORY_CAP, NUMPY_SCORING_MIN, RECENCY_DECAY
 
 VALID_MEMORY_TYPES = ("experience", "observation", "relationship", "reflection")
+# raw: as recorded; summary: written by consolidation in place of a cluster of
+# raw memories; core: promoted for importance/use, never merged or pruned.
+# Listed in eviction order for the per-NPC cap.
+MEMORY_TIERS = ("raw", "summary", "core")
 NPC_CORE_FIELDS = ("self_concept", "current_goals", "emotional_state", "relationships", "behavioral_patterns")
 MEMORY_COLUMNS = (
     "id",
@@ -19,6 +23,7 @@ MEMORY_COLUMNS = (
     "last_accessed",
     "source_ids",
     "created_at",
+    "tier",
 )
 MEMORY_SELECT = ", ".join(MEMORY_COLUMNS)
 
@@ -28,33 +33,122 @@ def memory_row_to_dict(row) -> dict:
     return {col: row[i] for i, col in enumerate(MEMORY_COLUMNS)}
 
 
-def add_memory(db, session_id, npc_id, content, importance, memory_type, entities, narrative_time, source_ids=None):
-    """Insert an NPC memory and embed it. Returns the memory ID."""
+def entity_keys(entities) -> set[str]:
+    """Normalized (lowercased, stripped) entity names from a list or its JSON text."""
+    if isinstance(entities, str):
+        try:
+            entities = json.loads(entities)
+        except json.JSONDecodeError:
+            return set()
+    if not isinstance(entities, list):
+        return set()
+    return {e.strip().lower() for e in entities if isinstance(e, str) and e.strip()}
+
+
+def index_memory_entities(db, memory_id, npc_id, entities):
+    """Record a memory's entities in memory_entities (no commit)."""
+    db.executemany(
+        "INSERT OR IGNORE INTO memory_entities (memory_id, npc_id, entity) VALUES (?, ?, ?)",
+        [(memory_id, npc_id, key) for key in entity_keys(entities)],
+    )
+
+
+def add_memory(
+    db,
+    session_id,
+    npc_id,
+    content,
+    importance,
+    memory_type,
+    entities,
+    narrative_time,
+    source_ids=None,
+    commit=True,
+    tier="raw",
+):
+    """Insert an NPC memory and embed it. Returns the memory ID.
+
+    Keeps the NPC within MEMORY_CAP by evicting its weakest older memories.
+    Pass commit=False to leave all writes in the caller's transaction.
+    """
     if memory_type not in VALID_MEMORY_TYPES:
         raise LoreKitError(f"Invalid memory_type '{memory_type}'. Must be one of: {', '.join(VALID_MEMORY_TYPES)}")
+    if tier not in MEMORY_TIERS:
+        raise LoreKitError(f"Invalid tier '{tier}'. Must be one of: {', '.join(MEMORY_TIERS)}")
 
     entities_json = entities if isinstance(entities, str) else json.dumps(entities)
     source_json = json.dumps(source_ids) if source_ids else None
 
     cur = db.execute(
         "INSERT INTO npc_memories (session_id, npc_id, content, importance, memory_type, "
-        "entities, narrative_time, source_ids) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-        (session_id, npc_id, content, float(importance), memory_type, entities_json, narrative_time, source_json),
+        "entities, narrative_time, source_ids, tier) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (session_id, npc_id, content, float(importance), memory_type, entities_json, narrative_time, source_json, tier),
     )
-    db.commit()
     memory_id = cur.lastrowid
+    index_memory_entities(db, memory_id, npc_id, entities)
+    enforce_memory_cap(db, session_id, npc_id, keep=(memory_id,), commit=False)
+    if commit:
+        db.commit()
 
     # Embed the memory
     try:
         from lorekit.support.vectordb import index_npc_memory
 
-        index_npc_memory(db, session_id, npc_id, memory_id, content)
+        index_npc_memory(db, session_id, npc_id, memory_id, content, commit=commit)
     except Exception:
         pass
 
     return memory_id
 
 
+def delete_memories(db, memory_ids, commit=True):
+    """Delete NPC memories with their entity index rows and embeddings."""
+    memory_ids = list(memory_ids)
+    if not memory_ids:
+        return
+    for start in range(0, len(memory_ids), 500):
+        chunk = memory_ids[start : start + 500]
+        ph = ",".join("?" * len(chunk))
+        db.execute(f"DELETE FROM memory_entities WHERE memory_id IN ({ph})", chunk)
+        db.execute(f"DELETE FROM npc_memories WHERE id IN ({ph})", chunk)
+
+    from lorekit.support.vectordb import delete_npc_memories
+
+    delete_npc_memories(db, memory_ids, commit=False)
+    if commit:
+        db.commit()
+
+
+def enforce_memory_cap(db, session_id, npc_id, cap=None, keep=(), commit=True):
+    """Evict memories beyond *cap* (default MEMORY_CAP) for one NPC. Returns the number evicted.
+
+    Victims go raw before summary before core, then lowest importance, least
+    accessed and oldest first. Ids in *keep* are never evicted.
+    """
+    if cap is None:
+        cap = MEMORY_CAP
+    (count,) = db.execute(
+        "SELECT COUNT(*) FROM npc_memories WHERE npc_id = ? AND session_id = ?", (npc_id, session_id)
+    ).fetchone()
+    excess = count - cap
+    if excess <= 0:
+        return 0
+
+    keep = list(keep)
+    keep_clause = f"AND id NOT IN ({','.join('?' * len(keep))}) " if keep else ""
+    victims = [
+        r[0]
+        for r in db.execute(
+            f"SELECT id FROM npc_memories WHERE npc_id = ? AND session_id = ? {keep_clause}"
+            "ORDER BY CASE tier WHEN 'raw' THEN 0 WHEN 'summary' THEN 1 ELSE 2 END, "
+            "importance, access_count, id LIMIT ?",
+            (npc_id, session_id, *keep, excess),
+        ).fetchall()
+    ]
+    delete_memories(db, victims, commit=commit)
+    return len(victims)
+
+
 def get_memories(db, npc_id, session_id, limit=10, min_importance=0.0):
     """Retrieve NPC memories ordered by importance DESC."""
     rows = db.execute(
@@ -81,7 +175,7 @@ def get_core(db, session_id, npc_id):
     return result
 
 
-def set_core(db, session_id, npc_id, **fields):
+def set_core(db, session_id, npc_id, commit=True, **fields):
     """Upsert npc_core with 2,000-char cap per field."""
     allowed = set(NPC_CORE_FIELDS)
     filtered = {}
@@ -118,7 +212,8 @@ def set_core(db, session_id, npc_id, **fields):
         ph = ", ".join("?" * len(vals))
         db.execute(f"INSERT INTO npc_core ({', '.join(cols)}) VALUES ({ph})", vals)
 
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def parse_time(dt_str):
@@ -160,60 +255,146 @@ def score_memories(memories, query_embedding, narrative_now, noise=0.0):
         Falls back to wall-clock if empty or unparseable.
     noise: scale parameter for logistic noise (0 = deterministic).
 
+    With NumPy installed and at least NUMPY_SCORING_MIN candidates, relevance
+    and normalization run as array operations that reproduce the pure-Python
+    arithmetic exactly, so scores and order (ties keep input order) match.
+
     Returns list of (memory, score) tuples sorted by score DESC.
     """
     import random
     from datetime import datetime, timezone
 
+    if not memories:
+        return []
+
     # Parse narrative_now; fall back to wall-clock if unavailable
     now_dt = parse_time(narrative_now)
     if now_dt is None:
         now_dt = datetime.now(timezone.utc)
 
-    raw_scores = []
+    # Recency: 0.995 ^ narrative_hours since last access
+    # Prefer last_accessed (narrative time of last retrieval),
+    # then narrative_time (when the memory was formed).
+    # Many memories share a timestamp, so each distinct one is parsed once.
+    recency_by_time = {}
+    recencies = []
+    importances = []
     for m in memories:
-        # Recency: 0.995 ^ narrative_hours since last access
-        # Prefer last_accessed (narrative time of last retrieval),
-        # then narrative_time (when the memory was formed)
         last = m.get("last_accessed") or m.get("narrative_time") or ""
-        hours = narrative_hours_since(last, now_dt)
-        recency = RECENCY_DECAY**hours
-
-        importance = float(m.get("importance", DEFAULT_IMPORTANCE))
-
-        # Relevance via cosine similarity with query_embedding
-        # (embedding stored externally; for scoring we expect it passed in m["embedding"])
-        emb = m.get("embedding")
-        if emb and query_embedding:
-            relevance = _cosine_similarity(emb, query_embedding)
-        else:
-            relevance = 0.0
-
-        raw_scores.append({"memory": m, "recency": recency, "importance": importance, "relevance": relevance})
-
-    if not raw_scores:
-        return []
-
-    # Min-max normalize each dimension
-    for dim in ("recency", "importance", "relevance"):
-        values = [s[dim] for s in raw_scores]
-        lo, hi = min(values), max(values)
-        rng = hi - lo
-        for s in raw_scores:
-            s[f"{dim}_norm"] = (s[dim] - lo) / rng if rng > 0 else 0.5
+        recency = recency_by_time.get(last)
+        if recency is None:
+            recency = recency_by_time[last] = RECENCY_DECAY ** narrative_hours_since(last, now_dt)
+        recencies.append(recency)
+        importances.append(float(m.get("importance", DEFAULT_IMPORTANCE)))
+
+    # Relevance via cosine similarity with query_embedding
+    # (embedding stored externally; for scoring we expect it passed in m["embedding"])
+    np = _numpy() if len(memories) >= NUMPY_SCORING_MIN else None
+    if np is not None:
+        relevances = _relevance_numpy(np, memories, query_embedding)
+        totals = _normalize(np, recencies) + _normalize(np, importances) + _normalize(np, relevances)
+        scores = totals.tolist()
+    else:
+        relevances = [
+            _cosine_similarity(m["embedding"], query_embedding)
+            if _has_vector(m.get("embedding")) and _has_vector(query_embedding)
+            else 0.0
+            for m in memories
+        ]
+        # Min-max normalize each dimension, then sum with equal weights
+        columns = [_normalize_list(values) for values in (recencies, importances, relevances)]
+        scores = [r + i + v for r, i, v in zip(*columns)]
 
-    # Sum with equal weights + optional noise
     results = []
-    for s in raw_scores:
-        score = s["recency_norm"] + s["importance_norm"] + s["relevance_norm"]
+    for m, score in zip(memories, scores):
         if noise > 0:
             score += random.random() * noise  # simple uniform noise
-        results.append((s["memory"], score))
+        results.append((m, score))
 
     results.sort(key=lambda x: x[1], reverse=True)
     return results
 
 
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _has_vector(vec):
+    return vec is not None and len(vec) > 0
+
+
+def _normalize_list(values):
+    lo, hi = min(values), max(values)
+    rng = hi - lo
+    return [(v - lo) / rng if rng > 0 else 0.5 for v in values]
+
+
+def _normalize(np, values):
+    arr = np.asarray(values, dtype=np.float64)
+    lo, hi = arr.min(), arr.max()
+    rng = hi - lo
+    return (arr - lo) / rng if rng > 0 else np.full(len(arr), 0.5)
+
+
+def _relevance_numpy(np, memories, query_embedding):
+    """Cosine similarity of every memory embedding with the query, one array op per dimension.
+
+    Sums run dimension by dimension with the same arithmetic as the sum()
+    calls in _cosine_similarity (see _float_sum), so every score is
+    bit-identical to the scalar path. A BLAS dot product rounds differently,
+    and last-bit differences can reorder near-ties.
+    """
+    relevances = np.zeros(len(memories))
+    if not _has_vector(query_embedding):
+        return relevances
+    query = [float(q) for q in query_embedding]
+    rows, vectors = [], []
+    for i, m in enumerate(memories):
+        emb = m.get("embedding")
+        if not _has_vector(emb):
+            continue
+        if len(emb) == len(query):
+            rows.append(i)
+            vectors.append(emb)
+        else:  # dimension mismatch: keep the zip-truncating scalar behaviour
+            relevances[i] = _cosine_similarity(emb, query_embedding)
+    if rows:
+        columns = np.asarray(vectors, dtype=np.float64).T.copy()  # one contiguous row per dimension
+        dots = _float_sum(np, (column * q for column, q in zip(columns, query)))
+        norms = np.sqrt(_float_sum(np, (column * column for column in columns)))
+        norm_query = math.sqrt(sum(q * q for q in query))
+        valid = (norms != 0) & (norm_query != 0)
+        relevances[rows] = np.where(valid, dots / np.where(valid, norms * norm_query, 1.0), 0.0)
+    return relevances
+
+
+# Python 3.12+ sum() adds floats with Neumaier compensation
+_COMPENSATED_SUM = sum([1.0, 1e100, 1.0, -1e100]) == 2.0
+
+
+def _float_sum(np, terms):
+    """Element-wise sum() of a sequence of equal-length arrays, rounding exactly as sum() does on floats."""
+    terms = iter(terms)
+    total = next(terms) + 0.0  # sum() starts from 0, which turns -0.0 into 0.0
+    if not _COMPENSATED_SUM:
+        for x in terms:
+            total = total + x
+        return total
+    comp = np.zeros_like(total)
+    for x in terms:
+        # Branch-free TwoSum: the same exact rounding error as sum()'s
+        # |total| >= |x| comparison picks out, without the two-sided where
+        t = total + x
+        back = t - total
+        comp += (total - (t - back)) + (x - back)
+        total = t
+    return np.where((comp != 0) & np.isfinite(comp), total + comp, total)
+
+
 def _cosine_similarity(a, b):
     """Compute cosine similarity between two vectors."""
     dot = sum(x * y for x, y in zip(a, b))
@@ -0,0 +1,208 @@
+"""pool.py -- Warm pool of pre-started NPC agent processes.
+
+Starting a CLI agent costs interpreter, auth and prompt-loading time on every
+NPC call. With LOREKIT_NPC_POOL=<size>, processes are started ahead of time
+through the provider's optional ``spawn_pooled(model, system_prompt)`` and
+handed out on demand, so dialogue latency is just the model's answer.
+
+Warm processes are keyed by (model, stable system prompt). The stable part is
+the NPC prompt up to its core identity (see tools/npc._assemble_npc_prompt);
+it keeps the NPC's instructions in the real system prompt, exactly as the
+ephemeral path sends them. The per-call tail (conditions, recalled memories,
+events) is not known at spawn time and travels ahead of the message in the
+user turn.
+
+Every process serves exactly one turn before it is retired -- that is the
+context reset -- so the pool saves spawn latency, not prompt processing. A
+background thread keeps each recently used key topped up, drops dead
+processes (health check), evicts processes and keys idle for POOL_IDLE_TTL
+(a key goes stale when the NPC's sheet or identity changes), and never holds
+more than *size* idle processes in total.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+from lorekit.npc.config import INTERACT_TIMEOUT, POOL_IDLE_TTL, POOL_MAINTAIN_INTERVAL
+
+POOL_ENV = "LOREKIT_NPC_POOL"
+
+
+class NpcProcessPool:
+    """Idle processes per (model, system prompt), refilled in the background."""
+
+    def __init__(self, provider, size, idle_ttl=POOL_IDLE_TTL, interval=POOL_MAINTAIN_INTERVAL):
+        self.provider = provider
+        self.size = size
+        self.idle_ttl = idle_ttl
+        self.interval = interval
+        self._idle: dict[tuple[str, str], deque] = {}  # key -> deque of (process, spawned_at)
+        self._last_used: dict[tuple[str, str], float] = {}  # keys to keep warm
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.stats = {"warm": 0, "cold": 0, "spawned": 0, "evicted": 0}
+
+    def run(self, system_prompt, model, message, prefix=None, timeout=INTERACT_TIMEOUT):
+        """Answer one NPC turn on a warm process (or a cold one if none is ready).
+
+        *prefix* is the stable start of *system_prompt* the process is spawned
+        with; the rest is sent as per-call context. Without it the whole
+        system prompt is the key.
+        """
+        if prefix is None or not system_prompt.startswith(prefix):
+            prefix = system_prompt
+        context = system_prompt[len(prefix) :].strip()
+        proc = self.acquire(model, prefix)
+        try:
+            return proc.send_sync(message, context, timeout)
+        finally:
+            proc.stop()
+
+    def acquire(self, model, system_prompt):
+        """Take a live idle process for this key, spawning one if none is ready."""
+        key = (model, system_prompt)
+        with self._cond:
+            self._ensure_thread()
+            self._last_used[key] = time.monotonic()
+            idle = self._idle.get(key)
+            proc = None
+            while idle:
+                candidate, _ = idle.popleft()
+                if candidate.alive:
+                    proc = candidate
+                    break
+                self.stats["evicted"] += 1
+            self._cond.notify()  # refill
+            self.stats["warm" if proc else "cold"] += 1
+        if proc is None:
+            proc = self.provider.spawn_pooled(model, system_prompt)
+            with self._cond:
+                self.stats["spawned"] += 1
+        return proc
+
+    def idle_count(self, model=None):
+        with self._cond:
+            return sum(len(d) for key, d in self._idle.items() if model is None or key[0] == model)
+
+    def maintain(self):
+        """One sweep: drop dead/expired processes and top up recently used keys."""
+        now = time.monotonic()
+        doomed = []
+        with self._cond:
+            for key in list(self._last_used):
+                if now - self._last_used[key] > self.idle_ttl:
+                    del self._last_used[key]
+            for key, idle in list(self._idle.items()):
+                keep = deque()
+                for proc, spawned_at in idle:
+                    if not proc.alive or now - spawned_at > self.idle_ttl or key not in self._last_used:
+                        doomed.append(proc)
+                    else:
+                        keep.append((proc, spawned_at))
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            self.stats["evicted"] += len(doomed)
+            wanted = self._refill_plan()
+        for proc in doomed:
+            proc.stop()
+        for key in wanted:
+            try:
+                proc = self.provider.spawn_pooled(*key)
+            except Exception:
+                continue
+            with self._cond:
+                self.stats["spawned"] += 1
+                if self._stopped or key not in self._last_used:
+                    doomed_now = True
+                else:
+                    doomed_now = False
+                    self._idle.setdefault(key, deque()).append((proc, time.monotonic()))
+            if doomed_now:
+                proc.stop()
+
+    def _refill_plan(self):
+        """Keys to spawn for, most recently used first, within the size cap (lock held)."""
+        keys = sorted(self._last_used, key=self._last_used.get, reverse=True)
+        if not keys:
+            return []
+        per_key = max(1, self.size // len(keys))
+        total = sum(len(d) for d in self._idle.values())
+        plan = []
+        for key in keys:
+            missing = per_key - len(self._idle.get(key, ()))
+            while missing > 0 and total < self.size:
+                plan.append(key)
+                missing -= 1
+                total += 1
+        return plan
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name="lorekit-npc-pool", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+            self.maintain()
+            with self._cond:
+                if self._stopped:
+                    return
+                self._cond.wait(timeout=self.interval)
+
+    def shutdown(self):
+        """Stop the maintainer and every idle process."""
+        with self._cond:
+            self._stopped = True
+            procs = [proc for idle in self._idle.values() for proc, _ in idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for proc in procs:
+            proc.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_size():
+    """Configured pool size from LOREKIT_NPC_POOL (0 = disabled)."""
+    try:
+        return max(0, int(os.environ.get(POOL_ENV, "0") or 0))
+    except ValueError:
+        return 0
+
+
+def get_pool(provider):
+    """The process-wide pool for *provider*, or None if disabled or unsupported."""
+    global _pool
+    size = pool_size()
+    if not size or provider is None or not hasattr(provider, "spawn_pooled"):
+        return None
+    with _pool_lock:
+        if _pool is None or type(_pool.provider) is not type(provider):
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = NpcProcessPool(provider, size)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+atexit.register(shutdown_pool)
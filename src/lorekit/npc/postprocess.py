@@ -117,7 +117,7 @@ def _parse_state_line(line):
         return None
 
 
-def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_time):
+def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_time, commit=True, replayed=False):
     """Post-process an NPC response: extract and store memories/state, return clean narrative.
 
     Args:
@@ -127,14 +127,21 @@ def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_
         full_text: raw NPC response text (may contain metadata blocks)
         npc_name: NPC display name
         narrative_time: in-game time string
+        commit: False to leave all writes in the caller's transaction
+        replayed: the response came from the LLM response cache; memories
+            the NPC already holds are not stored a second time (state
+            changes set absolute values, so re-applying them is harmless)
 
     Returns:
         Clean narrative text with metadata blocks stripped.
     """
     narrative, memories, state_changes = parse_npc_metadata(full_text)
+    known = _known_memories(db, session_id, npc_id) if replayed else set()
 
     # Store parsed memories
     for mem in memories:
+        if mem["content"] in known:
+            continue
         try:
             npc_memory.add_memory(
                 db,
@@ -145,17 +152,18 @@ def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_
                 memory_type=mem["type"],
                 entities=mem["entities"],
                 narrative_time=narrative_time,
+                commit=commit,
             )
         except Exception:
             pass  # tolerant: skip failures silently
 
     # Apply state changes
     if state_changes:
-        _apply_state_changes(db, session_id, npc_id, state_changes)
+        _apply_state_changes(db, session_id, npc_id, state_changes, commit=commit)
 
     # Store interaction summary as safety net only if NPC didn't declare memories
-    if not memories:
-        summary_content = f"[{npc_name} interaction] {narrative[:150]}"
+    summary_content = f"[{npc_name} interaction] {narrative[:150]}"
+    if not memories and summary_content not in known:
         try:
             npc_memory.add_memory(
                 db,
@@ -166,6 +174,7 @@ def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_
                 memory_type="experience",
                 entities=[],
                 narrative_time=narrative_time,
+                commit=commit,
             )
         except Exception:
             pass
@@ -173,7 +182,16 @@ def process_npc_response(db, session_id, npc_id, full_text, npc_name, narrative_
     return narrative
 
 
-def _apply_state_changes(db, session_id, npc_id, state_changes):
+def _known_memories(db, session_id, npc_id):
+    """Contents of the NPC's stored memories, for deduplicating replayed responses."""
+    rows = db.execute(
+        "SELECT content FROM npc_memories WHERE session_id = ? AND npc_id = ?",
+        (session_id, npc_id),
+    )
+    return {r[0] for r in rows}
+
+
+def _apply_state_changes(db, session_id, npc_id, state_changes, commit=True):
     """Apply state changes to npc_core, handling relationship.X dot notation."""
     direct_fields = {}
     relationship_updates = {}
@@ -201,6 +219,6 @@ def _apply_state_changes(db, session_id, npc_id, state_changes):
 
     if direct_fields:
         try:
-            npc_memory.set_core(db, session_id, npc_id, **direct_fields)
+            npc_memory.set_core(db, session_id, npc_id, commit=commit, **direct_fields)
         except Exception:
             pass
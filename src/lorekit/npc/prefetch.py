@@ -14,6 +14,8 @@ Pipeline steps:
 
 import json
 import logging
+import threading
+from collections import deque
 
 import lorekit.npc.memory as npc_memory
 from lorekit.npc.config import (
@@ -25,6 +27,7 @@ from lorekit.npc.config import (
     IDENTITY_RESERVE,
     MEMORY_BUDGET_RATIO,
     MIN_MEMORIES,
+    NUMPY_SCORING_MIN,
     TIMELINE_BUDGET_RATIO,
 )
 from lorekit.npc.memory import MEMORY_SELECT, memory_row_to_dict
@@ -33,13 +36,20 @@ logger = logging.getLogger("lorekit.prefetch")
 
 
 class PreFetchResult:
-    """Result of the pre-fetch pipeline."""
+    """Result of the pre-fetch pipeline.
 
-    __slots__ = ("context", "debug")
+    identity is the core-identity section, which only changes on reflection or
+    state changes; recall (memories, events, journal) changes with every
+    message. context is both joined, identity first.
+    """
+
+    __slots__ = ("context", "debug", "identity", "recall")
 
-    def __init__(self, context: str, debug: dict):
+    def __init__(self, context: str, debug: dict, identity: str = "", recall: str = ""):
         self.context = context
         self.debug = debug
+        self.identity = identity
+        self.recall = recall
 
 
 def _estimate_tokens(text: str) -> int:
@@ -52,54 +62,145 @@ def _estimate_tokens(text: str) -> int:
 # ---------------------------------------------------------------------------
 
 
+class EntityMatcher:
+    """Aho-Corasick automaton over lowercased entity names.
+
+    ``matches(text)`` scans the text once, whatever the number of names, and
+    returns the indexes of the names found on word boundaries ("Bob" does not
+    match inside "Bobby").
+    """
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        goto = [{}]
+        fail = [0]
+        out = [[]]
+        for idx, name in enumerate(names):
+            if not name:
+                continue
+            state = 0
+            for ch in name:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                state = nxt
+            out[state].append(idx)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def matches(self, text: str) -> set[int]:
+        goto, fail, out, names = self._goto, self._fail, self._out, self.names
+        found = set()
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                if idx in found:
+                    continue
+                name = names[idx]
+                start = end - len(name)
+                if _is_boundary(text, start - 1, name[0]) and _is_boundary(text, end, name[-1]):
+                    found.add(idx)
+        return found
+
+
+def _is_boundary(text: str, pos: int, edge: str) -> bool:
+    """True if text[pos] (just outside a match whose edge char is *edge*) ends the word."""
+    if pos < 0 or pos >= len(text) or not _is_word(edge):
+        return True
+    return not _is_word(text[pos])
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+# (db path, session_id) -> (entity version, entries, matcher)
+_matcher_cache: dict = {}
+_matcher_lock = threading.Lock()
+
+
+def _session_matcher(db, session_id: int):
+    """Return (entries, matcher) for the session, rebuilding when entity_versions moves.
+
+    entries[i] is (name, entity_type, entity_id, is_alias) for matcher name i,
+    in the order extract_entities reports them.
+    """
+    path = db.execute("PRAGMA database_list").fetchone()[2] or id(db)
+    row = db.execute("SELECT version FROM entity_versions WHERE session_id = ?", (session_id,)).fetchone()
+    version = row[0] if row else 0
+    key = (path, session_id)
+    with _matcher_lock:
+        cached = _matcher_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+
+    entries = [
+        (name, "character", char_id, False)
+        for char_id, name in db.execute("SELECT id, name FROM characters WHERE session_id = ?", (session_id,))
+    ]
+    entries += [
+        (alias, "character", char_id, True)
+        for char_id, alias in db.execute(
+            """SELECT ca.character_id, ca.alias
+               FROM character_aliases ca
+               JOIN characters c ON c.id = ca.character_id
+               WHERE c.session_id = ?""",
+            (session_id,),
+        )
+    ]
+    entries += [
+        (name, "region", region_id, False)
+        for region_id, name in db.execute("SELECT id, name FROM regions WHERE session_id = ?", (session_id,))
+    ]
+    matcher = EntityMatcher([name.lower().strip() for name, _, _, _ in entries])
+    with _matcher_lock:
+        _matcher_cache[key] = (version, entries, matcher)
+    return entries, matcher
+
+
 def extract_entities(db, session_id: int, text: str) -> dict:
-    """Extract known entity names from text via case-insensitive substring match.
+    """Extract known entity names from text via case-insensitive whole-word match.
+
+    Character names, aliases and region names are compiled into one
+    EntityMatcher per session, cached until any of them changes.
 
     Returns dict with keys:
       - character_ids: list of matched character IDs
       - region_ids: list of matched region IDs
       - matched_names: list of (name, entity_type, entity_id) tuples
     """
-    text_lower = text.lower()
+    entries, matcher = _session_matcher(db, session_id)
+    hits = matcher.matches(text.lower())
+
     character_ids = []
     region_ids = []
     matched_names = []
-
-    # Load all character names + aliases for this session
-    chars = db.execute(
-        "SELECT id, name FROM characters WHERE session_id = ?",
-        (session_id,),
-    ).fetchall()
-
-    for char_id, name in chars:
-        if name.lower() in text_lower:
-            character_ids.append(char_id)
-            matched_names.append((name, "character", char_id))
-
-    # Check aliases
-    alias_rows = db.execute(
-        """SELECT ca.character_id, ca.alias
-           FROM character_aliases ca
-           JOIN characters c ON c.id = ca.character_id
-           WHERE c.session_id = ?""",
-        (session_id,),
-    ).fetchall()
-
-    for char_id, alias in alias_rows:
-        if alias.lower() in text_lower and char_id not in character_ids:
-            character_ids.append(char_id)
-            matched_names.append((alias, "character", char_id))
-
-    # Load region names
-    regions = db.execute(
-        "SELECT id, name FROM regions WHERE session_id = ?",
-        (session_id,),
-    ).fetchall()
-
-    for region_id, name in regions:
-        if name.lower() in text_lower:
-            region_ids.append(region_id)
-            matched_names.append((name, "region", region_id))
+    for idx in sorted(hits):
+        name, entity_type, entity_id, is_alias = entries[idx]
+        if entity_type == "region":
+            region_ids.append(entity_id)
+        elif is_alias and entity_id in character_ids:
+            continue
+        else:
+            character_ids.append(entity_id)
+        matched_names.append((name, entity_type, entity_id))
 
     return {
         "character_ids": character_ids,
@@ -114,27 +215,23 @@ def extract_entities(db, session_id: int, text: str) -> dict:
 
 
 def _get_entity_memories(db, npc_id: int, session_id: int, entity_names: list[str]) -> list[dict]:
-    """Retrieve memories whose entities JSON contains any of the given names."""
-    if not entity_names:
+    """Retrieve memories that mention any of the given names (via memory_entities)."""
+    keys = sorted({n.strip().lower() for n in entity_names if n.strip()})
+    if not keys:
         return []
 
-    rows = db.execute(
-        f"SELECT {MEMORY_SELECT} FROM npc_memories WHERE npc_id = ? AND session_id = ?",
-        (npc_id, session_id),
-    ).fetchall()
-
-    entity_names_lower = {n.lower() for n in entity_names}
-    results = []
-    for r in rows:
-        entities_json = r[4]
-        if entities_json:
-            try:
-                entities = json.loads(entities_json)
-                if any(e.lower() in entity_names_lower for e in entities if isinstance(e, str)):
-                    results.append(_row_to_memory(r))
-            except (json.JSONDecodeError, TypeError):
-                pass
-    return results
+    cols = ", ".join(f"m.{c}" for c in MEMORY_SELECT.split(", "))
+    rows = {}
+    for start in range(0, len(keys), 500):
+        chunk = keys[start : start + 500]
+        for r in db.execute(
+            f"SELECT DISTINCT {cols} FROM memory_entities me "
+            "JOIN npc_memories m ON m.id = me.memory_id "
+            f"WHERE me.npc_id = ? AND me.entity IN ({','.join('?' * len(chunk))}) AND m.session_id = ?",
+            (npc_id, *chunk, session_id),
+        ).fetchall():
+            rows[r[0]] = r
+    return [_row_to_memory(rows[mid]) for mid in sorted(rows)]
 
 
 def _get_vector_memories(db, npc_id: int, session_id: int, query_embedding, limit: int = 20) -> list[dict]:
@@ -143,29 +240,22 @@ def _get_vector_memories(db, npc_id: int, session_id: int, query_embedding, limi
         return []
 
     try:
-        from lorekit.support.vectordb import _has_vec_table, _serialize
+        from lorekit.support.vectordb import _check_index, _has_vec_table, _knn, flush_embeddings
 
         if not _has_vec_table(db):
             return []
+        flush_embeddings(db)
+        config = _check_index(db)
+        if config is None:
+            return []
 
-        blob = _serialize(query_embedding)
-        fetch_k = limit * 5
-
-        rows = db.execute(
-            """
-            SELECT e.source_id, v.distance
-            FROM (
-                SELECT rowid, distance
-                FROM vec_embeddings
-                WHERE embedding MATCH ? AND k = ?
-            ) v
-            JOIN embeddings e ON e.id = v.rowid
-            WHERE e.source = 'npc_memory'
-              AND e.session_id = ?
-              AND e.npc_id = ?
-            """,
-            (blob, fetch_k, session_id, npc_id),
-        ).fetchall()
+        hits = _knn(db, config, query_embedding, limit, session_id, ["npc_memory"], npc_id=npc_id)
+        distances = dict(hits)
+        rows = []
+        if hits:
+            ph = ",".join("?" * len(hits))
+            source_ids = dict(db.execute(f"SELECT id, source_id FROM embeddings WHERE id IN ({ph})", list(distances)))
+            rows = [(source_ids[rowid], dist) for rowid, dist in hits if rowid in source_ids]
 
         if not rows:
             return []
@@ -270,35 +360,26 @@ _row_to_memory = memory_row_to_dict
 
 
 def _attach_embeddings(db, memories: list[dict]) -> list[dict]:
-    """Load embedding vectors for memories from the embeddings table."""
+    """Load embedding vectors for memories from the embeddings table.
+
+    Large candidate sets get NumPy arrays, ready for the vectorized scorer.
+    """
     if not memories:
         return memories
 
     try:
-        from lorekit.support.vectordb import _has_vec_table
-
-        if not _has_vec_table(db):
-            return memories
-
-        import struct
+        from lorekit.support.vectordb import stored_vectors
 
         memory_ids = [m["id"] for m in memories]
         placeholders = ",".join("?" * len(memory_ids))
-
-        rows = db.execute(
-            f"""SELECT e.source_id, v.embedding
-                FROM embeddings e
-                JOIN vec_embeddings v ON v.rowid = e.id
-                WHERE e.source = 'npc_memory' AND e.source_id IN ({placeholders})""",
-            memory_ids,
-        ).fetchall()
-
-        emb_map = {}
-        for source_id, blob in rows:
-            if blob:
-                n_floats = len(blob) // 4
-                vec = list(struct.unpack(f"{n_floats}f", blob))
-                emb_map[source_id] = vec
+        emb_ids = dict(
+            db.execute(
+                f"SELECT id, source_id FROM embeddings WHERE source = 'npc_memory' AND source_id IN ({placeholders})",
+                memory_ids,
+            ).fetchall()
+        )
+        as_array = len(memories) >= NUMPY_SCORING_MIN
+        emb_map = {emb_ids[emb_id]: vec for emb_id, vec in stored_vectors(db, emb_ids, as_array).items()}
 
         for m in memories:
             m["embedding"] = emb_map.get(m["id"])
@@ -321,15 +402,25 @@ def _deduplicate(memories: list[dict]) -> list[dict]:
 
 
 def _update_access_counts(db, memory_ids: list[int], narrative_time: str):
-    """Increment access_count and update last_accessed for retrieved memories."""
+    """Increment access_count and update last_accessed for retrieved memories.
+
+    One UPDATE per 500 IDs. If the caller already has a transaction open the
+    write joins it and is committed with the rest of the caller's work;
+    otherwise it is committed here, so no write lock is held across the NPC's
+    LLM call.
+    """
     if not memory_ids:
         return
-    for mid in memory_ids:
+    owns_transaction = not db.in_transaction
+    for start in range(0, len(memory_ids), 500):
+        chunk = memory_ids[start : start + 500]
         db.execute(
-            "UPDATE npc_memories SET access_count = access_count + 1, last_accessed = ? WHERE id = ?",
-            (narrative_time or "", mid),
+            "UPDATE npc_memories SET access_count = access_count + 1, last_accessed = ? "
+            f"WHERE id IN ({','.join('?' * len(chunk))})",
+            (narrative_time or "", *chunk),
         )
-    db.commit()
+    if owns_transaction:
+        db.commit()
 
 
 # ---------------------------------------------------------------------------
@@ -492,7 +583,7 @@ def assemble_context(
     try:
         from lorekit.support.vectordb import _embed_query
 
-        query_embedding = _embed_query(gm_message)
+        query_embedding = _embed_query(gm_message, db)
     except Exception:
         pass
     debug["has_query_embedding"] = query_embedding is not None
@@ -546,9 +637,9 @@ def assemble_context(
     _update_access_counts(db, retrieved_ids, narrative_time)
 
     # Assemble final context
-    sections = [s for s in (core_text, memories_text, timeline_text, journal_text) if s]
-    context = "\n\n".join(sections)
+    recall = "\n\n".join(s for s in (memories_text, timeline_text, journal_text) if s)
+    context = "\n\n".join(s for s in (core_text, recall) if s)
 
     debug["memories_included"] = len([1 for line in memories_text.split("\n") if line.startswith("- ")])
 
-    return PreFetchResult(context=context, debug=debug)
+    return PreFetchResult(context=context, debug=debug, identity=core_text, recall=recall)
@@ -7,7 +7,14 @@ from datetime import datetime, timezone
 
 import lorekit.npc.memory as npc_memory
 from lorekit.db import LoreKitError
-from lorekit.npc.config import PRUNE_IMPORTANCE, PRUNE_RECENCY, RECENCY_DECAY, REFLECT_TIMEOUT, REFLECTION_THRESHOLD
+from lorekit.npc.config import (
+    PRUNE_IMPORTANCE,
+    PRUNE_RECENCY,
+    RECENCY_DECAY,
+    REFLECT_CONCURRENCY,
+    REFLECT_TIMEOUT,
+    REFLECTION_THRESHOLD,
+)
 from lorekit.npc.memory import MEMORY_SELECT, memory_row_to_dict
 
 
@@ -21,7 +28,7 @@ def check_trigger(db, session_id, npc_id, threshold=REFLECTION_THRESHOLD):
 def get_unprocessed_memories(db, session_id, npc_id):
     """Memories created after the last reflection (or all if none exists).
 
-    Excludes memory_type='reflection' from candidates.
+    Excludes memory_type='reflection' and consolidation summaries from candidates.
     Ordered by created_at ASC.
     """
     # Find the last reflection time
@@ -34,14 +41,14 @@ def get_unprocessed_memories(db, session_id, npc_id):
     if last_reflection_at:
         rows = db.execute(
             f"SELECT {MEMORY_SELECT} FROM npc_memories WHERE npc_id = ? AND session_id = ? "
-            "AND memory_type != 'reflection' AND created_at > ? "
+            "AND memory_type != 'reflection' AND tier != 'summary' AND created_at > ? "
             "ORDER BY created_at ASC",
             (npc_id, session_id, last_reflection_at),
         ).fetchall()
     else:
         rows = db.execute(
             f"SELECT {MEMORY_SELECT} FROM npc_memories WHERE npc_id = ? AND session_id = ? "
-            "AND memory_type != 'reflection' "
+            "AND memory_type != 'reflection' AND tier != 'summary' "
             "ORDER BY created_at ASC",
             (npc_id, session_id),
         ).fetchall()
@@ -49,14 +56,32 @@ def get_unprocessed_memories(db, session_id, npc_id):
     return [memory_row_to_dict(r) for r in rows]
 
 
-def generate_reflection(db, session_id, npc_id, context_hint="", narrative_time=""):
+def generate_reflection(db, session_id, npc_id, context_hint="", narrative_time="", fresh=False):
     """Generate reflections from accumulated memories via LLM.
 
     narrative_time: current in-game time, stored on reflection memories and
     used for pruning recency. If empty, looks up session_meta.
+    fresh: skip the LLM response cache lookup.
 
     Returns {"reflections_stored": N, "rules_added": M, "npc_name": name, "pruned": P}.
     """
+    job = prepare_reflection(db, session_id, npc_id, context_hint, narrative_time)
+    if job["prompt"] is None:
+        return _empty_result(job)
+    llm_output = _call_llm(job["prompt"], fresh=fresh)
+    return apply_reflection(db, session_id, npc_id, job, llm_output)
+
+
+def _empty_result(job):
+    return {"reflections_stored": 0, "rules_added": 0, "npc_name": job["npc_name"], "pruned": 0}
+
+
+def prepare_reflection(db, session_id, npc_id, context_hint="", narrative_time=""):
+    """Load everything a reflection needs and build its prompt (DB reads only).
+
+    Returns a job dict for apply_reflection; job["prompt"] is None when the NPC
+    has no unprocessed memories (no LLM call needed).
+    """
     # Resolve narrative_time from session_meta if not provided
     if not narrative_time:
         meta_row = db.execute(
@@ -78,23 +103,33 @@ def generate_reflection(db, session_id, npc_id, context_hint="", narrative_time=
     # 3. Load unprocessed memories
     memories = get_unprocessed_memories(db, session_id, npc_id)
 
-    # 4. Early return if nothing to reflect on
+    job = {"npc_name": npc_name, "core": core, "memories": memories, "narrative_time": narrative_time, "prompt": None}
+
+    # 4. Nothing to reflect on
     if not memories:
-        return {"reflections_stored": 0, "rules_added": 0, "npc_name": npc_name, "pruned": 0}
+        return job
 
     # 5. Build reflection prompt
-    prompt = _build_reflection_prompt(npc_name, core, memories, context_hint, gender=npc_gender)
+    job["prompt"] = _build_reflection_prompt(npc_name, core, memories, context_hint, gender=npc_gender)
+    return job
+
+
+def apply_reflection(db, session_id, npc_id, job, llm_output, commit=True):
+    """Parse the LLM output for a prepared job and store its results.
+
+    With commit=False every write stays in the caller's transaction.
+    """
+    core = job["core"]
+    memories = job["memories"]
+    narrative_time = job["narrative_time"]
 
     # 6. Build memory_id_map (1-indexed → actual memory ID)
     memory_id_map = {i + 1: m["id"] for i, m in enumerate(memories)}
 
-    # 7. Call LLM
-    llm_output = _call_llm(prompt)
-
-    # 8. Parse output
+    # 7. Parse output
     parsed = parse_reflection_output(llm_output, memory_id_map)
 
-    # 9. Store reflections as memories
+    # 8. Store reflections as memories
     source_memory_ids = [m["id"] for m in memories]
     reflections_stored = 0
     for ref in parsed["reflections"]:
@@ -109,12 +144,13 @@ def generate_reflection(db, session_id, npc_id, context_hint="", narrative_time=
                 entities=[],
                 narrative_time=narrative_time,
                 source_ids=ref.get("source_ids", source_memory_ids),
+                commit=commit,
             )
             reflections_stored += 1
         except Exception:
             pass
 
-    # 10. Merge behavioral rules into npc_core
+    # 9. Merge behavioral rules into npc_core
     rules_added = 0
     if parsed["behavioral_rules"]:
         existing_patterns = ""
@@ -129,50 +165,119 @@ def generate_reflection(db, session_id, npc_id, context_hint="", narrative_time=
         else:
             merged = "\n".join(f"- {rule}" for rule in new_rules)
 
-        npc_memory.set_core(db, session_id, npc_id, behavioral_patterns=merged)
+        npc_memory.set_core(db, session_id, npc_id, commit=commit, behavioral_patterns=merged)
         rules_added = len(new_rules)
 
-    # 11. Apply identity updates if present
+    # 10. Apply identity updates if present
     if parsed["identity_updates"]:
         update_fields = {}
         for field in ("self_concept", "current_goals", "emotional_state"):
             if field in parsed["identity_updates"]:
                 update_fields[field] = parsed["identity_updates"][field]
         if update_fields:
-            npc_memory.set_core(db, session_id, npc_id, **update_fields)
+            npc_memory.set_core(db, session_id, npc_id, commit=commit, **update_fields)
 
-    # 12. Prune old memories
-    pruned = prune_memories(db, session_id, npc_id, narrative_now=narrative_time)
+    # 11. Prune old memories
+    pruned = prune_memories(db, session_id, npc_id, narrative_now=narrative_time, commit=commit)
 
     return {
         "reflections_stored": reflections_stored,
         "rules_added": rules_added,
-        "npc_name": npc_name,
+        "npc_name": job["npc_name"],
         "pruned": pruned,
     }
 
 
-def reflect_all(db, session_id, threshold=REFLECTION_THRESHOLD, context_hint=""):
+def reflect_all(
+    db, session_id, threshold=REFLECTION_THRESHOLD, context_hint="", concurrency=REFLECT_CONCURRENCY, fresh=False
+):
     """Reflect on all NPCs in a session that meet the trigger threshold.
 
+    Every NPC is also considered for memory consolidation (see
+    npc/consolidate.py), whatever its reflection trigger.
+
+    Prompts are built sequentially, the LLM calls run on a pool of
+    *concurrency* threads, and each NPC's results are stored in its own
+    transaction. A failing NPC is reported in the summary without affecting
+    the others. fresh=True skips the LLM response cache for every call.
+
     Returns a summary string.
     """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lorekit.npc.consolidate import apply_consolidation, prepare_consolidation
+
     npcs = db.execute(
         "SELECT id, name FROM characters WHERE session_id = ? AND type = 'npc'",
         (session_id,),
     ).fetchall()
 
+    jobs = []
+    consolidations = []
     reflected = []
+    failed = []
     skipped = 0
 
     for npc_id, npc_name in npcs:
-        if check_trigger(db, session_id, npc_id, threshold):
-            result = generate_reflection(db, session_id, npc_id, context_hint)
-            reflected.append(f"{result['npc_name']}: {result['reflections_stored']} insights")
-        else:
+        consolidation = prepare_consolidation(db, session_id, npc_id)
+        consolidation["npc_id"] = npc_id
+        consolidations.append(consolidation)
+        if not check_trigger(db, session_id, npc_id, threshold):
             skipped += 1
+            continue
+        try:
+            job = prepare_reflection(db, session_id, npc_id, context_hint)
+        except LoreKitError as e:
+            failed.append(f"{npc_name}: {e}")
+            continue
+        job["npc_id"] = npc_id
+        jobs.append(job)
+
+    pending = [job for job in jobs + consolidations if job["prompt"] is not None]
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pending)))) as pool:
+            futures = [
+                (job, pool.submit(_call_llm, job["prompt"], job.get("kind", "reflection"), fresh=fresh))
+                for job in pending
+            ]
+            for job, future in futures:
+                try:
+                    job["output"] = future.result()
+                except Exception as e:
+                    job["error"] = str(e) or type(e).__name__
+
+    for job in jobs:
+        if job.get("error"):
+            failed.append(f"{job['npc_name']}: {job['error']}")
+            continue
+        if job["prompt"] is None:
+            result = _empty_result(job)
+        else:
+            try:
+                result = apply_reflection(db, session_id, job["npc_id"], job, job["output"], commit=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                failed.append(f"{job['npc_name']}: {e}")
+                continue
+        reflected.append(f"{result['npc_name']}: {result['reflections_stored']} insights")
 
-    if not reflected and skipped == 0:
+    merged = summaries = 0
+    for job in consolidations:
+        if job.get("error"):
+            failed.append(f"{job['npc_name']} (consolidation): {job['error']}")
+            continue
+        try:
+            result = apply_consolidation(db, session_id, job["npc_id"], job, job.get("output", ""), commit=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            failed.append(f"{job['npc_name']} (consolidation): {e}")
+            continue
+        merged += result["merged"]
+        summaries += result["summaries"]
+
+    if not reflected and not failed and skipped == 0:
         return "REFLECTIONS: No NPCs in session."
 
     parts = []
@@ -180,12 +285,16 @@ def reflect_all(db, session_id, threshold=REFLECTION_THRESHOLD, context_hint="")
         parts.append(f"Reflected on {len(reflected)} NPCs ({', '.join(reflected)}).")
     if skipped:
         parts.append(f"Skipped {skipped} NPCs below threshold.")
+    if summaries:
+        parts.append(f"Consolidated {merged} memories into {summaries} summaries.")
+    if failed:
+        parts.append(f"Failed for {len(failed)} NPCs ({'; '.join(failed)}).")
 
     return "REFLECTIONS: " + " ".join(parts)
 
 
-def prune_memories(db, session_id, npc_id, narrative_now=""):
-    """Remove very old, unimportant, never-accessed memories.
+def prune_memories(db, session_id, npc_id, narrative_now="", commit=True):
+    """Remove very old, unimportant, never-accessed raw memories.
 
     Criteria: recency_score < 0.01 AND importance < 0.3 AND access_count == 0.
     recency_score = 0.995 ^ narrative_hours_since_created.
@@ -204,7 +313,8 @@ def prune_memories(db, session_id, npc_id, narrative_now=""):
 
     candidates = db.execute(
         "SELECT id, importance, access_count, narrative_time FROM npc_memories "
-        f"WHERE npc_id = ? AND session_id = ? AND importance < {PRUNE_IMPORTANCE} AND access_count = 0",
+        f"WHERE npc_id = ? AND session_id = ? AND tier = 'raw' AND importance < {PRUNE_IMPORTANCE} "
+        "AND access_count = 0",
         (npc_id, session_id),
     ).fetchall()
 
@@ -222,16 +332,7 @@ def prune_memories(db, session_id, npc_id, narrative_now=""):
     if not to_prune:
         return 0
 
-    placeholders = ",".join("?" * len(to_prune))
-    db.execute(f"DELETE FROM npc_memories WHERE id IN ({placeholders})", to_prune)
-
-    # Also delete embeddings if the table exists
-    try:
-        db.execute(f"DELETE FROM npc_memory_embeddings WHERE memory_id IN ({placeholders})", to_prune)
-    except Exception:
-        pass
-
-    db.commit()
+    npc_memory.delete_memories(db, to_prune, commit=commit)
     return len(to_prune)
 
 
@@ -306,16 +407,30 @@ Omit sections if empty (e.g., no identity updates needed). Source numbers refere
 # ---------------------------------------------------------------------------
 
 
-def _call_llm(prompt):
-    """Call LLM via provider (if configured) or claude -p subprocess."""
+def _call_llm(prompt, kind="reflection", fresh=False):
+    """Call LLM via provider (if configured) or claude -p subprocess, through the LLM response cache.
+
+    fresh=True skips the cache lookup; the new output replaces the stored one.
+    """
     from lorekit._mcp_app import get_default_model, get_provider_name
+    from lorekit.support import llm_cache
 
     provider_name = get_provider_name()
+    model = (get_default_model() or "sonnet") if provider_name else "sonnet"
+    label = provider_name or "claude-cli"
+    cached = llm_cache.get(label, model, "", prompt, kind=kind, fresh=fresh)
+    if cached is not None:
+        return cached
+    output = _call_llm_uncached(prompt, provider_name, model)
+    llm_cache.put(label, model, "", prompt, output, kind=kind)
+    return output
+
+
+def _call_llm_uncached(prompt, provider_name, model):
     if provider_name:
         from lorekit.providers import load_provider
 
         provider = load_provider(provider_name)
-        model = get_default_model() or "sonnet"
         return provider.run_ephemeral_sync("", model, prompt)
 
     from lorekit.rules import project_root as _pr
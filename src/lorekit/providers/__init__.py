@@ -1,8 +1,8 @@
 """Provider abstraction for LoreKit agent integration."""
 
-from lorekit.providers.base import AgentProcess, AgentProvider, GameEvent, StreamChunk
+from lorekit.providers.base import AgentProcess, AgentProvider, GameEvent, PooledAgentProcess, StreamChunk
 
-__all__ = ["AgentProcess", "AgentProvider", "GameEvent", "StreamChunk", "load_provider"]
+__all__ = ["AgentProcess", "AgentProvider", "GameEvent", "PooledAgentProcess", "StreamChunk", "load_provider"]
 
 
 def load_provider(name: str) -> AgentProvider:
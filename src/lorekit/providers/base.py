@@ -36,9 +36,29 @@ class AgentProcess(Protocol):
     def alive(self) -> bool: ...
 
 
+@runtime_checkable
+class PooledAgentProcess(Protocol):
+    """A pre-started process that answers one blocking NPC turn (see npc/pool.py).
+
+    The system prompt is fixed at spawn; *context* is per-call text that the
+    process sends ahead of *message* in the user turn.
+    """
+
+    def send_sync(self, message: str, context: str = "", timeout: float = ...) -> str: ...
+
+    def stop(self) -> None: ...
+
+    @property
+    def alive(self) -> bool: ...
+
+
 @runtime_checkable
 class AgentProvider(Protocol):
-    """Factory for agent processes — one implementation per CLI tool."""
+    """Factory for agent processes — one implementation per CLI tool.
+
+    Providers may also offer ``spawn_pooled(model, system_prompt) -> PooledAgentProcess``;
+    the NPC warm pool is used only when they do.
+    """
 
     def spawn_persistent(self, system_prompt: str, mcp_config: Path, model: str) -> AgentProcess: ...
 
@@ -196,6 +196,76 @@ class PersistentProcess:
         return self._session_id
 
 
+class PooledProcess:
+    """Pre-started stream-json subprocess for exactly one NPC turn.
+
+    The process is spawned ahead of time with the NPC's stable system prompt
+    (paying CLI and auth startup while idle) and answers a single send_sync
+    call; the pool then retires it, so no conversation carries over between
+    turns. Per-call context that was not known at spawn time is sent ahead of
+    the message in a <context> block.
+    """
+
+    def __init__(self, proc: subprocess.Popen):
+        import queue
+        import threading
+
+        self._proc = proc
+        self._lines: queue.Queue = queue.Queue()
+        threading.Thread(target=self._read, name="lorekit-npc-pooled-reader", daemon=True).start()
+
+    def _read(self) -> None:
+        for raw_line in self._proc.stdout:
+            self._lines.put(raw_line.decode())
+        self._lines.put(None)  # EOF
+
+    def send_sync(self, message: str, context: str = "", timeout: float = _EPHEMERAL_TIMEOUT) -> str:
+        """Send one NPC turn and block until its result line."""
+        import json
+        import queue
+        import time
+
+        content = f"<context>\n{context}\n</context>\n\n{message}" if context else message
+        msg = json.dumps({"type": "user", "message": {"role": "user", "content": content}})
+        try:
+            self._proc.stdin.write((msg + "\n").encode())
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"Pooled Claude process is gone: {e}") from e
+
+        lines = []
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired("claude", timeout) from None
+            if line is None:
+                raise RuntimeError("Pooled Claude process exited before answering")
+            lines.append(line)
+            if is_result_line(line):
+                chunk = parse_jsonl_line(line)
+                if chunk and chunk.type == "error":
+                    raise RuntimeError(chunk.content)
+                return collect_text("".join(lines))
+
+    def stop(self) -> None:
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+
 class ClaudeCLI:
     """AgentProvider implementation that spawns Claude CLI subprocesses."""
 
@@ -216,6 +286,7 @@ class ClaudeCLI:
             "--disallowedTools",
             "mcp__lorekit__client_active_session_id",
             "mcp__lorekit__client_unsaved_turn_count",
+            "mcp__lorekit__client_checkpoint_compact",
         ]
         proc = subprocess.Popen(
             cmd,
@@ -244,3 +315,20 @@ class ClaudeCLI:
         if proc.returncode != 0:
             raise RuntimeError(proc.stderr.strip() or "Claude process failed")
         return collect_text(proc.stdout)
+
+    def spawn_pooled(self, model: str, system_prompt: str) -> PooledProcess:
+        """Start a warm NPC process for *model* with *system_prompt* (see PooledProcess)."""
+        cmd = [
+            *_base_args(model, system_prompt),
+            "--input-format",
+            "stream-json",
+            "--no-session-persistence",
+        ]
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self._cwd,
+        )
+        return PooledProcess(proc)
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""LoreKit MCP server -- long-lived process with cached embedding model."""
+"""LoreKit MCP server -- long-lived process with cached embedding model (loaded in the background)."""
 
 from __future__ import annotations
 
@@ -21,9 +21,10 @@ def _parse_arg(name: str) -> str | None:
 
 
 if __name__ == "__main__":
-    from lorekit.support.vectordb import _get_model
+    from lorekit.support.vectordb import preload_model
 
-    _get_model()
+    # Load the embedding model off the startup path; tools that embed wait for it
+    preload_model()
 
     provider = _parse_arg("provider")
     model = _parse_arg("model")
@@ -8,15 +8,27 @@ Players interact via manual saves (named checkpoints) and loads.
 Undo/redo walks auto-saves within the current branch.
 """
 
+import atexit
 import json
+import os
+import queue
+import threading
 import zlib
+from bisect import bisect_right
+from itertools import accumulate
 
 from lorekit.db import LoreKitError
-from lorekit.npc.memory import NPC_CORE_FIELDS
+from lorekit.npc.memory import NPC_CORE_FIELDS, index_memory_entities
 
 ANCHOR_COUNT_CAP = 20
 ANCHOR_SIZE_RATIO = 0.5
 
+# Retention policy for compact_checkpoints(): named saves are always kept,
+# plus the newest RETAIN_RECENT auto-saves per branch and every RETAIN_EVERY-th
+# older one.
+RETAIN_RECENT = 20
+RETAIN_EVERY = 10
+
 
 def _compress(data: dict) -> bytes:
     return zlib.compress(json.dumps(data).encode())
@@ -104,6 +116,102 @@ def reconstruct_state(db, checkpoint_id: int) -> dict:
     return state
 
 
+_NARRATIVE_TABLES = ("timeline", "journal")
+
+_NARRATIVE_COLUMNS = {
+    "timeline": "id, session_id, entry_type, content, summary, narrative_time, scope, original_summary, created_at",
+    "journal": "id, session_id, entry_type, content, narrative_time, scope, created_at",
+}
+
+
+def _islands(db, table, session_id):
+    """Return [[lo, hi], ...] id ranges covering the session's visible rows of *table*.
+
+    Rows hidden by a restore live in ``<table>_archive``. An island is a run of
+    visible ids with no archived row of the same session in between, so the
+    list only grows with the number of branch switches, not with the narrative.
+    """
+    has_archived = db.execute(f"SELECT 1 FROM {table}_archive WHERE session_id = ? LIMIT 1", (session_id,)).fetchone()
+    if not has_archived:
+        row = db.execute(f"SELECT MIN(id), MAX(id) FROM {table} WHERE session_id = ?", (session_id,)).fetchone()
+        return [[row[0], row[1]]] if row[0] is not None else []
+    rows = db.execute(
+        f"""SELECT MIN(id), MAX(id) FROM (
+                SELECT id, visible, SUM(edge) OVER (ORDER BY id) AS grp FROM (
+                    SELECT id, visible,
+                           CASE WHEN visible = LAG(visible) OVER (ORDER BY id) THEN 0 ELSE 1 END AS edge
+                    FROM (SELECT id, 1 AS visible FROM {table} WHERE session_id = ?
+                          UNION ALL
+                          SELECT id, 0 FROM {table}_archive WHERE session_id = ?)
+                )
+            )
+            WHERE visible = 1 GROUP BY grp ORDER BY 1""",
+        (session_id, session_id),
+    ).fetchall()
+    return [[lo, hi] for lo, hi in rows]
+
+
+def _islands_clause(islands):
+    """Return (sql, params) matching ids inside any island."""
+    if not islands:
+        return "0", []
+    return " OR ".join("id BETWEEN ? AND ?" for _ in islands), [v for island in islands for v in island]
+
+
+def _move_rows(db, src, dst, table, where, params):
+    """Move rows matching *where* from *src* to *dst* (a table and its archive). Returns moved ids."""
+    ids = [r[0] for r in db.execute(f"SELECT id FROM {src} WHERE {where}", params).fetchall()]
+    if ids:
+        cols = _NARRATIVE_COLUMNS[table]
+        db.execute(f"INSERT OR REPLACE INTO {dst} ({cols}) SELECT {cols} FROM {src} WHERE {where}", params)
+        db.execute(f"DELETE FROM {src} WHERE {where}", params)
+    return ids
+
+
+def _restore_narrative(db, session_id, snapshot):
+    """Bring timeline/journal in line with *snapshot*; returns (timeline_ids, journal_ids) to re-embed.
+
+    Rows outside the snapshot's islands are archived, archived rows inside them
+    come back, and timeline summaries are reset to their value at checkpoint time.
+    """
+    from lorekit.support.vectordb import delete_embeddings
+
+    marks = {m["id"]: m["islands"] for m in snapshot["narrative_marks"]}
+    revived = {}
+    for table in _NARRATIVE_TABLES:
+        clause, params = _islands_clause(marks.get(table, []))
+        hidden = _move_rows(
+            db, table, f"{table}_archive", table, f"session_id = ? AND NOT ({clause})", [session_id, *params]
+        )
+        delete_embeddings(db, table, hidden, commit=False)
+        revived[table] = _move_rows(
+            db, f"{table}_archive", table, table, f"session_id = ? AND ({clause})", [session_id, *params]
+        )
+
+    # Summaries: edits recorded in the snapshot win; anything edited since goes
+    # back to the summary the row was created with.
+    edits = {r["id"]: r["summary"] for r in snapshot.get("timeline_edits", [])}
+    resummarized = []
+    for tid, summary, original in db.execute(
+        "SELECT id, summary, original_summary FROM timeline WHERE session_id = ? AND original_summary IS NOT NULL",
+        (session_id,),
+    ).fetchall():
+        if tid not in edits:
+            db.execute("UPDATE timeline SET summary = original_summary, original_summary = NULL WHERE id = ?", (tid,))
+            if summary != original:
+                resummarized.append(tid)
+    for tid, summary in edits.items():
+        cur = db.execute(
+            "UPDATE timeline SET original_summary = COALESCE(original_summary, summary), summary = ? "
+            "WHERE id = ? AND session_id = ? AND summary != ?",
+            (summary, tid, session_id, summary),
+        )
+        if cur.rowcount:
+            resummarized.append(tid)
+
+    return sorted(set(revived["timeline"]) | set(resummarized)), revived["journal"]
+
+
 def snapshot_session(db, session_id):
     """Read all mutable session state into a dict for checkpointing."""
     snap = {}
@@ -307,10 +415,11 @@ def snapshot_session(db, session_id):
             "last_accessed": r[8],
             "source_ids": r[9],
             "created_at": r[10],
+            "tier": r[11],
         }
         for r in db.execute(
             "SELECT id, npc_id, content, importance, memory_type, entities, narrative_time, "
-            "access_count, last_accessed, source_ids, created_at FROM npc_memories WHERE session_id = ?",
+            "access_count, last_accessed, source_ids, created_at, tier FROM npc_memories WHERE session_id = ?",
             (session_id,),
         ).fetchall()
     ]
@@ -330,28 +439,14 @@ def snapshot_session(db, session_id):
         ).fetchall()
     ]
 
-    # Timeline
-    snap["timeline"] = [
-        {
-            "id": r[0],
-            "entry_type": r[1],
-            "content": r[2],
-            "summary": r[3],
-            "narrative_time": r[4],
-            "scope": r[5],
-            "created_at": r[6],
-        }
-        for r in db.execute(
-            "SELECT id, entry_type, content, summary, narrative_time, scope, created_at FROM timeline WHERE session_id = ?",
-            (session_id,),
-        ).fetchall()
-    ]
-
-    # Journal
-    snap["journal"] = [
-        {"id": r[0], "entry_type": r[1], "content": r[2], "narrative_time": r[3], "scope": r[4], "created_at": r[5]}
+    # Timeline and journal are append-mostly, so instead of copying rows the
+    # snapshot records which ids are visible ("islands" of consecutive ids,
+    # see _islands) plus the few timeline rows whose summary was edited.
+    snap["narrative_marks"] = [{"id": table, "islands": _islands(db, table, session_id)} for table in _NARRATIVE_TABLES]
+    snap["timeline_edits"] = [
+        {"id": r[0], "summary": r[1]}
         for r in db.execute(
-            "SELECT id, entry_type, content, narrative_time, scope, created_at FROM journal WHERE session_id = ?",
+            "SELECT id, summary FROM timeline WHERE session_id = ? AND original_summary IS NOT NULL",
             (session_id,),
         ).fetchall()
     ]
@@ -361,6 +456,11 @@ def snapshot_session(db, session_id):
 
 def restore_snapshot(db, session_id, snapshot):
     """Replace all mutable session state from a snapshot dict."""
+    from lorekit.support.vectordb import flush_embeddings
+
+    # Queued embeddings must land before rows are archived or re-indexed.
+    flush_embeddings(db)
+
     # Disable FK checks during restore to avoid ordering issues.
     # PRAGMA foreign_keys is ignored inside an active transaction,
     # so commit any pending work first.
@@ -382,32 +482,19 @@ def restore_snapshot(db, session_id, snapshot):
             db.execute(f"DELETE FROM combat_state WHERE character_id IN ({ph})", cur_char_ids)
             db.execute(f"DELETE FROM character_aliases WHERE character_id IN ({ph})", cur_char_ids)
 
-        # Timeline and journal — delete current, will re-insert from snapshot
-        cur_tl_ids = [
-            r[0] for r in db.execute("SELECT id FROM timeline WHERE session_id = ?", (session_id,)).fetchall()
-        ]
-        cur_jn_ids = [r[0] for r in db.execute("SELECT id FROM journal WHERE session_id = ?", (session_id,)).fetchall()]
-
-        from lorekit.support.vectordb import delete_embeddings, index_journal, index_timeline
-
-        delete_embeddings(db, "timeline", cur_tl_ids)
-        delete_embeddings(db, "journal", cur_jn_ids)
-
-        # Clean up entry_entities BEFORE deleting timeline/journal rows
-        # (the subquery depends on those rows still existing)
-        if cur_tl_ids:
-            ph = ",".join("?" * len(cur_tl_ids))
-            db.execute(f"DELETE FROM entry_entities WHERE source = 'timeline' AND source_id IN ({ph})", cur_tl_ids)
-        if cur_jn_ids:
-            ph = ",".join("?" * len(cur_jn_ids))
-            db.execute(f"DELETE FROM entry_entities WHERE source = 'journal' AND source_id IN ({ph})", cur_jn_ids)
+        # Entry entities for the current timeline/journal rows — re-inserted from snapshot
+        from lorekit.support.vectordb import delete_embeddings, index_many
 
-        if cur_tl_ids:
-            ph = ",".join("?" * len(cur_tl_ids))
-            db.execute(f"DELETE FROM timeline WHERE id IN ({ph})", cur_tl_ids)
-        if cur_jn_ids:
-            ph = ",".join("?" * len(cur_jn_ids))
-            db.execute(f"DELETE FROM journal WHERE id IN ({ph})", cur_jn_ids)
+        db.execute(
+            "DELETE FROM entry_entities WHERE source = 'timeline' "
+            "AND source_id IN (SELECT id FROM timeline WHERE session_id = ?)",
+            (session_id,),
+        )
+        db.execute(
+            "DELETE FROM entry_entities WHERE source = 'journal' "
+            "AND source_id IN (SELECT id FROM journal WHERE session_id = ?)",
+            (session_id,),
+        )
 
         # Clean up encounter tables
         cur_enc_ids = [
@@ -434,6 +521,11 @@ def restore_snapshot(db, session_id, snapshot):
         db.execute("DELETE FROM story_acts WHERE session_id = ?", (session_id,))
         db.execute("DELETE FROM stories WHERE session_id = ?", (session_id,))
         db.execute("DELETE FROM regions WHERE session_id = ?", (session_id,))
+        # FKs are off here, so memory_entities does not cascade
+        db.execute(
+            "DELETE FROM memory_entities WHERE memory_id IN (SELECT id FROM npc_memories WHERE session_id = ?)",
+            (session_id,),
+        )
         db.execute("DELETE FROM npc_memories WHERE session_id = ?", (session_id,))
         db.execute("DELETE FROM npc_core WHERE session_id = ?", (session_id,))
 
@@ -589,8 +681,8 @@ def restore_snapshot(db, session_id, snapshot):
         for r in snapshot.get("npc_memories", []):
             db.execute(
                 "INSERT INTO npc_memories (id, session_id, npc_id, content, importance, memory_type, "
-                "entities, narrative_time, access_count, last_accessed, source_ids, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                "entities, narrative_time, access_count, last_accessed, source_ids, created_at, tier) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 (
                     r["id"],
                     session_id,
@@ -604,8 +696,10 @@ def restore_snapshot(db, session_id, snapshot):
                     r["last_accessed"],
                     r["source_ids"],
                     r["created_at"],
+                    r.get("tier", "raw"),
                 ),
             )
+            index_memory_entities(db, r["id"], r["npc_id"], r["entities"])
 
         # NPC core identity
         _core_cols = ", ".join(NPC_CORE_FIELDS)
@@ -617,41 +711,76 @@ def restore_snapshot(db, session_id, snapshot):
                 (r["id"], session_id, r["npc_id"], *(r[f] for f in NPC_CORE_FIELDS), r["updated_at"]),
             )
 
-        # Timeline
-        for r in snapshot.get("timeline", []):
-            db.execute(
-                "INSERT INTO timeline (id, session_id, entry_type, content, summary, narrative_time, scope, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    r["id"],
-                    session_id,
-                    r["entry_type"],
-                    r["content"],
-                    r["summary"],
-                    r["narrative_time"],
-                    r.get("scope", "participants"),
-                    r["created_at"],
-                ),
-            )
-            if r["summary"]:
-                index_timeline(db, session_id, r["id"], r["entry_type"], r["summary"], r["created_at"])
-
-        # Journal
-        for r in snapshot.get("journal", []):
-            db.execute(
-                "INSERT INTO journal (id, session_id, entry_type, content, narrative_time, scope, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (
-                    r["id"],
-                    session_id,
-                    r["entry_type"],
-                    r["content"],
-                    r["narrative_time"],
-                    r.get("scope", "participants"),
-                    r["created_at"],
-                ),
-            )
-            index_journal(db, session_id, r["id"], r["entry_type"], r["content"], r["created_at"])
+        # Timeline and journal
+        to_index = []
+        if "narrative_marks" in snapshot:
+            tl_ids, jn_ids = _restore_narrative(db, session_id, snapshot)
+            if tl_ids:
+                ph = ",".join("?" * len(tl_ids))
+                unsummarized = []
+                for tid, summary, created_at in db.execute(
+                    f"SELECT id, summary, created_at FROM timeline WHERE id IN ({ph})", tl_ids
+                ).fetchall():
+                    if summary:
+                        to_index.append(("timeline", tid, session_id, summary, created_at, None))
+                    else:
+                        unsummarized.append(tid)
+                delete_embeddings(db, "timeline", unsummarized, commit=False)
+            if jn_ids:
+                ph = ",".join("?" * len(jn_ids))
+                for jid, content, created_at in db.execute(
+                    f"SELECT id, content, created_at FROM journal WHERE id IN ({ph})", jn_ids
+                ).fetchall():
+                    to_index.append(("journal", jid, session_id, content, created_at, None))
+        else:
+            # Legacy snapshot carrying full rows: park the current rows in the
+            # archive (newer checkpoints may still need them), then re-insert.
+            for table in _NARRATIVE_TABLES:
+                hidden = _move_rows(db, table, f"{table}_archive", table, "session_id = ?", [session_id])
+                delete_embeddings(db, table, hidden, commit=False)
+            for r in snapshot.get("timeline", []):
+                db.execute(
+                    "INSERT INTO timeline (id, session_id, entry_type, content, summary, narrative_time, scope, "
+                    "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        r["id"],
+                        session_id,
+                        r["entry_type"],
+                        r["content"],
+                        r["summary"],
+                        r["narrative_time"],
+                        r.get("scope", "participants"),
+                        r["created_at"],
+                    ),
+                )
+                db.execute("DELETE FROM timeline_archive WHERE id = ?", (r["id"],))
+                if r["summary"]:
+                    to_index.append(("timeline", r["id"], session_id, r["summary"], r["created_at"], None))
+            for r in snapshot.get("journal", []):
+                db.execute(
+                    "INSERT INTO journal (id, session_id, entry_type, content, narrative_time, scope, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        r["id"],
+                        session_id,
+                        r["entry_type"],
+                        r["content"],
+                        r["narrative_time"],
+                        r.get("scope", "participants"),
+                        r["created_at"],
+                    ),
+                )
+                db.execute("DELETE FROM journal_archive WHERE id = ?", (r["id"],))
+                to_index.append(("journal", r["id"], session_id, r["content"], r["created_at"], None))
+        # The search index must never block restoring game state (e.g. after
+        # switching embedders without recall_reindex): drop a failed batch and
+        # keep the restore.
+        db.execute("SAVEPOINT restore_index")
+        try:
+            index_many(db, to_index, commit=False)
+        except Exception:
+            db.execute("ROLLBACK TO restore_index")
+        db.execute("RELEASE restore_index")
 
         db.commit()
     finally:
@@ -724,32 +853,47 @@ def _get_or_create_branch(db, session_id):
     return cur.lastrowid
 
 
+# Ordered checkpoint history of a branch (bind: branch_id), as a CTE named
+# `history`. `lineage` walks up the branch tree; each ancestor contributes its
+# checkpoints up to the lowest fork point below it, so the result is the same
+# path get_branch_history() used to assemble list by list, but resolved by
+# SQLite over idx_checkpoints_branch.
+_HISTORY_CTE = """
+WITH RECURSIVE lineage(branch_id, parent_branch_id, fork_id, cutoff) AS (
+    SELECT id, parent_branch_id, fork_checkpoint_id, NULL FROM checkpoint_branches WHERE id = ?
+    UNION ALL
+    SELECT b.id, b.parent_branch_id, b.fork_checkpoint_id,
+           CASE WHEN l.cutoff IS NULL OR l.fork_id < l.cutoff THEN l.fork_id ELSE l.cutoff END
+    FROM checkpoint_branches b JOIN lineage l ON b.id = l.parent_branch_id
+),
+history(id) AS (
+    SELECT c.id FROM checkpoints c JOIN lineage l ON c.branch_id = l.branch_id
+    WHERE l.cutoff IS NULL OR c.id <= l.cutoff
+)
+"""
+
+
 def get_branch_history(db, session_id, branch_id):
     """Return ordered checkpoint IDs for a branch, including inherited ancestors."""
-    branch = db.execute(
-        "SELECT parent_branch_id, fork_checkpoint_id FROM checkpoint_branches WHERE id = ?",
-        (branch_id,),
-    ).fetchone()
-    if branch is None:
-        return []
+    return [r[0] for r in db.execute(_HISTORY_CTE + "SELECT id FROM history ORDER BY id ASC", (branch_id,))]
 
-    own_cps = [
-        r[0]
-        for r in db.execute(
-            "SELECT id FROM checkpoints WHERE branch_id = ? ORDER BY id ASC",
-            (branch_id,),
-        ).fetchall()
-    ]
 
-    if branch[0] is None:  # root branch, no parent
-        return own_cps
+def _history_position(db, branch_id, cursor_cp):
+    """Return the cursor if it is on the branch's history, else the history tip (None if empty)."""
+    if cursor_cp is not None:
+        on_path = db.execute(_HISTORY_CTE + "SELECT 1 FROM history WHERE id = ?", (branch_id, cursor_cp)).fetchone()
+        if on_path:
+            return cursor_cp
+    return db.execute(_HISTORY_CTE + "SELECT MAX(id) FROM history", (branch_id,)).fetchone()[0]
 
-    parent_history = get_branch_history(db, session_id, branch[0])
-    fork_cp = branch[1]
-    if fork_cp in parent_history:
-        fork_idx = parent_history.index(fork_cp)
-        return parent_history[: fork_idx + 1] + own_cps
-    return parent_history + own_cps
+
+def _history_steps(db, branch_id, from_cp, steps, forward):
+    """Return up to *steps* checkpoint IDs next to *from_cp* on the branch history, nearest first."""
+    if forward:
+        sql = "SELECT id FROM history WHERE id > ? ORDER BY id ASC LIMIT ?"
+    else:
+        sql = "SELECT id FROM history WHERE id < ? ORDER BY id DESC LIMIT ?"
+    return [r[0] for r in db.execute(_HISTORY_CTE + sql, (branch_id, from_cp, steps))]
 
 
 def _get_branch_tip(db, branch_id):
@@ -761,6 +905,35 @@ def _get_branch_tip(db, branch_id):
     return row[0] if row else None
 
 
+def _encode_snapshot(parent_snap: dict, snap: dict) -> tuple[bool, bytes]:
+    """Return (is_anchor, payload) for *snap*, stored as a delta when small enough."""
+    delta = compute_delta(parent_snap, snap)
+    if len(json.dumps(delta)) < len(json.dumps(snap)) * ANCHOR_SIZE_RATIO:
+        return False, _compress(delta)
+    return True, _compress(snap)
+
+
+def _capture(db, session_id):
+    """Read (snapshot, timeline_max_id, journal_max_id) inside one read transaction."""
+    own_txn = not db.in_transaction
+    if own_txn:
+        db.execute("BEGIN")
+    try:
+        tl_max = db.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM timeline WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()[0]
+        jn_max = db.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM journal WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()[0]
+        snap = snapshot_session(db, session_id)
+    finally:
+        if own_txn:
+            db.commit()
+    return snap, tl_max, jn_max
+
+
 def create_checkpoint(db, session_id):
     """Snapshot current state and save as a checkpoint. Returns checkpoint id.
 
@@ -773,6 +946,12 @@ def create_checkpoint(db, session_id):
     3. If delta >= ANCHOR_SIZE_RATIO of full snapshot → anchor.
     4. Otherwise → delta relative to parent.
     """
+    flush_checkpoints()
+    return _write_checkpoint(db, session_id, *_capture(db, session_id))
+
+
+def _write_checkpoint(db, session_id, snap, tl_max, jn_max):
+    """Store a captured snapshot as the next checkpoint and move the cursor to it."""
     cursor_cp, cursor_branch = _get_cursor(db, session_id)
 
     # Ensure we have a branch
@@ -822,18 +1001,6 @@ def create_checkpoint(db, session_id):
                     (cursor_branch, cursor_cp),
                 )
 
-    tl_max = db.execute(
-        "SELECT COALESCE(MAX(id), 0) FROM timeline WHERE session_id = ?",
-        (session_id,),
-    ).fetchone()[0]
-
-    jn_max = db.execute(
-        "SELECT COALESCE(MAX(id), 0) FROM journal WHERE session_id = ?",
-        (session_id,),
-    ).fetchone()[0]
-
-    snap = snapshot_session(db, session_id)
-
     # Anchor policy
     is_anchor = True
     payload = _compress(snap)
@@ -853,13 +1020,7 @@ def create_checkpoint(db, session_id):
             ).fetchone()[0]
 
         if distance < ANCHOR_COUNT_CAP:
-            parent_snap = reconstruct_state(db, parent_id)
-            delta = compute_delta(parent_snap, snap)
-            delta_json = json.dumps(delta)
-            full_json = json.dumps(snap)
-            if len(delta_json) < len(full_json) * ANCHOR_SIZE_RATIO:
-                is_anchor = False
-                payload = _compress(delta)
+            is_anchor, payload = _encode_snapshot(reconstruct_state(db, parent_id), snap)
 
     cur = db.execute(
         "INSERT INTO checkpoints (session_id, branch_id, parent_id, "
@@ -873,40 +1034,113 @@ def create_checkpoint(db, session_id):
     return new_id
 
 
+# -- Background writer --
+
+ASYNC_ENV = "LOREKIT_ASYNC_CHECKPOINTS"
+
+
+def async_checkpoints_enabled() -> bool:
+    """True when turn_save should hand checkpoints to the background writer."""
+    return os.environ.get(ASYNC_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+class CheckpointWriter:
+    """Single worker thread that stores captured snapshots in submission order.
+
+    The caller captures a consistent snapshot (cheap reads) and returns; the
+    worker does the cursor/fork bookkeeping, delta, compression and insert on
+    its own connection. Because there is one worker and one FIFO queue,
+    checkpoints land in exactly the order they were captured.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._error = None
+
+    def submit(self, db_path, session_id, snap, tl_max, jn_max):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="lorekit-checkpoints", daemon=True)
+                self._thread.start()
+        self._queue.put((db_path, session_id, snap, tl_max, jn_max))
+
+    def wait(self):
+        """Block until every submitted checkpoint is stored."""
+        self._queue.join()
+
+    def flush(self):
+        """Like wait(), but raises LoreKitError (once) if a background write failed."""
+        self.wait()
+        error, self._error = self._error, None
+        if error is not None:
+            raise LoreKitError(f"Background checkpoint failed: {error}")
+
+    def _run(self):
+        from lorekit.db import get_db
+
+        while True:
+            db_path, session_id, snap, tl_max, jn_max = self._queue.get()
+            try:
+                db = get_db(db_path)
+                try:
+                    _write_checkpoint(db, session_id, snap, tl_max, jn_max)
+                finally:
+                    db.close()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+_writer = CheckpointWriter()
+
+
+def create_checkpoint_async(db, session_id):
+    """Capture the current state and queue it for the background writer."""
+    db_path = db.execute("PRAGMA database_list").fetchone()[2]
+    _writer.submit(db_path, session_id, *_capture(db, session_id))
+
+
+def flush_checkpoints():
+    """Wait for queued checkpoints. Called before anything reads or moves the cursor."""
+    _writer.flush()
+
+
+atexit.register(_writer.wait)
+
+
 def revert_to_previous(db, session_id, steps=1):
     """Move cursor back by *steps* checkpoints within the current branch.
 
     Checkpoints are preserved (not deleted) so redo is possible.
     Returns a summary string.
     """
+    flush_checkpoints()
     cursor_cp, cursor_branch = _get_cursor(db, session_id)
     if cursor_branch is None:
         raise LoreKitError("Nothing to revert -- no checkpoints")
 
-    history = get_branch_history(db, session_id, cursor_branch)
-
-    if len(history) < 2:
+    history_len = db.execute(
+        _HISTORY_CTE + "SELECT COUNT(*) FROM (SELECT id FROM history LIMIT 2)", (cursor_branch,)
+    ).fetchone()[0]
+    if history_len < 2:
         raise LoreKitError("Nothing to revert -- not enough checkpoints")
 
-    if cursor_cp is None or cursor_cp not in history:
-        current_idx = len(history) - 1
-    else:
-        current_idx = history.index(cursor_cp)
-
-    target_idx = current_idx - steps
-    if target_idx < 0:
-        target_idx = 0
-    if target_idx == current_idx:
+    current = _history_position(db, cursor_branch, cursor_cp)
+    earlier = _history_steps(db, cursor_branch, current, max(steps, 0), forward=False)
+    if not earlier:
         raise LoreKitError("Nothing to revert -- already at earliest checkpoint")
 
-    target_id = history[target_idx]
+    target_id = earlier[-1]
     snapshot = reconstruct_state(db, target_id)
 
     restore_snapshot(db, session_id, snapshot)
     _set_cursor(db, session_id, target_id, cursor_branch)
     db.commit()
 
-    actual_steps = current_idx - target_idx
+    actual_steps = len(earlier)
     skipped = f" (skipped {actual_steps - 1})" if actual_steps > 1 else ""
     return f"TURN_REVERTED: restored to checkpoint #{target_id}{skipped}"
 
@@ -917,34 +1151,27 @@ def advance_to_next(db, session_id, steps=1):
     Only works if future checkpoints exist on this branch.
     Returns a summary string.
     """
+    flush_checkpoints()
     cursor_cp, cursor_branch = _get_cursor(db, session_id)
     if cursor_branch is None:
         raise LoreKitError("Nothing to redo -- no checkpoints")
 
-    history = get_branch_history(db, session_id, cursor_branch)
-
-    if not history:
+    current = _history_position(db, cursor_branch, cursor_cp)
+    if current is None:
         raise LoreKitError("Nothing to redo -- no checkpoints")
 
-    if cursor_cp is None or cursor_cp not in history:
-        current_idx = len(history) - 1
-    else:
-        current_idx = history.index(cursor_cp)
-
-    target_idx = current_idx + steps
-    if target_idx >= len(history):
-        target_idx = len(history) - 1
-    if target_idx == current_idx:
+    later = _history_steps(db, cursor_branch, current, max(steps, 0), forward=True)
+    if not later:
         raise LoreKitError("Nothing to redo -- already at latest checkpoint")
 
-    target_id = history[target_idx]
+    target_id = later[-1]
     snapshot = reconstruct_state(db, target_id)
 
     restore_snapshot(db, session_id, snapshot)
     _set_cursor(db, session_id, target_id, cursor_branch)
     db.commit()
 
-    actual_steps = target_idx - current_idx
+    actual_steps = len(later)
     skipped = f" (skipped {actual_steps - 1})" if actual_steps > 1 else ""
     return f"TURN_ADVANCED: restored to checkpoint #{target_id}{skipped}"
 
@@ -958,6 +1185,7 @@ def manual_save(db, session_id, name=None):
     If the latest checkpoint already captures the current state, just tag it
     with the name instead of creating a duplicate.
     """
+    flush_checkpoints()
     if name is None:
         count = db.execute(
             "SELECT COUNT(*) FROM checkpoints WHERE session_id = ? AND name IS NOT NULL",
@@ -983,6 +1211,7 @@ def manual_save(db, session_id, name=None):
 
 def save_list(db, session_id):
     """Return a list of named saves: [(name, created_at), ...]."""
+    flush_checkpoints()
     return db.execute(
         "SELECT name, created_at FROM checkpoints WHERE session_id = ? AND name IS NOT NULL ORDER BY created_at ASC",
         (session_id,),
@@ -991,6 +1220,7 @@ def save_list(db, session_id):
 
 def unsaved_turn_count(db, session_id):
     """Count turns after cursor that have no named save. Used for load warnings."""
+    flush_checkpoints()
     cursor_cp, cursor_branch = _get_cursor(db, session_id)
     if cursor_cp is None or cursor_branch is None:
         return 0
@@ -1012,6 +1242,7 @@ def save_load(db, session_id, name):
     The next turn_save after a load will fork automatically if needed
     (only if there are named saves on the old path worth preserving).
     """
+    flush_checkpoints()
     row = db.execute(
         "SELECT id, branch_id FROM checkpoints WHERE session_id = ? AND name = ?",
         (session_id, name),
@@ -1030,6 +1261,7 @@ def save_load(db, session_id, name):
 
 def save_rename(db, session_id, old_name, new_name):
     """Rename a save."""
+    flush_checkpoints()
     row = db.execute(
         "SELECT id FROM checkpoints WHERE session_id = ? AND name = ?",
         (session_id, old_name),
@@ -1043,6 +1275,7 @@ def save_rename(db, session_id, old_name, new_name):
 
 def save_delete(db, session_id, name):
     """Remove a save name. The underlying checkpoint is preserved for undo/redo."""
+    flush_checkpoints()
     row = db.execute(
         "SELECT id FROM checkpoints WHERE session_id = ? AND name = ?",
         (session_id, name),
@@ -1052,3 +1285,207 @@ def save_delete(db, session_id, name):
     db.execute("UPDATE checkpoints SET name = NULL WHERE id = ?", (row[0],))
     db.commit()
     return f"SAVE_DELETED: '{name}'"
+
+
+# -- Compaction --
+
+
+def _db_size(db):
+    """Return the logical database size in bytes (page_count * page_size)."""
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def _vacuum(db):
+    """Return freed pages to the filesystem.
+
+    Databases created before incremental auto-vacuum was enabled are converted
+    with a one-off full VACUUM; afterwards only the freelist is truncated.
+    """
+    db.commit()
+    if db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        db.execute("PRAGMA incremental_vacuum").fetchall()
+    else:
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.execute("VACUUM")
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+
+def _narrative_refs(db, session_id):
+    """Return {table: (islands, ids)} naming every narrative row a checkpoint can restore.
+
+    Only the narrative keys of each snapshot are reconstructed. Parents always
+    have lower ids than their children, so one pass in id order resolves every
+    delta chain from already-built states.
+    """
+    keys = ("narrative_marks", *_NARRATIVE_TABLES)
+    states = {}
+    refs = {table: ([], set()) for table in _NARRATIVE_TABLES}
+    for cp_id, parent_id, is_anchor, blob in db.execute(
+        "SELECT id, parent_id, is_anchor, snapshot FROM checkpoints WHERE session_id = ? ORDER BY id ASC",
+        (session_id,),
+    ).fetchall():
+        snap = _decompress(blob)
+        if is_anchor or parent_id is None:
+            state = {k: snap[k] for k in keys if k in snap}
+        else:
+            base = states[parent_id] if parent_id in states else reconstruct_state(db, parent_id)
+            tables = {k: v for k, v in snap["tables"].items() if k in keys}
+            state = apply_delta_forward({k: base[k] for k in keys if k in base}, {"tables": tables})
+        states[cp_id] = state
+        for mark in state.get("narrative_marks", []):
+            refs[mark["id"]][0].extend(mark["islands"])
+        for table in _NARRATIVE_TABLES:
+            refs[table][1].update(r["id"] for r in state.get(table, []))
+    return refs
+
+
+def _prune_archives(db, session_id):
+    """Delete archived timeline/journal rows no remaining checkpoint can restore. Returns the count.
+
+    A row is still needed while it falls inside some checkpoint's islands, or
+    is carried by a legacy snapshot (whose restore re-inserts it by id).
+    """
+    refs = _narrative_refs(db, session_id)
+    pruned = 0
+    for table in _NARRATIVE_TABLES:
+        islands, ids = refs[table]
+        islands.sort()
+        starts = [lo for lo, _ in islands]
+        reach = list(accumulate((hi for _, hi in islands), max))
+        unused = []
+        for (row_id,) in db.execute(f"SELECT id FROM {table}_archive WHERE session_id = ?", (session_id,)):
+            if row_id in ids:
+                continue
+            i = bisect_right(starts, row_id)
+            if i == 0 or reach[i - 1] < row_id:
+                unused.append(row_id)
+        for i in range(0, len(unused), 500):
+            chunk = unused[i : i + 500]
+            db.execute(f"DELETE FROM {table}_archive WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        pruned += len(unused)
+    return pruned
+
+
+def compact_checkpoints(db, session_id, keep_recent=RETAIN_RECENT, keep_every=RETAIN_EVERY):
+    """Apply the retention policy to a session's checkpoints. Returns a summary string.
+
+    Kept: named saves, the cursor, fork points of live branches, the newest
+    *keep_recent* auto-saves per branch, and every *keep_every*-th older
+    auto-save. Older auto-saves that survived an earlier run are not thinned
+    again, except with ``keep_every=0``, which drops every older auto-save.
+    Branches that
+    hold neither the cursor nor a named save, and lead to neither, are
+    dropped entirely.
+
+    Survivors whose parent is removed are re-encoded against their nearest
+    surviving ancestor (delta or anchor, per the normal anchor policy), so
+    every remaining chain still reconstructs to the same state.
+    """
+    flush_checkpoints()
+    cursor_cp, cursor_branch = _get_cursor(db, session_id)
+    rows = db.execute(
+        "SELECT id, branch_id, parent_id, name FROM checkpoints WHERE session_id = ? ORDER BY id ASC",
+        (session_id,),
+    ).fetchall()
+    if not rows:
+        return "CHECKPOINTS_COMPACTED: nothing to compact"
+
+    branches = {
+        r[0]: (r[1], r[2], r[3])
+        for r in db.execute(
+            "SELECT id, parent_branch_id, fork_checkpoint_id, compacted_through "
+            "FROM checkpoint_branches WHERE session_id = ?",
+            (session_id,),
+        ).fetchall()
+    }
+    parent_of = {r[0]: r[2] for r in rows}
+    by_branch = {}
+    for cp_id, branch_id, _, name in rows:
+        by_branch.setdefault(branch_id, []).append((cp_id, name))
+
+    # Live branches: the cursor's and any holding a named save are reachable in
+    # full; their ancestors only up to the fork point the descendant hangs off.
+    reach = {}  # branch_id -> None (whole branch) or highest reachable checkpoint id
+    seeds = {cursor_branch} | {branch_id for _, branch_id, _, name in rows if name is not None}
+    for branch_id in seeds:
+        limit = None
+        while branch_id is not None and branch_id in branches:
+            if branch_id in reach and (reach[branch_id] is None or (limit is not None and reach[branch_id] >= limit)):
+                break
+            reach[branch_id] = limit if limit is None or branch_id not in reach else max(reach[branch_id], limit)
+            limit = branches[branch_id][1]
+            branch_id = branches[branch_id][0]
+    live = set(reach)
+
+    keep = {cursor_cp} if cursor_cp is not None else set()
+    for branch_id in live:
+        limit = reach[branch_id]
+        own = [(cp_id, name) for cp_id, name in by_branch.get(branch_id, []) if limit is None or cp_id <= limit]
+        keep.update(cp_id for cp_id, name in own if name is not None)
+        fork_cp = branches[branch_id][1]
+        if fork_cp is not None:
+            keep.add(fork_cp)
+
+        autos = [cp_id for cp_id, name in own if name is None]
+        older = autos[: max(len(autos) - keep_recent, 0)]
+        keep.update(autos[len(older) :])
+        # Checkpoints thinned by an earlier run are kept as-is, so running
+        # compaction twice does not thin the same stretch again. keep_every=0
+        # asks for no older auto-saves at all, including those.
+        if keep_every > 0:
+            compacted_through = branches[branch_id][2]
+            keep.update(cp_id for cp_id in older if cp_id <= compacted_through)
+            keep.update([cp_id for cp_id in older if cp_id > compacted_through][::keep_every])
+        if older:
+            db.execute(
+                "UPDATE checkpoint_branches SET compacted_through = ? WHERE id = ?",
+                (max(older), branch_id),
+            )
+
+    doomed = [r[0] for r in rows if r[0] not in keep]
+    dead_branches = [b for b in branches if b not in live]
+    size_before = _db_size(db)
+
+    # Re-encode survivors that lose their parent (state must be read before deleting)
+    rewrites = []
+    for cp_id in sorted(keep):
+        parent_id = parent_of.get(cp_id)
+        if parent_id is None or parent_id in keep:
+            continue
+        new_parent = parent_id
+        while new_parent is not None and new_parent not in keep:
+            new_parent = parent_of.get(new_parent)
+        snap = reconstruct_state(db, cp_id)
+        if new_parent is None:
+            rewrites.append((cp_id, None, True, _compress(snap)))
+        else:
+            is_anchor, payload = _encode_snapshot(reconstruct_state(db, new_parent), snap)
+            rewrites.append((cp_id, new_parent, is_anchor, payload))
+    for cp_id, new_parent, is_anchor, payload in rewrites:
+        db.execute(
+            "UPDATE checkpoints SET parent_id = ?, is_anchor = ?, snapshot = ? WHERE id = ?",
+            (new_parent, int(is_anchor), payload, cp_id),
+        )
+
+    if dead_branches:
+        ph = ",".join("?" * len(dead_branches))
+        db.execute(f"UPDATE checkpoint_branches SET fork_checkpoint_id = NULL WHERE id IN ({ph})", dead_branches)
+    if doomed:
+        ph = ",".join("?" * len(doomed))
+        db.execute(f"DELETE FROM checkpoints WHERE id IN ({ph})", doomed)
+    if dead_branches:
+        ph = ",".join("?" * len(dead_branches))
+        db.execute(f"DELETE FROM checkpoint_branches WHERE id IN ({ph})", dead_branches)
+    pruned = _prune_archives(db, session_id)
+    db.commit()
+    if not doomed and not dead_branches and not pruned:
+        return "CHECKPOINTS_COMPACTED: nothing to compact"
+
+    _vacuum(db)
+    reclaimed = max(size_before - _db_size(db), 0)
+    return (
+        f"CHECKPOINTS_COMPACTED: removed {len(doomed)} checkpoint(s) and "
+        f"{len(dead_branches)} branch(es), pruned {pruned} archived row(s), reclaimed {reclaimed} bytes"
+    )
@@ -0,0 +1,157 @@
+"""embed_service.py -- Shared embedding worker over a Unix socket.
+
+One process loads the embedding backend; MCP servers and NPC subprocesses on
+the same host use it through the ``socket`` backend (LOREKIT_EMBEDDER=socket)
+instead of loading their own copy. Requests arriving within BATCH_WINDOW of
+each other are encoded in one forward pass.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "info"}                 -> {"name": ..., "dim": ...}
+    {"op": "encode", "texts": [...]} -> {"vectors": <base64 float32, row-major>}
+Errors come back as {"error": "..."}.
+
+Usage:
+    python -m lorekit.support.embed_service [--socket PATH] [--embedder sentence-transformers|onnx|hashing]
+"""
+
+import argparse
+import base64
+import json
+import os
+import queue
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+SOCKET_ENV = "LOREKIT_EMBED_SOCKET"
+MAX_BATCH = 128
+BATCH_WINDOW = 0.005  # seconds to wait for more requests before encoding
+
+
+def default_socket_path():
+    """Socket path from LOREKIT_EMBED_SOCKET, else a per-host temp path."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(tempfile.gettempdir(), "lorekit-embed.sock")
+
+
+def pack_vectors(vectors):
+    flat = [v for vec in vectors for v in vec]
+    return base64.b64encode(struct.pack(f"{len(flat)}f", *flat)).decode("ascii")
+
+
+def unpack_vectors(data, dim):
+    raw = base64.b64decode(data)
+    flat = struct.unpack(f"{len(raw) // 4}f", raw)
+    return [list(flat[i : i + dim]) for i in range(0, len(flat), dim)]
+
+
+class Batcher:
+    """Collects encode requests from all connections and runs them in shared batches."""
+
+    def __init__(self, backend, max_batch=MAX_BATCH, window=BATCH_WINDOW):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="lorekit-embed-batcher", daemon=True).start()
+
+    def encode(self, texts):
+        """Queue *texts* and block until their vectors are ready."""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            size = len(jobs[0][0])
+            deadline = time.monotonic() + self.window
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job[0])
+            texts = [t for job_texts, _ in jobs for t in job_texts]
+            try:
+                vectors = self.backend.encode(texts)
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for job_texts, future in jobs:
+                future.set_result(vectors[offset : offset + len(job_texts)])
+                offset += len(job_texts)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        batcher = self.server.batcher
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("op") == "info":
+                    reply = {"name": batcher.backend.name, "dim": batcher.backend.dim}
+                elif request.get("op") == "encode":
+                    reply = {"vectors": pack_vectors(batcher.encode(request["texts"]))}
+                else:
+                    reply = {"error": f"Unknown op: {request.get('op')}"}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, backend):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a previous run
+        self.batcher = Batcher(backend)
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main(argv=None):
+    from lorekit.support.embedders import load_embedder
+
+    parser = argparse.ArgumentParser(description="Serve LoreKit embeddings over a Unix socket.")
+    parser.add_argument("--socket", default=default_socket_path())
+    parser.add_argument(
+        "--embedder", default="", help="backend to serve (default: LOREKIT_EMBEDDER or sentence-transformers)"
+    )
+    args = parser.parse_args(argv)
+
+    if (args.embedder or os.environ.get("LOREKIT_EMBEDDER", "")).lower() == "socket":
+        print("The embedding service cannot serve the socket backend itself", file=sys.stderr)
+        sys.exit(1)
+    backend = load_embedder(args.embedder or None)
+    if backend is None:
+        print("Embedding backend is not available", file=sys.stderr)
+        sys.exit(1)
+
+    server = EmbeddingServer(args.socket, backend)
+    print(f"Serving {backend.name} on {args.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Embedding backends for LoreKit semantic search.
+
+Every backend exposes ``name`` (stable id, recorded with the vector index),
+``dim`` and ``encode(texts) -> list[list[float]]`` returning L2-normalized
+vectors. Texts arrive already carrying their E5 "passage: "/"query: " prefix.
+
+Select one with LOREKIT_EMBEDDER:
+- ``sentence-transformers`` (default) -- intfloat/multilingual-e5-small on torch
+- ``onnx`` -- the same model, int8-quantized, on ONNX Runtime (CPU)
+- ``hashing`` -- deterministic feature hashing, no model download
+- ``socket`` -- a shared embed_service process on this host (LOREKIT_EMBED_SOCKET)
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import socket
+import sys
+import threading
+
+EMBEDDER_ENV = "LOREKIT_EMBEDDER"
+DEFAULT_DIM = 384
+E5_MODEL = "intfloat/multilingual-e5-small"
+
+
+class SentenceTransformerEmbedder:
+    """multilingual-e5-small via sentence-transformers (torch)."""
+
+    name = f"sentence-transformers:{E5_MODEL}"
+    dim = DEFAULT_DIM
+
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+
+        cache_dir = os.path.join(os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub")
+        model_dir = os.path.join(cache_dir, "models--intfloat--multilingual-e5-small")
+        if not os.path.isdir(model_dir):
+            print("Downloading embedding model (intfloat/multilingual-e5-small, ~488MB)... this only happens once.")
+
+        old_stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        try:
+            self._model = SentenceTransformer(E5_MODEL)
+        finally:
+            sys.stderr = old_stderr
+
+    def encode(self, texts):
+        return self._model.encode(list(texts), normalize_embeddings=True).tolist()
+
+
+class OnnxEmbedder:
+    """multilingual-e5-small, int8-quantized, on ONNX Runtime.
+
+    Needs onnxruntime, tokenizers and huggingface-hub (``pip install lorekit[onnx]``).
+    Mean-pools the last hidden state like the sentence-transformers pipeline.
+    """
+
+    name = f"onnx-int8:{E5_MODEL}"
+    dim = DEFAULT_DIM
+    repo = "Xenova/multilingual-e5-small"
+    model_file = "onnx/model_quantized.onnx"
+    max_length = 512
+
+    def __init__(self):
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self._tokenizer = Tokenizer.from_file(hf_hub_download(self.repo, "tokenizer.json"))
+        self._tokenizer.enable_truncation(self.max_length)
+        self._tokenizer.enable_padding()
+        self._session = onnxruntime.InferenceSession(
+            hf_hub_download(self.repo, self.model_file), providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self._session.get_inputs()}
+
+    def encode(self, texts):
+        import numpy as np
+
+        batch = self._tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in batch], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+        feed = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feed["token_type_ids"] = np.zeros_like(ids)
+        hidden = self._session.run(None, feed)[0]
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+
+class HashingEmbedder:
+    """Deterministic signed feature hashing of words and character trigrams.
+
+    No model, no download, identical output on every machine -- meant for
+    tests and offline environments. Captures lexical overlap only.
+    """
+
+    name = f"hashing-v1:{DEFAULT_DIM}"
+    dim = DEFAULT_DIM
+
+    def __init__(self, dim=DEFAULT_DIM):
+        if dim != DEFAULT_DIM:
+            self.dim = dim
+            self.name = f"hashing-v1:{dim}"
+
+    def _features(self, text):
+        words = re.findall(r"\w+", text.lower())
+        if words and words[0] in ("passage", "query"):
+            words = words[1:]  # the E5 prefix carries no content
+        for w in words:
+            yield w
+            padded = f" {w} "
+            for i in range(len(padded) - 2):
+                yield padded[i : i + 3]
+
+    def _embed(self, text):
+        vec = [0.0] * self.dim
+        for feature in self._features(text):
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec))
+        return [v / norm for v in vec] if norm else vec
+
+    def encode(self, texts):
+        return [self._embed(t) for t in texts]
+
+
+class SocketEmbedder:
+    """Client for embed_service: same interface, the model lives in the service process.
+
+    name and dim are whatever the service reports, so vectors are
+    interchangeable with the in-process backend it wraps.
+    """
+
+    name = None  # known only after connecting
+    dim = None
+
+    def __init__(self, path=None):
+        from lorekit.support.embed_service import default_socket_path
+
+        self.path = path or default_socket_path()
+        self._lock = threading.Lock()
+        self._conn = None
+        info = self._request({"op": "info"})
+        self.name = info["name"]
+        self.dim = info["dim"]
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        self._conn = (sock, sock.makefile("rb"))
+
+    def _request(self, payload):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._conn is None:
+                        self._connect()
+                    sock, reader = self._conn
+                    sock.sendall(data)
+                    line = reader.readline()
+                    if not line:
+                        raise ConnectionError("embedding service closed the connection")
+                    break
+                except OSError:
+                    self._conn = None
+                    if attempt:
+                        raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"embedding service: {reply['error']}")
+        return reply
+
+    def encode(self, texts):
+        from lorekit.support.embed_service import unpack_vectors
+
+        texts = list(texts)
+        if not texts:
+            return []
+        return unpack_vectors(self._request({"op": "encode", "texts": texts})["vectors"], self.dim)
+
+
+BACKENDS = {
+    "sentence-transformers": SentenceTransformerEmbedder,
+    "onnx": OnnxEmbedder,
+    "hashing": HashingEmbedder,
+    "socket": SocketEmbedder,
+}
+
+
+def configured_backend(kind=None):
+    """Return the backend class selected by *kind* or LOREKIT_EMBEDDER, or None if unknown."""
+    kind = (kind or os.environ.get(EMBEDDER_ENV, "") or "sentence-transformers").lower()
+    return BACKENDS.get(kind)
+
+
+def load_embedder(kind=None):
+    """Instantiate the configured backend, or return None if it cannot load."""
+    cls = configured_backend(kind)
+    if cls is None:
+        return None
+    try:
+        return cls()
+    except Exception:
+        return None
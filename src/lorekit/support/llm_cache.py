@@ -0,0 +1,217 @@
+"""llm_cache.py -- Opt-in cache of LLM responses keyed by the exact prompt.
+
+NPC turns, combat intents, reactions and reflections are pure functions of
+their prompt as far as LoreKit is concerned. Identical prompts recur on
+retries, after turn_revert and in test runs, so with LOREKIT_LLM_CACHE set to
+a file path the responses are stored in a separate SQLite file and replayed.
+A cache file from a recorded run makes integration tests replayable offline.
+
+Entries are keyed by SHA-256 over (provider, model, system prompt, message);
+the assembled NPC context is part of the prompt, so any change to memories,
+time or state is a miss. Only successful responses are stored.
+
+    LOREKIT_LLM_CACHE      cache file (unset = disabled)
+    LOREKIT_LLM_CACHE_TTL  seconds an entry stays valid (default 7 days, 0 = forever)
+    LOREKIT_LLM_CACHE_MAX  entries kept; least recently used are evicted (default 5000)
+
+Callers asking for a fresh sample (fresh=True) skip the lookup; the new
+response replaces the stored one.
+
+Usage:
+    python -m lorekit.support.llm_cache stats|clear|purge [--path FILE]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+CACHE_ENV = "LOREKIT_LLM_CACHE"
+TTL_ENV = "LOREKIT_LLM_CACHE_TTL"
+MAX_ENV = "LOREKIT_LLM_CACHE_MAX"
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT    PRIMARY KEY,
+    kind        TEXT    NOT NULL,
+    model       TEXT    NOT NULL,
+    response    TEXT    NOT NULL,
+    created_at  REAL    NOT NULL,
+    used_at     REAL    NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_llm_cache_used ON llm_cache(used_at);
+"""
+
+# In-process counters per kind: hits, misses, bypassed, stored
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+_initialized: set[str] = set()
+
+
+def cache_path():
+    """Cache file from LOREKIT_LLM_CACHE, or None when caching is off."""
+    return os.environ.get(CACHE_ENV) or None
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+def make_key(provider, model, system_prompt, message):
+    payload = json.dumps([provider or "", model or "", system_prompt or "", message or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=5)
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _initialized.add(path)
+    return conn
+
+
+def _count(kind, field):
+    with _stats_lock:
+        counters = _stats.setdefault(kind, {"hits": 0, "misses": 0, "bypassed": 0, "stored": 0})
+        counters[field] += 1
+
+
+def get(provider, model, system_prompt, message, kind="npc", fresh=False):
+    """Cached response for this prompt, or None (disabled, miss, expired or fresh)."""
+    path = cache_path()
+    if path is None:
+        return None
+    if fresh:
+        _count(kind, "bypassed")
+        return None
+    key = make_key(provider, model, system_prompt, message)
+    ttl = _env_int(TTL_ENV, DEFAULT_TTL)
+    now = time.time()
+    try:
+        conn = _connect(path)
+        try:
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and (ttl <= 0 or now - row[1] <= ttl):
+                conn.execute("UPDATE llm_cache SET hits = hits + 1, used_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+                _count(kind, "hits")
+                return row[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass  # an unusable cache behaves like an empty one
+    _count(kind, "misses")
+    return None
+
+
+def put(provider, model, system_prompt, message, response, kind="npc"):
+    """Store a successful response and keep the file within its TTL and size limits."""
+    path = cache_path()
+    if path is None or not response:
+        return
+    key = make_key(provider, model, system_prompt, message)
+    ttl = _env_int(TTL_ENV, DEFAULT_TTL)
+    max_entries = _env_int(MAX_ENV, DEFAULT_MAX_ENTRIES)
+    now = time.time()
+    try:
+        conn = _connect(path)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, kind, model, response, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, model or "", response, now, now),
+            )
+            if ttl > 0:
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - ttl,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            if count > max_entries:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY used_at LIMIT ?)",
+                    (count - max_entries,),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return
+    _count(kind, "stored")
+
+
+def stats(path=None):
+    """Counters for this process plus what the cache file holds.
+
+    Returns {"session": {kind: {hits, misses, bypassed, stored}}, "entries": N,
+    "stored_hits": total hits recorded in the file, "by_kind": {kind: entries}}.
+    """
+    with _stats_lock:
+        result = {"session": {kind: dict(c) for kind, c in _stats.items()}}
+    path = path or cache_path()
+    result.update(entries=0, stored_hits=0, by_kind={})
+    if path and os.path.exists(path):
+        conn = _connect(path)
+        try:
+            count, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM llm_cache").fetchone()
+            result.update(entries=count, stored_hits=hits)
+            result["by_kind"] = dict(conn.execute("SELECT kind, COUNT(*) FROM llm_cache GROUP BY kind").fetchall())
+        finally:
+            conn.close()
+    return result
+
+
+def clear(path=None, expired_only=False):
+    """Delete all (or only expired) entries. Returns the number deleted."""
+    path = path or cache_path()
+    if not path or not os.path.exists(path):
+        return 0
+    conn = _connect(path)
+    try:
+        if expired_only:
+            ttl = _env_int(TTL_ENV, DEFAULT_TTL)
+            if ttl <= 0:
+                return 0
+            deleted = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - ttl,)).rowcount
+        else:
+            deleted = conn.execute("DELETE FROM llm_cache").rowcount
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the LoreKit LLM response cache.")
+    parser.add_argument("action", choices=("stats", "clear", "purge"), help="purge removes only expired entries")
+    parser.add_argument("--path", default=cache_path(), help=f"cache file (default: ${CACHE_ENV})")
+    args = parser.parse_args(argv)
+    if not args.path:
+        print(f"No cache file: set {CACHE_ENV} or pass --path", file=sys.stderr)
+        sys.exit(1)
+
+    if args.action == "stats":
+        info = stats(args.path)
+        print(f"{info['entries']} entries, {info['stored_hits']} hits recorded")
+        for kind, count in sorted(info["by_kind"].items()):
+            print(f"  {kind}: {count}")
+    else:
+        deleted = clear(args.path, expired_only=args.action == "purge")
+        print(f"Deleted {deleted} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ def usage():
     print("Actions:")
     print('  search <session_id> --query "<text>" [--source timeline|journal] [--n <N>]')
     print("  reindex <session_id>")
+    print("  storage <float|int8|bit> [--rerank 1]")
     sys.exit(1)
 
 
@@ -29,6 +30,7 @@ def main():
     actions = {
         "search": cmd_search,
         "reindex": cmd_reindex,
+        "storage": cmd_storage,
     }
 
     fn = actions.get(action)
@@ -87,11 +89,14 @@ def cmd_search(db, args):
 
 
 def reindex(db, session_id: int) -> str:
-    from lorekit.support.vectordb import index_journal, index_timeline, is_available
+    from lorekit.support.vectordb import flush_embeddings, index_many, is_available, reset_index_if_stale
 
     if not is_available():
         raise LoreKitError("sqlite-vec is not installed")
 
+    flush_embeddings(db)
+    index_reset = reset_index_if_stale(db)
+
     # Delete existing embeddings for this session
     emb_ids = [row[0] for row in db.execute("SELECT id FROM embeddings WHERE session_id = ?", (session_id,)).fetchall()]
     if emb_ids:
@@ -103,9 +108,8 @@ def reindex(db, session_id: int) -> str:
         db.execute(f"DELETE FROM embeddings WHERE id IN ({placeholders})", emb_ids)
         db.commit()
 
-    timeline_count = 0
     skipped_count = 0
-    journal_count = 0
+    items = []
 
     cur = db.execute(
         "SELECT id, entry_type, summary, created_at FROM timeline WHERE session_id = ?",
@@ -117,21 +121,24 @@ def reindex(db, session_id: int) -> str:
             if entry_type == "narration" and not summary:
                 skipped_count += 1
             continue
-        index_timeline(db, session_id, sql_id, entry_type, summary, created_at=created_at)
-        timeline_count += 1
+        items.append(("timeline", sql_id, session_id, summary, created_at, None))
+    timeline_count = len(items)
 
     cur = db.execute(
-        "SELECT id, entry_type, content, created_at FROM journal WHERE session_id = ?",
+        "SELECT id, content, created_at FROM journal WHERE session_id = ?",
         (session_id,),
     )
-    for row in cur.fetchall():
-        sql_id, entry_type, content, created_at = row
-        index_journal(db, session_id, sql_id, entry_type, content, created_at)
-        journal_count += 1
+    for sql_id, content, created_at in cur.fetchall():
+        items.append(("journal", sql_id, session_id, content, created_at, None))
+    journal_count = len(items) - timeline_count
+
+    index_many(db, items)
 
     msg = f"REINDEX_COMPLETE: {timeline_count} timeline entries, {journal_count} journal entries"
     if skipped_count:
         msg += f" ({skipped_count} narrations skipped -- no summary)"
+    if index_reset:
+        msg += "\nVector index rebuilt for the new embedding backend -- reindex other sessions too."
     return msg
 
 
@@ -140,5 +147,12 @@ def cmd_reindex(db, args):
     return reindex(db, int(sid))
 
 
+def cmd_storage(db, args):
+    from lorekit.support.vectordb import set_vector_storage
+
+    storage, p = parse_args(args, {"--rerank": ("rerank", False, "0")}, positional="storage")
+    return set_vector_storage(db, storage, p["rerank"] not in ("0", "", "false"))
+
+
 if __name__ == "__main__":
     main()
@@ -1,59 +1,195 @@
 """Vector database utilities for LoreKit semantic search.
 
 Uses sqlite-vec for vector storage inside the same SQLite database as
-structured data.  The sentence-transformers embedding model is optional;
+structured data.  The embedding backend (see embedders.py) is optional;
 if unavailable, indexing is silently skipped.
 """
 
-import io
+import atexit
+import hashlib
+import logging
+import math
+import os
+import queue
+import re
 import struct
-import sys
+import threading
+from collections import OrderedDict
+
+from lorekit.db import LoreKitError
+
+logger = logging.getLogger("lorekit.embeddings")
 
 _model = None
 _model_resolved = False
+_model_lock = threading.Lock()
+
+# Embedding cache counters (process-wide, see cache_stats)
+_cache_hits = 0
+_cache_misses = 0
+
+# In-memory LRU of query embeddings, keyed by (backend, normalized query)
+QUERY_CACHE_SIZE = 256
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+_query_hits = 0
+_query_misses = 0
 
 
 def _get_model():
-    """Return SentenceTransformer with multilingual-e5-small, or None."""
+    """Return the configured embedding backend (see embedders.load_embedder), or None."""
     global _model, _model_resolved
     if _model_resolved:
         return _model
-    old_stderr = sys.stderr
-    try:
-        import os
-
-        from sentence_transformers import SentenceTransformer
-
-        cache_dir = os.path.join(os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub")
-        model_dir = os.path.join(cache_dir, "models--intfloat--multilingual-e5-small")
-        if not os.path.isdir(model_dir):
-            print("Downloading embedding model (intfloat/multilingual-e5-small, ~488MB)... this only happens once.")
-
-        sys.stderr = io.StringIO()
-        _model = SentenceTransformer("intfloat/multilingual-e5-small")
-    except (ImportError, Exception):
-        _model = None
-    finally:
-        sys.stderr = old_stderr
-    _model_resolved = True
+    # Callers arriving while a (background) load is in progress wait for it
+    with _model_lock:
+        if not _model_resolved:
+            from lorekit.support.embedders import load_embedder
+
+            _model = load_embedder()
+            _model_resolved = True
     return _model
 
 
-def _embed_passages(texts):
-    """Embed document texts with 'passage: ' prefix. Returns list of lists, or None."""
-    model = _get_model()
-    if model is None:
+def preload_model():
+    """Start loading the embedding backend in a daemon thread and return immediately.
+
+    Anything that needs the model meanwhile blocks in _get_model() until the
+    load finishes; everything else (startup included) is unaffected.
+    """
+    if _model_resolved:
         return None
-    prefixed = [f"passage: {t}" for t in texts]
-    return model.encode(prefixed, normalize_embeddings=True).tolist()
+    thread = threading.Thread(target=_get_model, name="lorekit-model-load", daemon=True)
+    thread.start()
+    return thread
+
+
+def _active_backend():
+    """The loaded backend, or the configured backend class if not loaded yet (both carry name/dim)."""
+    if _model_resolved and _model is not None:
+        return _model
+    from lorekit.support.embedders import configured_backend
+
+    cls = configured_backend()
+    if cls is not None and cls.name is None:
+        return _get_model()  # e.g. the socket backend learns its name from the service
+    return cls
+
+
+def _backend_name():
+    """Id of the configured backend, known without loading it (embedding_cache key)."""
+    backend = _active_backend()
+    return backend.name if backend is not None else ""
+
+
+def _normalize(text):
+    """Collapse whitespace so trivially different copies share a cache entry."""
+    return " ".join(text.split())
+
+
+def _encode_cached(db, prefixed):
+    """Encode prefixed texts, consulting the embedding_cache table when db is given.
+
+    Returns list of lists, or None if the model is unavailable and a text is
+    not cached.
+    """
+    global _cache_hits, _cache_misses
+    if db is None:
+        model = _get_model()
+        if model is None:
+            return None
+        return model.encode(prefixed)
+
+    model_id = _backend_name()
+    hashes = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in prefixed]
+    found = {}
+    unique = list(dict.fromkeys(hashes))
+    for start in range(0, len(unique), 500):
+        chunk = unique[start : start + 500]
+        rows = db.execute(
+            f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+            (model_id, *chunk),
+        ).fetchall()
+        for text_hash, blob in rows:
+            found[text_hash] = list(struct.unpack(f"{len(blob) // 4}f", blob))
+
+    _cache_hits += sum(1 for h in hashes if h in found)
+    missing = {h: t for h, t in zip(hashes, prefixed) if h not in found}
+    if missing:
+        model = _get_model()
+        if model is None:
+            return None
+        _cache_misses += len(missing)
+        vectors = model.encode(list(missing.values()))
+        # Only commit if we opened the transaction; otherwise the caller owns it
+        owns_tx = not db.in_transaction
+        db.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (model, text_hash, vector) VALUES (?, ?, ?)",
+            [(model_id, h, _serialize(v)) for h, v in zip(missing, vectors)],
+        )
+        if owns_tx:
+            db.commit()
+        found.update(zip(missing, vectors))
+    return [found[h] for h in hashes]
+
+
+def _embed_passages(texts, db=None):
+    """Embed document texts with 'passage: ' prefix. Returns list of lists, or None."""
+    return _encode_cached(db, [f"passage: {_normalize(t)}" for t in texts])
 
 
-def _embed_query(text):
-    """Embed a query with 'query: ' prefix. Returns list of floats, or None."""
-    model = _get_model()
-    if model is None:
+def _embed_query(text, db=None):
+    """Embed a query with 'query: ' prefix. Returns list of floats, or None.
+
+    Repeated queries are answered from a bounded in-process LRU before the
+    embedding_cache table or the model are consulted.
+    """
+    global _query_hits, _query_misses
+    key = (_backend_name(), _normalize(text))
+    with _query_cache_lock:
+        vec = _query_cache.get(key)
+        if vec is not None:
+            _query_cache.move_to_end(key)
+            _query_hits += 1
+            return vec
+    vectors = _encode_cached(db, [f"query: {key[1]}"])
+    if vectors is None:
         return None
-    return model.encode(f"query: {text}", normalize_embeddings=True).tolist()
+    with _query_cache_lock:
+        _query_misses += 1
+        _query_cache[key] = vectors[0]
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    return vectors[0]
+
+
+def cache_stats():
+    """Return embedding cache hit/miss counters for this process."""
+    total = _cache_hits + _cache_misses
+    return {
+        "hits": _cache_hits,
+        "misses": _cache_misses,
+        "hit_rate": _cache_hits / total if total else 0.0,
+    }
+
+
+def query_cache_stats():
+    """Return query LRU hit/miss counters and occupancy for this process."""
+    total = _query_hits + _query_misses
+    return {
+        "hits": _query_hits,
+        "misses": _query_misses,
+        "hit_rate": _query_hits / total if total else 0.0,
+        "size": len(_query_cache),
+        "capacity": QUERY_CACHE_SIZE,
+    }
+
+
+def clear_query_cache():
+    """Drop every cached query embedding (e.g. after switching backends)."""
+    with _query_cache_lock:
+        _query_cache.clear()
 
 
 def _serialize(vec):
@@ -77,34 +213,424 @@ def _has_vec_table(db):
     return row is not None
 
 
-def _upsert_embedding(db, source, source_id, session_id, content, created_at=None, npc_id=None):
-    """Insert or update an embedding row and its vec0 entry."""
-    embeddings = _embed_passages([content])
+# Vectors written before the embedding_index table existed came from here.
+LEGACY_BACKEND = ("sentence-transformers:intfloat/multilingual-e5-small", 384)
 
-    # Upsert metadata row
-    db.execute(
-        "INSERT INTO embeddings (source, source_id, session_id, npc_id, content, created_at) "
-        "VALUES (?, ?, ?, ?, ?, ?) "
-        "ON CONFLICT(source, source_id) DO UPDATE SET content = excluded.content, npc_id = excluded.npc_id",
-        (source, source_id, session_id, npc_id, content, created_at or ""),
-    )
+STORAGE_ENV = "LOREKIT_VEC_STORAGE"
+RERANK_ENV = "LOREKIT_VEC_RERANK"
+STORAGE_MODES = ("float", "int8", "bit")
+# Quantized KNN fetches this many candidates per requested result before the float re-rank
+RERANK_OVERSAMPLE = 4
+
+# SQL expression turning a float32 blob parameter into the stored column type
+_VEC_PARAM = {
+    "float": "?",
+    "int8": "vec_quantize_int8(?, 'unit')",
+    "bit": "vec_quantize_binary(?)",
+}
+
+
+def _default_storage():
+    """Storage mode for a newly created index: (storage, rerank) from the environment."""
+    storage = os.environ.get(STORAGE_ENV, "").lower() or "float"
+    if storage not in STORAGE_MODES:
+        storage = "float"
+    rerank = os.environ.get(RERANK_ENV, "").lower() in ("1", "true", "yes", "on")
+    return storage, rerank and storage != "float"
 
+
+def _index_config(db):
+    """Return {backend, dim, storage, rerank} recorded for vec_embeddings, or None if unrecorded."""
     row = db.execute(
-        "SELECT id FROM embeddings WHERE source = ? AND source_id = ?",
-        (source, source_id),
+        "SELECT backend, dim, storage, rerank FROM embedding_index WHERE name = 'vec_embeddings'"
     ).fetchone()
-    emb_id = row[0]
-
-    # Update vec0 entry if we have embeddings and the virtual table exists
-    if embeddings is not None and _has_vec_table(db):
-        blob = _serialize(embeddings[0])
-        db.execute("DELETE FROM vec_embeddings WHERE rowid = ?", (emb_id,))
-        db.execute(
-            "INSERT INTO vec_embeddings (rowid, embedding) VALUES (?, ?)",
-            (emb_id, blob),
+    if row is not None:
+        return {"backend": row[0], "dim": row[1], "storage": row[2], "rerank": bool(row[3])}
+    if db.execute("SELECT 1 FROM vec_embeddings LIMIT 1").fetchone():
+        return {"backend": LEGACY_BACKEND[0], "dim": LEGACY_BACKEND[1], "storage": "float", "rerank": False}
+    return None
+
+
+def _create_vec_table(db, backend, storage, rerank):
+    """(Re)create an empty vec_embeddings for *backend* and record it in embedding_index."""
+    from lorekit.db import vec_table_sql
+
+    db.execute("DROP TABLE IF EXISTS vec_embeddings")
+    db.execute(vec_table_sql(backend.dim, storage, rerank))
+    db.execute(
+        "INSERT OR REPLACE INTO embedding_index (name, backend, dim, storage, rerank) "
+        "VALUES ('vec_embeddings', ?, ?, ?, ?)",
+        (backend.name, backend.dim, storage, int(rerank)),
+    )
+    return {"backend": backend.name, "dim": backend.dim, "storage": storage, "rerank": rerank}
+
+
+def _check_index(db):
+    """Ensure vec_embeddings was built by the active backend and return its config.
+
+    An empty, unrecorded index is (re)created with the storage mode from
+    LOREKIT_VEC_STORAGE / LOREKIT_VEC_RERANK; after that the recorded mode
+    wins. Raises LoreKitError on a backend or dimension mismatch
+    (recall_reindex rebuilds). Returns None if no backend is configured.
+    """
+    backend = _active_backend()
+    if backend is None:
+        return None
+    config = _index_config(db)
+    if config is None:
+        return _create_vec_table(db, backend, *_default_storage())
+    if (config["backend"], config["dim"]) != (backend.name, backend.dim):
+        raise LoreKitError(
+            f"Vector index was built with {config['backend']} (dim {config['dim']}) but the active embedder is "
+            f"{backend.name} (dim {backend.dim}) -- run recall_reindex to rebuild it"
         )
+    return config
+
+
+def reset_index_if_stale(db):
+    """Recreate vec_embeddings for the active backend if it was built by another one.
 
+    Keeps the recorded storage mode. Returns True if the index was reset
+    (every session then needs a reindex).
+    """
+    backend = _active_backend()
+    if backend is None or not _has_vec_table(db):
+        return False
+    config = _index_config(db)
+    if config is None or (config["backend"], config["dim"]) == (backend.name, backend.dim):
+        return False
+    _create_vec_table(db, backend, config["storage"], config["rerank"])
     db.commit()
+    return True
+
+
+def set_vector_storage(db, storage, rerank=False):
+    """Switch this database's vector storage to float, int8 or bit, re-indexing every row.
+
+    Vectors are re-encoded from the embeddings table (mostly embedding_cache
+    hits). Returns a summary string.
+    """
+    if storage not in STORAGE_MODES:
+        raise LoreKitError(f"Unknown vector storage: {storage} (expected one of: {', '.join(STORAGE_MODES)})")
+    backend = _active_backend()
+    if backend is None or not _has_vec_table(db):
+        raise LoreKitError("No embedding backend or vector table available")
+    rerank = bool(rerank) and storage != "float"
+    flush_embeddings(db)
+    _create_vec_table(db, backend, storage, rerank)
+    items = db.execute(
+        "SELECT source, source_id, session_id, content, created_at, npc_id FROM embeddings ORDER BY id"
+    ).fetchall()
+    count = index_many(db, [tuple(r) for r in items])
+    mode = f"{storage}+rerank" if rerank else storage
+    return f"VECTOR_STORAGE_SET: {mode} ({count} vectors re-indexed)"
+
+
+def _knn(db, config, query_vec, k, session_id, sources, npc_id=None):
+    """KNN inside one session's partition. Returns [(rowid, distance)] nearest first.
+
+    Quantized indexes with rerank over-fetch candidates and re-score them by
+    L2 distance on the stored float vectors, matching the float index.
+    """
+    fetch_k = k * RERANK_OVERSAMPLE if config["rerank"] else k
+    where = f"source IN ({','.join('?' * len(sources))})"
+    params = [_serialize(query_vec), fetch_k, session_id, *sources]
+    if npc_id is not None:
+        where += " AND npc_id = ?"
+        params.append(npc_id)
+    full = ", embedding_full" if config["rerank"] else ""
+    rows = db.execute(
+        f"SELECT rowid, distance{full} FROM vec_embeddings "
+        f"WHERE embedding MATCH {_VEC_PARAM[config['storage']]} AND k = ? AND session_id = ? AND {where} "
+        "ORDER BY distance",
+        params,
+    ).fetchall()
+    if not config["rerank"]:
+        # Put quantized distances on the float (unit-vector L2, 0..2) scale.
+        # int8 'unit' quantization multiplies every component by ~127. Sign bits
+        # of two unit vectors at angle t disagree in about t/pi of the
+        # dimensions, and such vectors lie 2*sin(t/2) apart.
+        if config["storage"] == "int8":
+            return [(r[0], r[1] / 127) for r in rows]
+        if config["storage"] == "bit":
+            return [(r[0], 2 * math.sin(math.pi * r[1] / (2 * config["dim"]))) for r in rows]
+        return [(r[0], r[1]) for r in rows]
+    rescored = []
+    for rowid, _, blob in rows:
+        vec = struct.unpack(f"{len(blob) // 4}f", blob)
+        rescored.append((rowid, sum((a - b) ** 2 for a, b in zip(vec, query_vec)) ** 0.5))
+    rescored.sort(key=lambda r: r[1])
+    return rescored[:k]
+
+
+def _dequantize(blob, storage, dim):
+    """Approximate float vector (unit length) from a stored int8/bit blob."""
+    if storage == "int8":
+        vec = [v / 127.0 for v in struct.unpack(f"{len(blob)}b", blob)]
+    else:
+        vec = [1.0 if blob[i // 8] >> (i % 8) & 1 else -1.0 for i in range(dim)]
+    norm = sum(v * v for v in vec) ** 0.5
+    return [v / norm for v in vec] if norm else vec
+
+
+def stored_vectors(db, emb_ids, as_array=False):
+    """Return {embedding id: float vector} as stored, whatever the storage mode.
+
+    With as_array (and NumPy installed) vectors are float32 arrays read
+    straight from the blobs instead of unpacked lists.
+    """
+    if not emb_ids or not _has_vec_table(db):
+        return {}
+    config = _index_config(db)
+    if config is None:
+        return {}
+    np = None
+    if as_array:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+    column = "embedding_full" if config["rerank"] else "embedding"
+    result = {}
+    ids = list(emb_ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        rows = db.execute(
+            f"SELECT rowid, {column} FROM vec_embeddings WHERE rowid IN ({','.join('?' * len(chunk))})", chunk
+        ).fetchall()
+        for rowid, blob in rows:
+            if not blob:
+                continue
+            if config["storage"] == "float" or config["rerank"]:
+                if np is not None:
+                    result[rowid] = np.frombuffer(blob, dtype=np.float32)
+                else:
+                    result[rowid] = list(struct.unpack(f"{len(blob) // 4}f", blob))
+            else:
+                result[rowid] = _dequantize(blob, config["storage"], config["dim"])
+    return result
+
+
+EMBED_BATCH_SIZE = 64
+
+
+def index_many(db, items, batch_size=EMBED_BATCH_SIZE, commit=True):
+    """Upsert many embeddings at once.
+
+    items: iterable of (source, source_id, session_id, content, created_at, npc_id).
+    Texts are encoded batch_size at a time and all rows are written in one
+    transaction. Pass commit=False when the caller owns the transaction.
+    Returns the number of rows indexed.
+    """
+    items = list(items)
+    if not items:
+        return 0
+
+    has_vec = _has_vec_table(db)
+    config = _check_index(db) if has_vec else None
+    if config is not None:
+        full = ", embedding_full" if config["rerank"] else ""
+        insert_sql = (
+            f"INSERT INTO vec_embeddings (rowid, session_id, source, npc_id, embedding{full}) "
+            f"VALUES (?, ?, ?, ?, {_VEC_PARAM[config['storage']]}{', ?' if full else ''})"
+        )
+    for start in range(0, len(items), batch_size):
+        chunk = items[start : start + batch_size]
+        embeddings = _embed_passages([content for _, _, _, content, _, _ in chunk], db)
+
+        emb_ids = []
+        for source, source_id, session_id, content, created_at, npc_id in chunk:
+            row = db.execute(
+                "INSERT INTO embeddings (source, source_id, session_id, npc_id, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(source, source_id) DO UPDATE SET content = excluded.content, npc_id = excluded.npc_id "
+                "RETURNING id",
+                (source, source_id, session_id, npc_id, content, created_at or ""),
+            ).fetchone()
+            emb_ids.append(row[0])
+
+        # Update vec0 entries if we have embeddings and the virtual table exists
+        if embeddings is not None and config is not None:
+            db.executemany("DELETE FROM vec_embeddings WHERE rowid = ?", [(i,) for i in emb_ids])
+            rows = []
+            for i, vec, (source, _, session_id, _, _, npc_id) in zip(emb_ids, embeddings, chunk):
+                blob = _serialize(vec)
+                rows.append(
+                    (i, session_id, source, npc_id or 0, blob, blob)
+                    if full
+                    else (i, session_id, source, npc_id or 0, blob)
+                )
+            db.executemany(insert_sql, rows)
+
+    if commit:
+        db.commit()
+    return len(items)
+
+
+ASYNC_ENV = "LOREKIT_ASYNC_EMBEDDINGS"
+
+
+def async_embeddings_enabled() -> bool:
+    """True when write paths should hand new text to the background embedder."""
+    return os.environ.get(ASYNC_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+# Tables holding the rows each embedding source points at
+SOURCE_TABLES = {"journal": "journal", "timeline": "timeline", "npc_memory": "npc_memories"}
+
+
+class EmbeddingWorker:
+    """Single worker thread that batch-encodes queued rows and upserts them.
+
+    Write paths enqueue (source, source_id, session_id, content, created_at,
+    npc_id) and return; the worker drains whatever has accumulated (up to
+    EMBED_BATCH_SIZE rows per database) and indexes it with index_many on its
+    own connection. A batch that fails (typically because another connection
+    held the write lock past the busy timeout) is logged and re-queued up to
+    MAX_ATTEMPTS times; rows still unindexed after that are picked up by the
+    next reindex.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, db_path, item, attempt=1):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="lorekit-embeddings", daemon=True)
+                self._thread.start()
+        self._queue.put((db_path, item, attempt))
+
+    def discard(self, db_path, source, source_ids):
+        """Drop queued rows for these source_ids. Returns how many were dropped.
+
+        Used by deletes, which must not wait for the worker: a caller inside a
+        write transaction would hold the lock the worker needs.
+        """
+        ids = set(source_ids)
+        q = self._queue
+        with q.mutex:
+            kept = [job for job in q.queue if not (job[0] == db_path and job[1][0] == source and job[1][1] in ids)]
+            dropped = len(q.queue) - len(kept)
+            if dropped:
+                q.queue.clear()
+                q.queue.extend(kept)
+                q.unfinished_tasks -= dropped
+                if not q.unfinished_tasks:
+                    q.all_tasks_done.notify_all()
+        return dropped
+
+    def pending(self):
+        """Approximate number of rows still waiting to be embedded."""
+        return self._queue.unfinished_tasks
+
+    def wait(self):
+        """Block until every queued row is indexed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            while len(jobs) < EMBED_BATCH_SIZE:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            by_path = {}
+            for db_path, item, attempt in jobs:
+                by_path.setdefault(db_path, []).append((item, attempt))
+            try:
+                self._index(by_path)
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    def _index(self, by_path):
+        from lorekit.db import get_db
+
+        for db_path, jobs in by_path.items():
+            items = [item for item, _ in jobs]
+            try:
+                db = get_db(db_path)
+                try:
+                    index_many(db, items, commit=False)
+                    _drop_orphans(db, items)
+                    db.commit()
+                finally:
+                    db.close()
+            except Exception as e:
+                retry = [(item, attempt + 1) for item, attempt in jobs if attempt < self.MAX_ATTEMPTS]
+                if retry:
+                    logger.warning("Embedding %d row(s) failed (%s); retrying", len(retry), e)
+                    for item, attempt in retry:
+                        self.submit(db_path, item, attempt)
+                if len(retry) < len(jobs):
+                    logger.error(
+                        "Giving up on %d embedding row(s) after %d attempts (%s); run recall_reindex to restore them",
+                        len(jobs) - len(retry),
+                        self.MAX_ATTEMPTS,
+                        e,
+                    )
+
+
+def _drop_orphans(db, items):
+    """Delete embeddings just written for rows that were deleted meanwhile.
+
+    Runs after index_many holds the write lock, so it sees every delete that
+    committed while the batch was being encoded or waiting for the lock.
+    """
+    by_source = {}
+    for source, source_id, *_ in items:
+        if source in SOURCE_TABLES:
+            by_source.setdefault(source, set()).add(source_id)
+    for source, ids in by_source.items():
+        ids = list(ids)
+        live = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            live.update(
+                r[0]
+                for r in db.execute(
+                    f"SELECT id FROM {SOURCE_TABLES[source]} WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        gone = [i for i in ids if i not in live]
+        if gone:
+            delete_embeddings(db, source, gone, commit=False)
+
+
+_worker = EmbeddingWorker()
+
+
+def flush_embeddings(db=None):
+    """Wait for queued embeddings. Called before anything reads or deletes vectors.
+
+    When *db* is inside a write transaction the worker cannot write until it
+    ends, so nothing is waited for; the queued rows land after the commit.
+    """
+    if db is not None and db.in_transaction:
+        return
+    _worker.wait()
+
+
+atexit.register(_worker.wait)
+
+
+def _db_path(db):
+    return db.execute("PRAGMA database_list").fetchone()[2]
+
+
+def _upsert_embedding(db, source, source_id, session_id, content, created_at=None, npc_id=None, commit=True):
+    """Insert or update an embedding row and its vec0 entry (queued when async embeddings are on)."""
+    item = (source, source_id, session_id, content, created_at, npc_id)
+    if async_embeddings_enabled():
+        _worker.submit(_db_path(db), item)
+        return
+    index_many(db, [item], commit=commit)
 
 
 def index_journal(db, session_id, sql_id, entry_type, content, created_at=None):
@@ -117,31 +643,43 @@ def index_timeline(db, session_id, sql_id, entry_type, summary, created_at=None)
     _upsert_embedding(db, "timeline", sql_id, session_id, summary, created_at)
 
 
-def index_npc_memory(db, session_id, npc_id, memory_id, content):
+def index_npc_memory(db, session_id, npc_id, memory_id, content, commit=True):
     """Upsert an NPC memory into the embeddings table."""
-    _upsert_embedding(db, "npc_memory", memory_id, session_id, content, npc_id=npc_id)
+    _upsert_embedding(db, "npc_memory", memory_id, session_id, content, npc_id=npc_id, commit=commit)
 
 
-def delete_npc_memories(db, memory_ids):
+def delete_npc_memories(db, memory_ids, commit=True):
     """Delete NPC memory embeddings."""
-    delete_embeddings(db, "npc_memory", memory_ids)
+    delete_embeddings(db, "npc_memory", memory_ids, commit=commit)
 
 
-def delete_embeddings(db, source, sql_ids):
+def delete_embeddings(db, source, sql_ids, commit=True):
     """Delete embeddings for the given source and source_ids."""
     if not sql_ids:
         return
-    for sql_id in sql_ids:
-        row = db.execute(
-            "SELECT id FROM embeddings WHERE source = ? AND source_id = ?",
-            (source, sql_id),
-        ).fetchone()
-        if row:
-            emb_id = row[0]
-            if _has_vec_table(db):
-                db.execute("DELETE FROM vec_embeddings WHERE rowid = ?", (emb_id,))
-            db.execute("DELETE FROM embeddings WHERE id = ?", (emb_id,))
-    db.commit()
+    sql_ids = list(sql_ids)
+    # Queued rows for these ids are dropped rather than waited for, so this
+    # is safe inside the caller's transaction.
+    _worker.discard(_db_path(db), source, sql_ids)
+    flush_embeddings(db)
+    has_vec = _has_vec_table(db)
+    for start in range(0, len(sql_ids), 500):
+        chunk = sql_ids[start : start + 500]
+        ph = ",".join("?" * len(chunk))
+        emb_ids = [
+            r[0]
+            for r in db.execute(
+                f"SELECT id FROM embeddings WHERE source = ? AND source_id IN ({ph})", (source, *chunk)
+            ).fetchall()
+        ]
+        if not emb_ids:
+            continue
+        ph = ",".join("?" * len(emb_ids))
+        if has_vec:
+            db.execute(f"DELETE FROM vec_embeddings WHERE rowid IN ({ph})", emb_ids)
+        db.execute(f"DELETE FROM embeddings WHERE id IN ({ph})", emb_ids)
+    if commit:
+        db.commit()
 
 
 def delete_timeline(db, sql_ids):
@@ -154,35 +692,33 @@ def search(query, session_id, db, collection_name=None, n_results=5):
 
     Returns a list of dicts with keys: source, id, content, distance, metadata.
     """
-    query_embedding = _embed_query(query)
+    flush_embeddings(db)
+    query_embedding = _embed_query(query, db)
     if query_embedding is None or not _has_vec_table(db):
         return []
+    config = _check_index(db)
+    if config is None:
+        return []
 
-    blob = _serialize(query_embedding)
     sources = [collection_name] if collection_name else ["timeline", "journal"]
 
-    # Over-fetch to account for session/source filtering
-    fetch_k = n_results * 10
-
-    rows = db.execute(
-        """
-        SELECT e.source, e.source_id, e.content, e.session_id, v.distance
-        FROM (
-            SELECT rowid, distance
-            FROM vec_embeddings
-            WHERE embedding MATCH ? AND k = ?
-        ) v
-        JOIN embeddings e ON e.id = v.rowid
-        WHERE e.session_id = ?
-          AND e.source IN ({})
-        """.format(",".join("?" * len(sources))),
-        (blob, fetch_k, session_id, *sources),
-    ).fetchall()
+    # session_id is the vec0 partition key and source a metadata column, so
+    # the KNN only ever visits this session's vectors.
+    hits = _knn(db, config, query_embedding, n_results, session_id, sources)
+    if not hits:
+        return []
+    distances = dict(hits)
+    found = {
+        r[0]: r[1:]
+        for r in db.execute(
+            f"SELECT id, source, source_id, content, session_id FROM embeddings WHERE id IN ({','.join('?' * len(hits))})",
+            list(distances),
+        ).fetchall()
+    }
+    rows = [(*found[rowid], distances[rowid]) for rowid, _ in hits if rowid in found]
 
     results = []
     for source, source_id, content, sid, distance in rows:
-        if len(results) >= n_results:
-            break
         results.append(
             {
                 "source": source,
@@ -199,32 +735,39 @@ def search(query, session_id, db, collection_name=None, n_results=5):
     return results
 
 
+def _fts_query(query):
+    """Turn free text into an FTS5 query: every word must appear, as a word prefix."""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
 def keyword_search(query, session_id, db, collection_name=None, n_results=5):
-    """Keyword search across timeline and/or journal via SQL LIKE.
+    """Keyword search across timeline and/or journal via FTS5, ranked by bm25().
 
     Returns a list of dicts with keys: source, id, content, distance, metadata.
+    distance is the bm25 score (lower is better).
     """
-    results = []
-    tables = []
-    if collection_name:
-        tables.append(collection_name)
-    else:
-        tables = ["timeline", "journal"]
+    match = _fts_query(query)
+    if not match:
+        return []
 
+    results = []
+    tables = [collection_name] if collection_name else ["timeline", "journal"]
     for table in tables:
         cur = db.execute(
-            f"SELECT id, entry_type, content, created_at FROM {table} "
-            "WHERE session_id = ? AND content LIKE ? ORDER BY id",
-            (session_id, f"%{query}%"),
+            f"SELECT t.id, t.entry_type, t.content, bm25({table}_fts) AS score "
+            f"FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+            f"WHERE {table}_fts MATCH ? AND t.session_id = ? "
+            "ORDER BY score LIMIT ?",
+            (match, session_id, n_results),
         )
-        for row in cur.fetchall():
-            sql_id, entry_type, content, created_at = row
+        for sql_id, entry_type, content, score in cur.fetchall():
             results.append(
                 {
                     "source": table,
                     "id": f"{table}_{sql_id}",
                     "content": content,
-                    "distance": 0.0,
+                    "distance": score,
                     "metadata": {
                         "session_id": str(session_id),
                         "entry_type": entry_type,
@@ -267,7 +810,7 @@ _DEFAULT_LIMITS = {"timeline": 10, "journal": 5}
 
 
 def hybrid_search(query, session_id, db, collection_name=None, n_results=0):
-    """Hybrid search combining keyword (SQL LIKE) and semantic (sqlite-vec) results.
+    """Hybrid search combining keyword (FTS5 bm25) and semantic (sqlite-vec) results.
 
     Uses Reciprocal Rank Fusion to merge rankings per collection.
     Each collection has a default result limit (timeline: 10, journal: 5).
@@ -197,6 +197,24 @@ def save_delete(session_id: int, name: str) -> str:
     return _run_with_db(_save_delete, session_id, name)
 
 
+@mcp.tool()
+def client_checkpoint_compact(session_id: int, keep_recent: int = -1, keep_every: int = -1) -> str:
+    """Prune old auto-saves and abandoned branches, then vacuum the database.
+    Named saves and the current position are always kept.
+
+    keep_recent: auto-saves to keep per branch (-1 = default policy).
+    keep_every: keep every Nth older auto-save, 0 drops them all (-1 = default policy).
+    """
+    from lorekit.support.checkpoint import RETAIN_EVERY, RETAIN_RECENT, compact_checkpoints
+
+    return _run_with_db(
+        compact_checkpoints,
+        session_id,
+        RETAIN_RECENT if keep_recent < 0 else keep_recent,
+        RETAIN_EVERY if keep_every < 0 else keep_every,
+    )
+
+
 @mcp.tool()
 def journal_add(session_id: int, type: str, content: str, narrative_time: str = "", scope: str = "participants") -> str:
     """Add a journal entry. Types: event, combat, discovery, npc, decision, note.
@@ -302,7 +320,7 @@ def turn_save(
     from lorekit.db import LoreKitError, require_db
     from lorekit.narrative.session import meta_set
     from lorekit.narrative.timeline import add as tl_add
-    from lorekit.support.checkpoint import create_checkpoint
+    from lorekit.support.checkpoint import async_checkpoints_enabled, create_checkpoint, create_checkpoint_async
 
     db = require_db()
     try:
@@ -378,8 +396,12 @@ def turn_save(
                     f"⚠ INCOMPLETE ROUND: {remaining} character(s) have not acted this round ({', '.join(names)})"
                 )
 
-        # Checkpoint after writing (the "approved" state after this turn)
-        create_checkpoint(db, session_id)
+        # Checkpoint after writing (the "approved" state after this turn).
+        # In async mode only the snapshot read happens here; the write is queued.
+        if async_checkpoints_enabled():
+            create_checkpoint_async(db, session_id)
+        else:
+            create_checkpoint(db, session_id)
 
         return "\n".join(results)
     except LoreKitError as e:
@@ -55,6 +55,17 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
 
     Returns (system_prompt, model, npc_name) or None if NPC/session not found.
     """
+    result = _assemble_npc_prompt(db, npc_id, session_id, gm_message)
+    return result[1:] if result else None
+
+
+def _assemble_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") -> tuple[str, str, str, str] | None:
+    """Like _build_npc_prompt, but also returns the stable prefix of the system prompt.
+
+    Returns (prefix, system_prompt, model, npc_name); system_prompt starts
+    with prefix (guides, world, sheet, core identity). The warm pool spawns
+    processes with the prefix as their system prompt.
+    """
     from lorekit.npc.prefetch import assemble_context
 
     db.row_factory = sqlite3.Row
@@ -74,7 +85,7 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
 
     # Attributes
     attrs = db.execute(
-        "SELECT category, key, value FROM character_attributes WHERE character_id = ?",
+        "SELECT category, key, value FROM character_attributes WHERE character_id = ? ORDER BY category, key",
         (npc_id,),
     ).fetchall()
 
@@ -108,7 +119,7 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
 
     # Inventory
     items = db.execute(
-        "SELECT name, quantity, equipped FROM character_inventory WHERE character_id = ?",
+        "SELECT name, quantity, equipped FROM character_inventory WHERE character_id = ? ORDER BY id",
         (npc_id,),
     ).fetchall()
     inv_lines = []
@@ -122,7 +133,7 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
 
     # Abilities
     abilities = db.execute(
-        "SELECT name, uses, description FROM character_abilities WHERE character_id = ?",
+        "SELECT name, uses, description FROM character_abilities WHERE character_id = ? ORDER BY id",
         (npc_id,),
     ).fetchall()
     ability_lines = [f"  {ab['name']} ({ab['uses']}): {ab['description']}" for ab in abilities]
@@ -144,7 +155,7 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
 
     # Get narrative time and lore_ meta keys
     meta_rows = db.execute(
-        "SELECT key, value FROM session_meta WHERE session_id = ?",
+        "SELECT key, value FROM session_meta WHERE session_id = ? ORDER BY id",
         (session_id,),
     ).fetchall()
     narrative_time = ""
@@ -180,10 +191,10 @@ def _build_npc_prompt(db, npc_id: int, session_id: int, gm_message: str = "") ->
     if lore_lines:
         lore_section = "\n\nWorld lore:\n" + chr(10).join(lore_lines)
 
-    system_prompt = f"""You are {npc_name}, {personality}.{gender_line}
+    world = f"""World setting: {setting}{lore_section}
+Rule system: {system_type}"""
 
-World setting: {setting}{lore_section}
-Rule system: {system_type}
+    sheet = f"""You are {npc_name}, {personality}.{gender_line}
 
 Your attributes:
 {chr(10).join(identity_lines) if identity_lines else "  (none)"}
@@ -192,13 +203,19 @@ Your inventory:
 {chr(10).join(inv_lines) if inv_lines else "  (none)"}
 
 Your abilities:
-{chr(10).join(ability_lines) if ability_lines else "  (none)"}
+{chr(10).join(ability_lines) if ability_lines else "  (none)"}"""
 
-{"Active conditions:" + chr(10) + chr(10).join(combat_lines) + chr(10) if combat_lines else ""}{prefetch_result.context}
+    conditions = "Active conditions:\n" + chr(10).join(combat_lines) if combat_lines else ""
 
-{guides}"""
+    # Ordered from most to least stable -- guides (every NPC), world (every NPC
+    # in the session), sheet and core identity (this NPC) -- so consecutive
+    # calls share a byte-identical prefix the model backend can cache.
+    # Per-call content (conditions, recalled memories, events) comes last;
+    # the message itself is the user turn.
+    prefix = "\n\n".join(s for s in (guides, world, sheet, prefetch_result.identity) if s)
+    system_prompt = "\n\n".join(s for s in (prefix, conditions, prefetch_result.recall) if s)
 
-    return system_prompt, model, npc_name
+    return prefix, system_prompt, model, npc_name
 
 
 def _npc_log(msg: str):
@@ -296,8 +313,121 @@ def _is_npc_http_server_running() -> bool:
         return False
 
 
+def _run_provider_turn(provider, system_prompt: str, model: str, message: str, prefix: str | None = None) -> str:
+    """One provider NPC turn, on a warm pooled process when LOREKIT_NPC_POOL is set.
+
+    prefix is the stable start of system_prompt (see _assemble_npc_prompt)
+    that pooled processes are keyed and spawned with.
+    """
+    from lorekit.npc.pool import get_pool
+
+    pool = get_pool(provider)
+    if pool is not None:
+        return pool.run(system_prompt, model, message, prefix=prefix)
+    return provider.run_ephemeral_sync(system_prompt, model, message)
+
+
+def _provider_label() -> str:
+    """Provider name for LLM cache keys (the legacy CLI path is 'claude-cli')."""
+    from lorekit._mcp_app import get_provider_name
+
+    return get_provider_name() or "claude-cli"
+
+
+def _call_npc(
+    provider,
+    system_prompt: str,
+    model: str,
+    message: str,
+    npc_name: str,
+    fresh: bool = False,
+    prefix: str | None = None,
+) -> tuple[str, str | None, bool]:
+    """Run one NPC agent turn. Returns (response_text, error, cached).
+
+    error is an "ERROR: ..." string or None; cached is True when the answer
+    was replayed from the LLM response cache (LOREKIT_LLM_CACHE), which
+    callers pass on to process_npc_response as replayed=True.
+    fresh=True skips the lookup and stores the new answer. prefix is passed
+    on to _run_provider_turn.
+    """
+    from lorekit.support import llm_cache
+
+    label = _provider_label()
+    cached = llm_cache.get(label, model, system_prompt, message, kind="npc", fresh=fresh)
+    if cached is not None:
+        _npc_log(f"[INTERACT] ← {npc_name} (cached): {cached}")
+        return cached, None, True
+    response_text, error = _call_npc_uncached(provider, system_prompt, model, message, npc_name, prefix)
+    if error is None:
+        llm_cache.put(label, model, system_prompt, message, response_text, kind="npc")
+    return response_text, error, False
+
+
+def _call_npc_uncached(
+    provider, system_prompt: str, model: str, message: str, npc_name: str, prefix: str | None = None
+) -> tuple[str, str | None]:
+    if provider:
+        try:
+            response_text = _run_provider_turn(provider, system_prompt, model, message, prefix)
+            _npc_log(f"[INTERACT] ← {npc_name}: {response_text}")
+            return response_text, None
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            return "", f"ERROR: NPC process failed: {e}"
+
+    project_root = _project_root()
+
+    # NPC is a pure narrative agent — no MCP tools needed
+    cmd = [
+        "claude",
+        "-p",
+        "--verbose",
+        "--output-format",
+        "stream-json",
+        "--no-session-persistence",
+        "--permission-mode",
+        "bypassPermissions",
+        "--tools",
+        "",
+        "--disable-slash-commands",
+        "--model",
+        model,
+        "--system-prompt",
+        system_prompt,
+    ]
+    cmd.append(message)
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=120,
+            cwd=project_root,
+            stdin=subprocess.DEVNULL,
+        )
+        if proc.returncode != 0:
+            stderr = proc.stderr.strip()
+            return "", f"ERROR: NPC process failed: {stderr or 'unknown error'}"
+
+        response_text, _tool_names = _parse_npc_stream(proc.stdout, npc_name)
+        return response_text, None
+    except subprocess.TimeoutExpired:
+        return "", "ERROR: NPC response timed out"
+    except FileNotFoundError:
+        return "", "ERROR: 'claude' CLI not found. Ensure it is installed and on PATH."
+
+
+def _narrative_time(db, session_id: int) -> str:
+    meta_row = db.execute(
+        "SELECT value FROM session_meta WHERE session_id = ? AND key = 'narrative_time'",
+        (session_id,),
+    ).fetchone()
+    return meta_row[0] if meta_row else ""
+
+
 @mcp.tool()
-def npc_interact(session_id: int, npc_id: int | str, message: str) -> str:
+def npc_interact(session_id: int, npc_id: int | str, message: str, fresh: bool = False) -> str:
     """Make an NPC speak in character. Spawns an ephemeral AI process for the NPC.
 
     The GM should call this whenever the player wants to talk to an NPC.
@@ -305,83 +435,37 @@ def npc_interact(session_id: int, npc_id: int | str, message: str) -> str:
     Returns the NPC's in-character response.
 
     npc_id: numeric ID or NPC name (case-insensitive).
+    fresh: ask for a new answer even if an identical prompt was cached.
     """
     from lorekit.db import LoreKitError, require_db
 
     db = require_db()
     try:
         npc_id = _resolve_character(db, npc_id, session_id)
-        result = _build_npc_prompt(db, npc_id, session_id, gm_message=message)
+        result = _assemble_npc_prompt(db, npc_id, session_id, gm_message=message)
         if not result:
             return f"ERROR: NPC #{npc_id} not found in session #{session_id}"
-        system_prompt, model, npc_name = result
+        prefix, system_prompt, model, npc_name = result
     finally:
         db.close()
 
     _npc_log(f"[USER] → {npc_name}: {message}")
 
-    provider = _get_provider()
-    if provider:
-        try:
-            response_text = provider.run_ephemeral_sync(system_prompt, model, message)
-            _npc_log(f"[INTERACT] ← {npc_name}: {response_text}")
-        except (RuntimeError, subprocess.TimeoutExpired) as e:
-            return f"ERROR: NPC process failed: {e}"
-    else:
-        project_root = _project_root()
-
-        # NPC is a pure narrative agent — no MCP tools needed
-        cmd = [
-            "claude",
-            "-p",
-            "--verbose",
-            "--output-format",
-            "stream-json",
-            "--no-session-persistence",
-            "--permission-mode",
-            "bypassPermissions",
-            "--tools",
-            "",
-            "--disable-slash-commands",
-            "--model",
-            model,
-            "--system-prompt",
-            system_prompt,
-        ]
-        cmd.append(message)
-
-        try:
-            proc = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120,
-                cwd=project_root,
-                stdin=subprocess.DEVNULL,
-            )
-            if proc.returncode != 0:
-                stderr = proc.stderr.strip()
-                return f"ERROR: NPC process failed: {stderr or 'unknown error'}"
-
-            response_text, _tool_names = _parse_npc_stream(proc.stdout, npc_name)
-        except subprocess.TimeoutExpired:
-            return "ERROR: NPC response timed out"
-        except FileNotFoundError:
-            return "ERROR: 'claude' CLI not found. Ensure it is installed and on PATH."
+    response_text, error, cached = _call_npc(
+        _get_provider(), system_prompt, model, message, npc_name, fresh=fresh, prefix=prefix
+    )
+    if error:
+        return error
 
     # Post-process: extract memories/state from NPC response
     from lorekit.npc.postprocess import process_npc_response
 
     db2 = require_db()
     try:
-        # Get narrative time from session meta
-        meta_row = db2.execute(
-            "SELECT value FROM session_meta WHERE session_id = ? AND key = 'narrative_time'",
-            (session_id,),
-        ).fetchone()
-        narrative_time = meta_row[0] if meta_row else ""
-
-        clean_text = process_npc_response(db2, session_id, npc_id, response_text, npc_name, narrative_time)
+        narrative_time = _narrative_time(db2, session_id)
+        clean_text = process_npc_response(
+            db2, session_id, npc_id, response_text, npc_name, narrative_time, replayed=cached
+        )
     except Exception:
         clean_text = response_text  # fallback: return raw text
     finally:
@@ -390,6 +474,110 @@ def npc_interact(session_id: int, npc_id: int | str, message: str) -> str:
     return clean_text.strip() or f"{npc_name} says nothing."
 
 
+@mcp.tool()
+def npc_interact_many(session_id: int, npc_ids: str, message: str, fresh: bool = False) -> str:
+    """Make several NPCs respond to the same moment at once (e.g. a tavern scene).
+
+    Like npc_interact, but the NPC agents run concurrently, so the call takes
+    about as long as the slowest NPC instead of the sum. Each NPC still gets
+    its own pre-fetched context; memories and state changes from all responses
+    are saved in one transaction. Responses come back in the order given,
+    each under a "[Name]" header.
+
+    npc_ids: JSON array of NPC IDs or names, e.g. '[12, "Bartender Bob"]'.
+    fresh: ask for new answers even if identical prompts were cached.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lorekit.db import LoreKitError, require_db
+    from lorekit.npc.config import INTERACT_CONCURRENCY
+    from lorekit.npc.postprocess import process_npc_response
+
+    try:
+        refs = json.loads(npc_ids)
+    except (json.JSONDecodeError, TypeError):
+        refs = None
+    if not isinstance(refs, list) or not refs:
+        return "ERROR: npc_ids must be a non-empty JSON array of NPC IDs or names"
+
+    # 1. Resolve NPCs and assemble their contexts (sequential, DB only)
+    entries = []
+    seen = set()
+    db = require_db()
+    try:
+        for ref in refs:
+            entry = {"name": str(ref), "response": "", "error": None}
+            if isinstance(ref, bool) or not isinstance(ref, (int, str)):
+                entry["error"] = "ERROR: NPC references must be IDs or names"
+                entries.append(entry)
+                continue
+            try:
+                npc_id = _resolve_character(db, ref, session_id)
+                if npc_id in seen:
+                    continue
+                seen.add(npc_id)
+                entry["npc_id"] = npc_id
+                result = _assemble_npc_prompt(db, npc_id, session_id, gm_message=message)
+                if not result:
+                    entry["error"] = f"ERROR: NPC #{npc_id} not found in session #{session_id}"
+                else:
+                    entry["prefix"], entry["prompt"], entry["model"], entry["name"] = result
+            except LoreKitError as e:
+                entry["error"] = f"ERROR: {e}"
+            entries.append(entry)
+    finally:
+        db.close()
+
+    # 2. Run the NPC agents concurrently
+    ready = [e for e in entries if not e["error"]]
+    if ready:
+        provider = _get_provider()
+        for e in ready:
+            _npc_log(f"[USER] → {e['name']}: {message}")
+        with ThreadPoolExecutor(max_workers=min(INTERACT_CONCURRENCY, len(ready))) as pool:
+            futures = [
+                (e, pool.submit(_call_npc, provider, e["prompt"], e["model"], message, e["name"], fresh, e["prefix"]))
+                for e in ready
+            ]
+            for e, future in futures:
+                e["response"], e["error"], e["cached"] = future.result()
+
+    # 3. Post-process every response in one transaction
+    answered = [e for e in entries if not e["error"]]
+    if answered:
+        db2 = require_db()
+        try:
+            narrative_time = _narrative_time(db2, session_id)
+            # Outer transaction: the per-NPC savepoints nest inside it instead
+            # of each committing on RELEASE.
+            db2.execute("BEGIN")
+            for e in answered:
+                db2.execute("SAVEPOINT npc_response")
+                try:
+                    e["response"] = process_npc_response(
+                        db2,
+                        session_id,
+                        e["npc_id"],
+                        e["response"],
+                        e["name"],
+                        narrative_time,
+                        commit=False,
+                        replayed=e["cached"],
+                    )
+                except Exception:
+                    db2.execute("ROLLBACK TO npc_response")  # fallback: return raw text
+                db2.execute("RELEASE npc_response")
+            db2.commit()
+        finally:
+            db2.close()
+
+    sections = []
+    for e in entries:
+        text = e["error"] or e["response"].strip() or f"{e['name']} says nothing."
+        sections.append(f"[{e['name']}]\n{text}")
+    return "\n\n".join(sections)
+
+
 @mcp.tool()
 def npc_memory_add(
     session_id: int,
@@ -431,8 +619,11 @@ def npc_memory_add(
 
 
 @mcp.tool()
-def npc_reflect(session_id: int, npc_id: int | str) -> str:
-    """Trigger reflection for a single NPC. Generates insights from accumulated memories."""
+def npc_reflect(session_id: int, npc_id: int | str, fresh: bool = False) -> str:
+    """Trigger reflection for a single NPC. Generates insights from accumulated memories.
+
+    fresh: ask for new insights even if an identical prompt was cached.
+    """
     from lorekit.db import LoreKitError, require_db
 
     db = require_db()
@@ -444,7 +635,7 @@ def npc_reflect(session_id: int, npc_id: int | str) -> str:
             return f"ERROR: Character #{npc_id} is not an NPC"
         from lorekit.npc.reflect import generate_reflection
 
-        result = generate_reflection(db, session_id, npc_id)
+        result = generate_reflection(db, session_id, npc_id, fresh=fresh)
         return f"NPC_REFLECTED: {result['npc_name']} — {result['reflections_stored']} reflections, {result['rules_added']} behavioral rules"
     except (LoreKitError, subprocess.SubprocessError, OSError) as e:
         return f"ERROR: {e}"
@@ -484,7 +675,7 @@ def entry_untag(source: str, source_id: int, entity_type: str, entity_id: int) -
 
 
 @mcp.tool()
-def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
+def npc_combat_turn(session_id: int, npc_id: int | str, fresh: bool = False) -> str:
     """Execute a full NPC combat turn: decision + movement + action + advance.
 
     Asks the NPC agent what to do (with combat context: positions, relative
@@ -496,6 +687,8 @@ def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
     initiative.
 
     npc_id: numeric ID or NPC name (case-insensitive).
+    fresh: ask for a new decision (and reaction choices) even if an identical
+    prompt was cached.
     """
     from lorekit.db import LoreKitError, require_db
 
@@ -514,10 +707,10 @@ def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
         combat_context = build_combat_context(db, npc_id, session_id, combat_cfg)
 
         # Build NPC prompt with combat context as invocation message
-        result = _build_npc_prompt(db, npc_id, session_id, gm_message=combat_context)
+        result = _assemble_npc_prompt(db, npc_id, session_id, gm_message=combat_context)
         if not result:
             return f"ERROR: NPC #{npc_id} not found in session #{session_id}"
-        system_prompt, model, npc_name = result
+        prefix, system_prompt, model, npc_name = result
     except LoreKitError as e:
         return f"ERROR: {e}"
     finally:
@@ -525,10 +718,17 @@ def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
 
     _npc_log(f"[COMBAT] → {npc_name}: combat turn\n{combat_context}")
 
+    from lorekit.support import llm_cache
+
+    label = _provider_label()
     provider = _get_provider()
-    if provider:
+    cached = llm_cache.get(label, model, system_prompt, combat_context, kind="combat", fresh=fresh)
+    if cached is not None:
+        response_text = cached
+        _npc_log(f"[COMBAT] ← {npc_name} response (cached): {response_text}")
+    elif provider:
         try:
-            response_text = provider.run_ephemeral_sync(system_prompt, model, combat_context)
+            response_text = _run_provider_turn(provider, system_prompt, model, combat_context, prefix)
             _npc_log(f"[COMBAT] ← {npc_name} response: {response_text}")
         except (RuntimeError, subprocess.TimeoutExpired) as e:
             return f"ERROR: NPC process failed: {e}"
@@ -573,6 +773,8 @@ def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
             return "ERROR: NPC response timed out"
         except FileNotFoundError:
             return "ERROR: 'claude' CLI not found."
+    if cached is None:
+        llm_cache.put(label, model, system_prompt, combat_context, response_text, kind="combat")
 
     # Parse structured intent from NPC response
     from cruncher.system_pack import load_system_pack
@@ -608,6 +810,7 @@ def npc_combat_turn(session_id: int, npc_id: int | str) -> str:
             intent,
             combat_cfg,
             system_path,
+            fresh=fresh,
         )
         lines.extend(mech_lines)
     except LoreKitError as e:
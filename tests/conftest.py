@@ -47,6 +47,14 @@ def _isolate_db(tmp_path, monkeypatch):
     init_schema(db)
 
 
+@pytest.fixture(autouse=True)
+def _reset_query_cache():
+    """Query embeddings are cached per process; start every test cold."""
+    from lorekit.support.vectordb import clear_query_cache
+
+    clear_query_cache()
+
+
 @pytest.fixture
 def make_session():
     """Factory that creates a session and returns its integer ID."""
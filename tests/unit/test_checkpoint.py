@@ -9,6 +9,7 @@ pytest.importorskip("sqlite_vec")
 
 from lorekit.tools.character import character_build, character_sheet_update, character_view  # noqa: E402
 from lorekit.tools.narrative import (  # noqa: E402
+    client_checkpoint_compact,
     journal_add,
     journal_list,
     manual_save,
@@ -17,6 +18,7 @@ from lorekit.tools.narrative import (  # noqa: E402
     save_load,
     save_rename,
     timeline_list,
+    timeline_set_summary,
     turn_advance,
     turn_revert,
     turn_save,
@@ -680,3 +682,348 @@ def test_revert_advance_with_compressed_deltas(make_session, make_character):
     turn_advance(session_id=sid)
     view = character_view(character_id=cid)
     assert "LEVEL: 10" in view
+
+
+# -- Compaction --
+
+
+def _snapshot_states(session_id):
+    from lorekit.support.checkpoint import reconstruct_state
+
+    db = _get_db()
+    ids = [r[0] for r in db.execute("SELECT id FROM checkpoints WHERE session_id = ?", (session_id,)).fetchall()]
+    states = {cp_id: reconstruct_state(db, cp_id) for cp_id in ids}
+    db.close()
+    return states
+
+
+def test_compact_keeps_recent_and_every_kth(make_session, make_character):
+    sid = make_session()
+    cid = make_character(sid, name="Hero", level=1)
+    for i in range(1, 13):
+        character_sheet_update(character_id=cid, level=i)
+        turn_save(session_id=sid, narration=f"Turn {i}.", summary=f"T{i}")
+    before = _snapshot_states(sid)
+    assert len(before) == 13
+
+    result = client_checkpoint_compact(session_id=sid, keep_recent=3, keep_every=4)
+    assert result.startswith("CHECKPOINTS_COMPACTED: removed 7 checkpoint(s)")
+    assert "reclaimed" in result
+
+    # Survivors still reconstruct to exactly the state they had before
+    after = _snapshot_states(sid)
+    assert len(after) == 6
+    for cp_id, state in after.items():
+        assert state == before[cp_id]
+
+
+def test_compact_is_idempotent(make_session):
+    sid = make_session()
+    for i in range(12):
+        turn_save(session_id=sid, narration=f"Turn {i}.", summary=f"T{i}")
+    client_checkpoint_compact(session_id=sid, keep_recent=3, keep_every=4)
+    count = _checkpoint_count(sid)
+    assert client_checkpoint_compact(session_id=sid, keep_recent=3, keep_every=4) == (
+        "CHECKPOINTS_COMPACTED: nothing to compact"
+    )
+    assert _checkpoint_count(sid) == count
+
+
+def test_compact_keep_every_zero_drops_earlier_survivors(make_session):
+    sid = make_session()
+    for i in range(12):
+        turn_save(session_id=sid, narration=f"Turn {i}.", summary=f"T{i}")
+    client_checkpoint_compact(session_id=sid, keep_recent=3, keep_every=4)
+    assert _checkpoint_count(sid) > 3
+
+    client_checkpoint_compact(session_id=sid, keep_recent=3, keep_every=0)
+    assert _checkpoint_count(sid) == 3
+
+
+def test_compact_preserves_named_saves_and_undo(make_session, make_character):
+    sid = make_session()
+    cid = make_character(sid, name="Hero", level=1)
+    turn_save(session_id=sid, narration="Turn 1.", summary="T1")
+    character_sheet_update(character_id=cid, level=7)
+    turn_save(session_id=sid, narration="Level seven.", summary="L7")
+    manual_save(session_id=sid, name="Level seven")
+    for i in range(6):
+        turn_save(session_id=sid, narration=f"More {i}.", summary=f"M{i}")
+    character_sheet_update(character_id=cid, level=9)
+    turn_save(session_id=sid, narration="Level nine.", summary="L9")
+
+    client_checkpoint_compact(session_id=sid, keep_recent=2, keep_every=0)
+
+    assert "Level seven" in save_list(session_id=sid)
+    assert "TURN_REVERTED" in turn_revert(session_id=sid)
+    save_load(session_id=sid, name="Level seven")
+    assert "LEVEL: 7" in character_view(character_id=cid)
+
+
+def test_compact_drops_unreachable_path_after_fork(make_session):
+    sid = make_session()
+    turn_save(session_id=sid, narration="Turn 1.", summary="T1")
+    turn_save(session_id=sid, narration="Turn 2.", summary="T2")
+    manual_save(session_id=sid, name="Old path")
+    turn_revert(session_id=sid)
+    turn_save(session_id=sid, narration="Alt.", summary="Alt")  # forks
+    save_delete(session_id=sid, name="Old path")  # nothing keeps the old path alive now
+
+    result = client_checkpoint_compact(session_id=sid)
+    assert "removed 1 checkpoint(s) and 0 branch(es)" in result
+    assert "Alt" in timeline_list(session_id=sid)
+    assert "TURN_REVERTED" in turn_revert(session_id=sid)
+
+
+def test_compact_drops_abandoned_branches(make_session):
+    sid = make_session()
+    turn_save(session_id=sid, narration="Turn 1.", summary="T1")
+    turn_save(session_id=sid, narration="Turn 2.", summary="T2")
+    manual_save(session_id=sid, name="Main")
+    turn_revert(session_id=sid)
+    turn_save(session_id=sid, narration="Alt.", summary="Alt")  # forks
+    manual_save(session_id=sid, name="Side")
+    save_load(session_id=sid, name="Main")
+    save_delete(session_id=sid, name="Side")  # the side branch is now unreachable
+
+    result = client_checkpoint_compact(session_id=sid)
+    assert "1 branch(es)" in result
+
+    db = _get_db()
+    branches = db.execute("SELECT COUNT(*) FROM checkpoint_branches WHERE session_id = ?", (sid,)).fetchone()[0]
+    db.close()
+    assert branches == 1
+    assert "Turn 2" in timeline_list(session_id=sid)
+    assert "TURN_REVERTED" in turn_revert(session_id=sid)
+
+
+def test_compact_prunes_unreferenced_archive_rows(make_session):
+    sid = make_session()
+    turn_save(session_id=sid, narration="Turn 1.", summary="T1")
+    turn_save(session_id=sid, narration="Turn 2.", summary="T2")
+    manual_save(session_id=sid, name="Main")
+    turn_revert(session_id=sid)
+    turn_save(session_id=sid, narration="Alt.", summary="Alt")  # forks
+    journal_add(session_id=sid, type="note", content="Side note")
+    turn_save(session_id=sid, narration="Alt 2.", summary="Alt2")
+    manual_save(session_id=sid, name="Side")
+    save_load(session_id=sid, name="Main")
+
+    def archived():
+        db = _get_db()
+        counts = [
+            db.execute(f"SELECT COUNT(*) FROM {table}_archive WHERE session_id = ?", (sid,)).fetchone()[0]
+            for table in ("timeline", "journal")
+        ]
+        db.close()
+        return counts
+
+    assert archived() == [2, 1]
+    # "Side" still points at the archived rows, so they stay
+    assert client_checkpoint_compact(session_id=sid) == "CHECKPOINTS_COMPACTED: nothing to compact"
+    assert archived() == [2, 1]
+
+    save_delete(session_id=sid, name="Side")
+    result = client_checkpoint_compact(session_id=sid)
+    assert "1 branch(es), pruned 3 archived row(s)" in result
+    assert archived() == [0, 0]
+    assert "Turn 2" in timeline_list(session_id=sid)
+    assert "TURN_REVERTED" in turn_revert(session_id=sid)
+    assert "Turn 1" in timeline_list(session_id=sid)
+
+
+def test_compact_reports_reclaimed_bytes(make_session):
+    sid = make_session()
+    for i in range(30):
+        journal_add(session_id=sid, type="note", content=f"Note {i} " + "x" * 2000)
+        turn_save(session_id=sid, narration=f"Turn {i}.", summary=f"T{i}")
+    result = client_checkpoint_compact(session_id=sid, keep_recent=1, keep_every=0)
+    reclaimed = int(result.rsplit("reclaimed ", 1)[1].split()[0])
+    assert reclaimed > 0
+
+
+# -- Background writer --
+
+
+def test_async_checkpoints_match_sync_order(make_session, make_character, monkeypatch):
+    """Queued checkpoints land in capture order and hold the state at capture time."""
+    import time
+
+    from lorekit.support import checkpoint
+
+    monkeypatch.setenv(checkpoint.ASYNC_ENV, "1")
+    real_write = checkpoint._write_checkpoint
+
+    def slow_write(*args):
+        time.sleep(0.02)  # let the queue back up while the game keeps changing
+        return real_write(*args)
+
+    monkeypatch.setattr(checkpoint, "_write_checkpoint", slow_write)
+
+    sid = make_session()
+    cid = make_character(sid, name="Hero", level=1)
+    for level in range(1, 6):
+        character_sheet_update(character_id=cid, level=level)
+        turn_save(session_id=sid, narration=f"Turn {level}.", summary=f"T{level}")
+    checkpoint.flush_checkpoints()
+
+    db = _get_db()
+    rows = db.execute("SELECT id, parent_id FROM checkpoints WHERE session_id = ? ORDER BY id", (sid,)).fetchall()
+    levels = [
+        next(c["level"] for c in checkpoint.reconstruct_state(db, cp_id)["characters"] if c["id"] == cid)
+        for cp_id, _ in rows
+    ]
+    db.close()
+    assert levels == [1, 1, 2, 3, 4, 5]  # #0 is the pre-game state
+    assert [parent for _, parent in rows[1:]] == [cp_id for cp_id, _ in rows[:-1]]
+
+
+def test_async_revert_flushes_queue(make_session, make_character, monkeypatch):
+    from lorekit.support import checkpoint
+
+    monkeypatch.setenv(checkpoint.ASYNC_ENV, "1")
+    sid = make_session()
+    cid = make_character(sid, name="Hero", level=1)
+    turn_save(session_id=sid, narration="Turn 1.", summary="T1")
+    character_sheet_update(character_id=cid, level=5)
+    turn_save(session_id=sid, narration="Turn 2.", summary="T2")
+    character_sheet_update(character_id=cid, level=9)
+    turn_save(session_id=sid, narration="Turn 3.", summary="T3")
+
+    assert "TURN_REVERTED" in turn_revert(session_id=sid)
+    assert "LEVEL: 5" in character_view(character_id=cid)
+    assert _checkpoint_count(sid) == 4
+
+
+# -- Branch history --
+
+
+def _reference_history(db, branch_id):
+    """The original list-based walk, kept as an oracle for the CTE."""
+    parent, fork_cp = db.execute(
+        "SELECT parent_branch_id, fork_checkpoint_id FROM checkpoint_branches WHERE id = ?", (branch_id,)
+    ).fetchone()
+    own = [r[0] for r in db.execute("SELECT id FROM checkpoints WHERE branch_id = ? ORDER BY id", (branch_id,))]
+    if parent is None:
+        return own
+    inherited = _reference_history(db, parent)
+    if fork_cp in inherited:
+        inherited = inherited[: inherited.index(fork_cp) + 1]
+    return inherited + own
+
+
+def test_branch_history_through_nested_forks(make_session):
+    from lorekit.support.checkpoint import get_branch_history
+
+    sid = make_session()
+    for i in range(3):
+        turn_save(session_id=sid, narration=f"Main {i}.", summary=f"M{i}")
+    manual_save(session_id=sid, name="Main")
+    turn_revert(session_id=sid, steps=2)
+    for i in range(3):
+        turn_save(session_id=sid, narration=f"Side {i}.", summary=f"S{i}")
+    manual_save(session_id=sid, name="Side")
+    turn_revert(session_id=sid, steps=4)  # walks back past the first fork point
+    turn_save(session_id=sid, narration="Deep.", summary="D")
+
+    db = _get_db()
+    branch_ids = [r[0] for r in db.execute("SELECT id FROM checkpoint_branches WHERE session_id = ?", (sid,))]
+    assert len(branch_ids) == 3
+    for branch_id in branch_ids:
+        assert get_branch_history(db, sid, branch_id) == _reference_history(db, branch_id)
+    db.close()
+
+    assert "TURN_REVERTED" in turn_revert(session_id=sid, steps=10)
+    assert "Nothing to revert" in turn_revert(session_id=sid)
+
+
+# -- Timeline/journal high-water marks --
+
+
+def test_snapshot_stores_marks_not_rows(make_session):
+    from lorekit.support.checkpoint import snapshot_session
+
+    sid = make_session()
+    for i in range(40):
+        turn_save(session_id=sid, narration=f"Turn {i}.", summary=f"T{i}")
+        journal_add(session_id=sid, type="note", content=f"Note {i}")
+
+    db = _get_db()
+    snap = snapshot_session(db, sid)
+    db.close()
+    assert "timeline" not in snap and "journal" not in snap
+    marks = {m["id"]: m["islands"] for m in snap["narrative_marks"]}
+    assert len(marks["timeline"]) == 1 and len(marks["journal"]) == 1
+    assert snap["timeline_edits"] == []
+
+
+def test_revert_restores_edited_summary(make_session):
+    sid = make_session()
+    turn_save(session_id=sid, narration="The gate opens.", summary="Gate opens")
+    db = _get_db()
+    tid = db.execute("SELECT MAX(id) FROM timeline WHERE session_id = ?", (sid,)).fetchone()[0]
+    db.close()
+    timeline_set_summary(timeline_id=tid, summary="Gate creaks open")
+    turn_save(session_id=sid, narration="They walk in.", summary="Enter")
+
+    def summary():
+        db = _get_db()
+        row = db.execute("SELECT summary FROM timeline WHERE id = ?", (tid,)).fetchone()
+        db.close()
+        return row[0]
+
+    turn_revert(session_id=sid)
+    assert summary() == "Gate opens"
+
+    turn_advance(session_id=sid)
+    assert summary() == "Gate creaks open"
+    assert "They walk in." in timeline_list(session_id=sid)
+
+
+def test_branch_rows_stay_separate_after_switching_back(make_session):
+    """Rows written on one branch never leak into another branch's restore."""
+    sid = make_session()
+    turn_save(session_id=sid, narration="Common.", summary="C")
+    manual_save(session_id=sid, name="Fork here")
+    turn_save(session_id=sid, narration="Path A.", summary="A")
+    manual_save(session_id=sid, name="A")
+    save_load(session_id=sid, name="Fork here")
+    turn_save(session_id=sid, narration="Path B.", summary="B")
+    manual_save(session_id=sid, name="B")
+    save_load(session_id=sid, name="A")
+    turn_save(session_id=sid, narration="Path A continues.", summary="A2")
+
+    save_load(session_id=sid, name="B")
+    listing = timeline_list(session_id=sid)
+    assert "Common." in listing and "Path B." in listing
+    assert "Path A." not in listing and "Path A continues." not in listing
+
+    save_load(session_id=sid, name="A")
+    listing = timeline_list(session_id=sid)
+    assert "Path A." in listing
+    assert "Path B." not in listing and "Path A continues." not in listing
+
+
+def test_restore_legacy_full_snapshot(make_session):
+    """Checkpoints written before marks existed still carry full rows."""
+    from lorekit.support.checkpoint import restore_snapshot, snapshot_session
+
+    sid = make_session()
+    turn_save(session_id=sid, narration="Kept.", summary="K")
+    turn_save(session_id=sid, narration="Dropped.", summary="D")
+    db = _get_db()
+    snap = snapshot_session(db, sid)
+    del snap["narrative_marks"], snap["timeline_edits"]
+    kept = db.execute(
+        "SELECT id, entry_type, content, summary, narrative_time, scope, created_at FROM timeline "
+        "WHERE session_id = ? AND content = 'Kept.'",
+        (sid,),
+    ).fetchone()
+    keys = ("id", "entry_type", "content", "summary", "narrative_time", "scope", "created_at")
+    snap["timeline"] = [dict(zip(keys, kept))]
+    snap["journal"] = []
+    restore_snapshot(db, sid, snap)
+    db.close()
+
+    listing = timeline_list(session_id=sid)
+    assert "Kept." in listing and "Dropped." not in listing
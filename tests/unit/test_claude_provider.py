@@ -120,3 +120,57 @@ async def test_spawn_ephemeral_yields_chunks():
 async def _aiter_lines(text: str):
     for line in text.splitlines():
         yield line.encode() + b"\n"
+
+
+# -- spawn_pooled / PooledProcess --
+
+# Stand-in for a warm CLI: reads one stream-json user message, echoes its content back.
+_ECHO_AGENT = """
+import json, sys
+msg = json.loads(sys.stdin.readline())
+text = msg["message"]["content"]
+print(json.dumps({"type": "stream_event", "event": {"type": "content_block_delta",
+      "delta": {"type": "text_delta", "text": text}}}), flush=True)
+print(json.dumps({"type": "result", "is_error": False}), flush=True)
+sys.stdin.read()
+"""
+
+
+def test_pooled_process_sends_context_before_message():
+    import sys
+
+    from lorekit.providers.claude.provider import PooledProcess
+
+    proc = subprocess.Popen([sys.executable, "-c", _ECHO_AGENT], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    pooled = PooledProcess(proc)
+    try:
+        assert pooled.alive
+        text = pooled.send_sync("Hello?", "You recall the bridge.", timeout=10)
+        assert text == "<context>\nYou recall the bridge.\n</context>\n\nHello?"
+    finally:
+        pooled.stop()
+    assert not pooled.alive
+
+
+def test_pooled_process_exit_raises():
+    import sys
+
+    from lorekit.providers.claude.provider import PooledProcess
+
+    proc = subprocess.Popen([sys.executable, "-c", "pass"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    proc.wait()
+    pooled = PooledProcess(proc)
+    with pytest.raises(RuntimeError):
+        pooled.send_sync("msg", timeout=10)
+    pooled.stop()
+
+
+def test_spawn_pooled_uses_stream_json_input():
+    with patch("subprocess.Popen") as mock_popen:
+        mock_popen.return_value.stdout = []
+        ClaudeCLI().spawn_pooled("sonnet", "You are Grom.")
+    cmd = mock_popen.call_args[0][0]
+    assert cmd[0] == "claude"
+    assert cmd[cmd.index("--system-prompt") + 1] == "You are Grom."
+    assert cmd[cmd.index("--input-format") + 1] == "stream-json"
+    assert "--no-session-persistence" in cmd
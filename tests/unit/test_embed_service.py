@@ -0,0 +1,77 @@
+"""Tests for the shared embedding service and its socket client."""
+
+import threading
+
+import pytest
+
+from lorekit.support.embed_service import EmbeddingServer
+from lorekit.support.embedders import HashingEmbedder, SocketEmbedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(len(texts))
+        return super().encode(texts)
+
+
+@pytest.fixture
+def service(tmp_path):
+    backend = CountingEmbedder()
+    server = EmbeddingServer(str(tmp_path / "embed.sock"), backend)
+    server.batcher.window = 0.2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, backend
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_matches_in_process_backend(service):
+    server, backend = service
+    client = SocketEmbedder(server.server_address)
+    assert (client.name, client.dim) == (backend.name, backend.dim)
+    vec = client.encode(["passage: The dragon sleeps"])[0]
+    expected = HashingEmbedder().encode(["passage: The dragon sleeps"])[0]
+    assert vec == pytest.approx(expected, abs=1e-6)
+    assert client.encode([]) == []
+
+
+def test_concurrent_clients_share_batches(service):
+    server, backend = service
+    clients = [SocketEmbedder(server.server_address) for _ in range(6)]
+    results = [None] * len(clients)
+
+    def run(i):
+        results[i] = clients[i].encode([f"query: note {i}"])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(clients))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert all(r is not None and len(r) == 1 for r in results)
+    assert sum(backend.batches) == 6
+    assert len(backend.batches) < 6  # requests were coalesced
+
+
+def test_socket_backend_selected_by_env(service, monkeypatch):
+    from lorekit.support.embedders import load_embedder
+
+    server, backend = service
+    monkeypatch.setenv("LOREKIT_EMBEDDER", "socket")
+    monkeypatch.setenv("LOREKIT_EMBED_SOCKET", server.server_address)
+    client = load_embedder()
+    assert isinstance(client, SocketEmbedder)
+    assert client.name == backend.name
+
+
+def test_socket_backend_unavailable_without_service(tmp_path, monkeypatch):
+    from lorekit.support.embedders import load_embedder
+
+    monkeypatch.setenv("LOREKIT_EMBED_SOCKET", str(tmp_path / "missing.sock"))
+    assert load_embedder("socket") is None
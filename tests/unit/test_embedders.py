@@ -0,0 +1,263 @@
+"""Tests for embedding backends and backend/index bookkeeping."""
+
+import math
+import random
+
+import pytest
+
+from lorekit.support.embedders import HashingEmbedder, configured_backend, load_embedder
+
+
+def test_hashing_is_deterministic_and_normalized():
+    emb = HashingEmbedder()
+    a, b = emb.encode(["passage: The dragon sleeps", "passage: The dragon sleeps"])
+    assert a == b
+    assert len(a) == 384
+    assert math.isclose(sum(v * v for v in a), 1.0, rel_tol=1e-9)
+
+
+def test_hashing_ranks_lexical_overlap():
+    emb = HashingEmbedder()
+    q, near, far = emb.encode(
+        ["query: dragon lair", "passage: The dragon returns to its lair", "passage: Bread prices"]
+    )
+
+    def dot(x, y):
+        return sum(i * j for i, j in zip(x, y))
+
+    assert dot(q, near) > dot(q, far)
+
+
+def test_hashing_custom_dim_changes_name():
+    emb = HashingEmbedder(dim=64)
+    assert emb.dim == 64
+    assert emb.name == "hashing-v1:64"
+    assert len(emb.encode(["x"])[0]) == 64
+
+
+def test_backend_selected_by_env(monkeypatch):
+    monkeypatch.setenv("LOREKIT_EMBEDDER", "hashing")
+    assert configured_backend() is HashingEmbedder
+    assert isinstance(load_embedder(), HashingEmbedder)
+    monkeypatch.setenv("LOREKIT_EMBEDDER", "nope")
+    assert load_embedder() is None
+
+
+def test_backend_mismatch_detected_and_reindex_rebuilds(make_session, monkeypatch):
+    pytest.importorskip("sqlite_vec")
+    from lorekit.db import LoreKitError, require_db
+    from lorekit.support import vectordb
+    from lorekit.tools.narrative import journal_add
+    from lorekit.tools.utility import recall_reindex
+
+    def use(backend):
+        monkeypatch.setattr(vectordb, "_model", backend)
+        monkeypatch.setattr(vectordb, "_model_resolved", True)
+
+    use(HashingEmbedder())
+    sid = make_session()
+    journal_add(session_id=sid, type="note", content="The dragon sleeps under the hill")
+
+    db = require_db()
+    try:
+        assert db.execute("SELECT backend, dim FROM embedding_index").fetchone() == ("hashing-v1:384", 384)
+        use(HashingEmbedder(dim=64))
+        with pytest.raises(LoreKitError, match="recall_reindex"):
+            vectordb.search("dragon", sid, db)
+    finally:
+        db.close()
+
+    result = recall_reindex(session_id=sid)
+    assert "1 journal entries" in result
+    assert "Vector index rebuilt" in result
+
+    db = require_db()
+    try:
+        assert db.execute("SELECT backend, dim FROM embedding_index").fetchone() == ("hashing-v1:64", 64)
+        assert vectordb.search("dragon", sid, db)[0]["content"] == "The dragon sleeps under the hill"
+    finally:
+        db.close()
+
+
+# -- Quantized storage --
+
+
+def _use_hashing(monkeypatch):
+    from lorekit.support import vectordb
+
+    monkeypatch.setattr(vectordb, "_model", HashingEmbedder())
+    monkeypatch.setattr(vectordb, "_model_resolved", True)
+
+
+NOTES = [
+    "The dragon sleeps under the hill",
+    "Merchants haggle over silk in the harbor market",
+    "A storm batters the lighthouse all night",
+    "The dragon's hoard glitters with stolen crowns",
+    "Wolves howl beyond the frozen river",
+]
+
+
+@pytest.mark.parametrize("storage,rerank", [("int8", False), ("int8", True), ("bit", True)])
+def test_quantized_storage_matches_float_top_hit(make_session, monkeypatch, storage, rerank):
+    pytest.importorskip("sqlite_vec")
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+    from lorekit.tools.narrative import journal_add
+
+    _use_hashing(monkeypatch)
+    sid = make_session()
+    for note in NOTES:
+        journal_add(session_id=sid, type="note", content=note)
+
+    db = require_db()
+    try:
+        float_hits = [r["content"] for r in vectordb.search("dragon hoard", sid, db, n_results=2)]
+        result = vectordb.set_vector_storage(db, storage, rerank)
+        assert "5 vectors re-indexed" in result
+        config = db.execute("SELECT storage, rerank FROM embedding_index").fetchone()
+        assert tuple(config) == (storage, int(rerank))
+        hits = [r["content"] for r in vectordb.search("dragon hoard", sid, db, n_results=2)]
+        assert hits[0] == float_hits[0]
+        if rerank:
+            assert hits == float_hits
+        stored = vectordb.stored_vectors(db, [1])[1]
+        assert len(stored) == 384
+        assert math.isclose(sum(v * v for v in stored), 1.0, rel_tol=1e-4)
+    finally:
+        db.close()
+
+
+def test_bit_distances_are_on_the_float_scale(make_session, monkeypatch):
+    pytest.importorskip("sqlite_vec")
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+    from lorekit.tools.narrative import journal_add
+
+    class DenseEmbedder(HashingEmbedder):
+        # Sign bits only carry the angle for dense vectors; hashing ones are mostly zeros.
+        def _embed(self, text):
+            vec = [0.0] * self.dim
+            for feature in self._features(text):
+                rng = random.Random(feature)
+                vec = [v + rng.gauss(0, 1) for v in vec]
+            norm = math.sqrt(sum(v * v for v in vec))
+            return [v / norm for v in vec]
+
+    monkeypatch.setattr(vectordb, "_model", DenseEmbedder())
+    monkeypatch.setattr(vectordb, "_model_resolved", True)
+    sid = make_session()
+    for note in NOTES:
+        journal_add(session_id=sid, type="note", content=note)
+
+    db = require_db()
+    try:
+        float_dist = {r["id"]: r["distance"] for r in vectordb.search("dragon hoard", sid, db, n_results=5)}
+        vectordb.set_vector_storage(db, "bit")
+        bit_dist = {r["id"]: r["distance"] for r in vectordb.search("dragon hoard", sid, db, n_results=5)}
+    finally:
+        db.close()
+    assert sorted(bit_dist) == sorted(float_dist)
+    for key, dist in float_dist.items():
+        assert abs(bit_dist[key] - dist) < 0.1
+
+
+def test_stored_vectors_as_arrays_match_lists(make_session, monkeypatch):
+    pytest.importorskip("sqlite_vec")
+    pytest.importorskip("numpy")
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+    from lorekit.tools.narrative import journal_add
+
+    _use_hashing(monkeypatch)
+    sid = make_session()
+    for note in NOTES:
+        journal_add(session_id=sid, type="note", content=note)
+
+    db = require_db()
+    try:
+        lists = vectordb.stored_vectors(db, [1, 2, 3])
+        arrays = vectordb.stored_vectors(db, [1, 2, 3], as_array=True)
+    finally:
+        db.close()
+    assert sorted(arrays) == sorted(lists) == [1, 2, 3]
+    for rowid, vec in lists.items():
+        assert arrays[rowid].tolist() == vec
+
+
+def test_save_load_survives_a_stale_index(make_session, monkeypatch):
+    """Switching embedders without recall_reindex must not block restoring game state."""
+    pytest.importorskip("sqlite_vec")
+    from lorekit.support import vectordb
+    from lorekit.tools.narrative import manual_save, save_load, timeline_list, turn_revert, turn_save
+
+    _use_hashing(monkeypatch)
+    sid = make_session()
+    turn_save(session_id=sid, narration="Turn 1.", summary="The dragon sleeps")
+    turn_save(session_id=sid, narration="Turn 2.", summary="The dragon wakes")
+    manual_save(session_id=sid, name="Awake")
+    turn_revert(session_id=sid)
+    assert "Turn 2." not in timeline_list(session_id=sid)
+
+    monkeypatch.setattr(vectordb, "_model", HashingEmbedder(dim=128))
+    result = save_load(session_id=sid, name="Awake")
+    assert not result.startswith("ERROR"), result
+    assert "Turn 2." in timeline_list(session_id=sid)
+
+
+def test_new_index_takes_storage_from_env(make_session, monkeypatch):
+    pytest.importorskip("sqlite_vec")
+    from lorekit.db import require_db
+    from lorekit.tools.narrative import journal_add
+
+    _use_hashing(monkeypatch)
+    monkeypatch.setenv("LOREKIT_VEC_STORAGE", "bit")
+    sid = make_session()
+    journal_add(session_id=sid, type="note", content="The dragon sleeps")
+
+    db = require_db()
+    try:
+        assert tuple(db.execute("SELECT storage, rerank FROM embedding_index").fetchone()) == ("bit", 0)
+        ddl = db.execute("SELECT sql FROM sqlite_master WHERE name = 'vec_embeddings'").fetchone()[0]
+        assert "bit[384]" in ddl
+    finally:
+        db.close()
+
+
+# -- Background model loading --
+
+
+def test_preload_runs_in_background_and_callers_wait(monkeypatch):
+    import threading
+    import time
+
+    from lorekit.support import embedders, vectordb
+
+    release = threading.Event()
+    calls = []
+
+    def slow_load(kind=None):
+        calls.append(kind)
+        release.wait(5)
+        return HashingEmbedder()
+
+    monkeypatch.setattr(embedders, "load_embedder", slow_load)
+    monkeypatch.setattr(vectordb, "_model", None)
+    monkeypatch.setattr(vectordb, "_model_resolved", False)
+
+    start = time.perf_counter()
+    thread = vectordb.preload_model()
+    assert time.perf_counter() - start < 1.0  # returns before the model is ready
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(vectordb._get_model()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not got  # blocked on the in-progress load
+    release.set()
+    waiter.join(5)
+    thread.join(5)
+
+    assert isinstance(got[0], HashingEmbedder)
+    assert vectordb._get_model() is got[0]
+    assert len(calls) == 1
@@ -21,6 +21,7 @@ def test_creates_all_tables():
             "SELECT name FROM sqlite_master WHERE type='table' "
             "AND name NOT LIKE 'sqlite_%' "
             "AND name NOT LIKE 'vec_embeddings_%' "  # sqlite-vec shadow tables
+            "AND name NOT LIKE '%_fts_%' "  # FTS5 shadow tables
             "ORDER BY name"
         ).fetchall()
     ]
@@ -35,11 +36,17 @@ def test_creates_all_tables():
         "checkpoint_branches",
         "checkpoints",
         "combat_state",
+        "embedding_cache",
+        "embedding_index",
         "embeddings",
         "encounter_state",
         "encounter_zones",
+        "entity_versions",
         "entry_entities",
         "journal",
+        "journal_archive",
+        "journal_fts",
+        "memory_entities",
         "npc_core",
         "npc_memories",
         "pending_resolutions",
@@ -49,6 +56,8 @@ def test_creates_all_tables():
         "stories",
         "story_acts",
         "timeline",
+        "timeline_archive",
+        "timeline_fts",
         "vec_embeddings",
         "zone_adjacency",
     ]
@@ -74,3 +83,83 @@ def test_characters_has_region_id_column():
     cols = [row[1] for row in conn.execute("PRAGMA table_info(characters)").fetchall()]
     conn.close()
     assert "region_id" in cols
+
+
+def test_vec_table_migrates_to_partitions():
+    """A pre-partition vec_embeddings table is rebuilt with session/source columns, keeping vectors."""
+    import struct
+
+    import pytest
+
+    pytest.importorskip("sqlite_vec")
+    from lorekit.db import get_db, init_schema
+
+    path = os.environ["LOREKIT_DB"]
+    conn = get_db(path)
+    conn.execute("DROP TABLE vec_embeddings")
+    conn.execute("CREATE VIRTUAL TABLE vec_embeddings USING vec0(embedding float[384])")
+    conn.execute("INSERT INTO sessions (name, setting, system_type) VALUES ('S', 'W', 'basic')")
+    emb_id = conn.execute(
+        "INSERT INTO embeddings (source, source_id, session_id, content) VALUES ('journal', 1, 1, 'x')"
+    ).lastrowid
+    conn.execute(
+        "INSERT INTO vec_embeddings (rowid, embedding) VALUES (?, ?)", (emb_id, struct.pack("384f", *([0.5] * 384)))
+    )
+    conn.commit()
+    conn.close()
+
+    init_schema(path)
+
+    conn = get_db(path)
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'vec_embeddings'").fetchone()[0]
+    row = conn.execute("SELECT rowid, session_id, source, npc_id FROM vec_embeddings").fetchone()
+    conn.close()
+    assert "partition key" in ddl
+    assert tuple(row) == (emb_id, 1, "journal", 0)
+
+
+def test_fts_index_backfilled_on_migration():
+    """Databases created before FTS5 get the index built from existing rows."""
+    from lorekit.db import get_db, init_schema
+
+    path = os.environ["LOREKIT_DB"]
+    conn = get_db(path)
+    for table in ("timeline", "journal"):
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER {table}_fts_{suffix}")
+        conn.execute(f"DROP TABLE {table}_fts")
+    conn.execute("INSERT INTO sessions (name, setting, system_type) VALUES ('S', 'W', 'basic')")
+    conn.execute("INSERT INTO journal (session_id, entry_type, content) VALUES (1, 'note', 'Old lighthouse')")
+    conn.commit()
+    conn.close()
+
+    init_schema(path)
+
+    conn = get_db(path)
+    hits = conn.execute("SELECT rowid FROM journal_fts WHERE journal_fts MATCH 'lighthouse'").fetchall()
+    conn.close()
+    assert len(hits) == 1
+
+
+def test_memory_entities_backfilled_on_migration():
+    """NPC memories written before memory_entities existed get indexed."""
+    from lorekit.db import get_db, init_schema
+
+    path = os.environ["LOREKIT_DB"]
+    conn = get_db(path)
+    conn.execute("DROP TABLE memory_entities")
+    conn.execute("INSERT INTO sessions (name, setting, system_type) VALUES ('S', 'W', 'basic')")
+    conn.execute("INSERT INTO characters (session_id, name, type) VALUES (1, 'Mara', 'npc')")
+    conn.execute(
+        "INSERT INTO npc_memories (session_id, npc_id, content, memory_type, entities, narrative_time) "
+        "VALUES (1, 1, 'Met the smith', 'experience', '[\"Smith\", \" Old Town \"]', 'day 1')"
+    )
+    conn.commit()
+    conn.close()
+
+    init_schema(path)
+
+    conn = get_db(path)
+    rows = conn.execute("SELECT memory_id, npc_id, entity FROM memory_entities ORDER BY entity").fetchall()
+    conn.close()
+    assert rows == [(1, 1, "old town"), (1, 1, "smith")]
@@ -0,0 +1,163 @@
+"""Tests for support/llm_cache.py -- the opt-in LLM response cache."""
+
+import sqlite3
+
+import pytest
+
+from lorekit.support import llm_cache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm_cache.db")
+    monkeypatch.setenv(llm_cache.CACHE_ENV, path)
+    monkeypatch.delenv(llm_cache.TTL_ENV, raising=False)
+    monkeypatch.delenv(llm_cache.MAX_ENV, raising=False)
+    llm_cache.reset_stats()
+    yield path
+    llm_cache.reset_stats()
+
+
+def test_disabled_without_env(monkeypatch):
+    monkeypatch.delenv(llm_cache.CACHE_ENV, raising=False)
+    llm_cache.put("claude", "sonnet", "sys", "msg", "answer")
+    assert llm_cache.get("claude", "sonnet", "sys", "msg") is None
+
+
+def test_hit_after_put_and_key_covers_every_part(cache):
+    llm_cache.put("claude", "sonnet", "You are Bob.", "Hello", "Hi there.")
+    assert llm_cache.get("claude", "sonnet", "You are Bob.", "Hello") == "Hi there."
+    assert llm_cache.get("claude", "haiku", "You are Bob.", "Hello") is None
+    assert llm_cache.get("claude", "sonnet", "You are Mira.", "Hello") is None
+    assert llm_cache.get("claude", "sonnet", "You are Bob.", "Goodbye") is None
+    assert llm_cache.get("other", "sonnet", "You are Bob.", "Hello") is None
+
+    info = llm_cache.stats()
+    assert info["session"]["npc"] == {"hits": 1, "misses": 4, "bypassed": 0, "stored": 1}
+    assert info["entries"] == 1
+    assert info["stored_hits"] == 1
+
+
+def test_fresh_bypasses_lookup_and_replaces(cache):
+    llm_cache.put("claude", "sonnet", "sys", "msg", "first", kind="reflection")
+    assert llm_cache.get("claude", "sonnet", "sys", "msg", kind="reflection", fresh=True) is None
+    llm_cache.put("claude", "sonnet", "sys", "msg", "second", kind="reflection")
+    assert llm_cache.get("claude", "sonnet", "sys", "msg", kind="reflection") == "second"
+    assert llm_cache.stats()["session"]["reflection"]["bypassed"] == 1
+
+
+def test_ttl_expires_entries(cache, monkeypatch):
+    monkeypatch.setenv(llm_cache.TTL_ENV, "60")
+    llm_cache.put("claude", "sonnet", "sys", "old", "stale")
+    conn = sqlite3.connect(cache)
+    conn.execute("UPDATE llm_cache SET created_at = created_at - 120")
+    conn.commit()
+    conn.close()
+    assert llm_cache.get("claude", "sonnet", "sys", "old") is None
+    assert llm_cache.clear(cache, expired_only=True) == 1
+
+
+def test_size_limit_evicts_least_recently_used(cache, monkeypatch):
+    monkeypatch.setenv(llm_cache.MAX_ENV, "2")
+    llm_cache.put("claude", "sonnet", "sys", "a", "A")
+    llm_cache.put("claude", "sonnet", "sys", "b", "B")
+    assert llm_cache.get("claude", "sonnet", "sys", "a") == "A"  # a is now more recent than b
+    llm_cache.put("claude", "sonnet", "sys", "c", "C")
+    assert llm_cache.stats()["entries"] == 2
+    assert llm_cache.get("claude", "sonnet", "sys", "b") is None
+    assert llm_cache.get("claude", "sonnet", "sys", "a") == "A"
+
+
+def test_unreadable_cache_is_a_miss(cache):
+    with open(cache, "w") as f:
+        f.write("not a database")
+    llm_cache.put("claude", "sonnet", "sys", "msg", "answer")
+    assert llm_cache.get("claude", "sonnet", "sys", "msg") is None
+
+
+def test_empty_responses_are_not_stored(cache):
+    llm_cache.put("claude", "sonnet", "sys", "msg", "")
+    assert llm_cache.stats()["entries"] == 0
+
+
+def test_call_npc_replays_cached_answer(cache, monkeypatch):
+    from lorekit.tools.npc import _call_npc
+
+    calls = []
+
+    class Provider:
+        def run_ephemeral_sync(self, system_prompt, model, message):
+            calls.append(message)
+            return f"answer {len(calls)}"
+
+    monkeypatch.setattr("lorekit._mcp_app.get_provider_name", lambda: "fake")
+    assert _call_npc(Provider(), "You are Bob.", "sonnet", "Hello", "Bob") == ("answer 1", None, False)
+    assert _call_npc(Provider(), "You are Bob.", "sonnet", "Hello", "Bob") == ("answer 1", None, True)
+    assert len(calls) == 1
+    assert _call_npc(Provider(), "You are Bob.", "sonnet", "Hello", "Bob", fresh=True) == ("answer 2", None, False)
+    assert _call_npc(Provider(), "You are Bob.", "sonnet", "Hello", "Bob") == ("answer 2", None, True)
+
+
+def test_failed_calls_are_not_cached(cache, monkeypatch):
+    from lorekit.tools.npc import _call_npc
+
+    class Provider:
+        def run_ephemeral_sync(self, system_prompt, model, message):
+            raise RuntimeError("down")
+
+    monkeypatch.setattr("lorekit._mcp_app.get_provider_name", lambda: "fake")
+    text, error, cached = _call_npc(Provider(), "You are Bob.", "sonnet", "Hello", "Bob")
+    assert error.startswith("ERROR:")
+    assert not cached
+    assert llm_cache.stats()["entries"] == 0
+
+
+def test_replayed_response_is_not_stored_twice(cache, make_session, make_character):
+    from lorekit.db import require_db
+    from lorekit.npc.postprocess import process_npc_response
+
+    sid = make_session()
+    npc_id = make_character(sid, name="Bob", char_type="npc")
+    text = 'Welcome back.\n[MEMORIES]\n- content: "The hero returned" | importance: 0.6 | type: experience | entities: ["hero"]'
+    db = require_db()
+    try:
+        process_npc_response(db, sid, npc_id, text, "Bob", "")
+        process_npc_response(db, sid, npc_id, text, "Bob", "", replayed=True)
+        process_npc_response(db, sid, npc_id, "Nods.", "Bob", "")
+        assert process_npc_response(db, sid, npc_id, "Nods.", "Bob", "", replayed=True) == "Nods."
+        contents = [r[0] for r in db.execute("SELECT content FROM npc_memories WHERE npc_id = ?", (npc_id,))]
+    finally:
+        db.close()
+    assert contents == ["The hero returned", "[Bob interaction] Nods."]
+
+
+def test_fresh_reaches_reflection_and_reaction_calls(cache, make_session, make_character, monkeypatch):
+    from lorekit.db import require_db
+    from lorekit.npc import reflect
+    from lorekit.npc.combat import query_npc_reaction
+
+    answers = iter(["insight 1", "insight 2"])
+    monkeypatch.setattr(reflect, "_call_llm_uncached", lambda prompt, provider_name, model: next(answers))
+    assert reflect._call_llm("Reflect.") == "insight 1"
+    assert reflect._call_llm("Reflect.") == "insight 1"
+    assert reflect._call_llm("Reflect.", fresh=True) == "insight 2"
+
+    replies = iter(["YES", "NO"])
+
+    class Provider:
+        def run_ephemeral_sync(self, system_prompt, model, message):
+            return next(replies)
+
+    monkeypatch.setattr("lorekit._mcp_app.get_provider_name", lambda: "fake")
+    monkeypatch.setattr("lorekit.providers.load_provider", lambda name: Provider())
+    sid = make_session()
+    npc_id = make_character(sid, name="Guard", char_type="npc", model="sonnet")
+    db = require_db()
+    try:
+        args = (db, npc_id, "Parry", "on_attacked", "block", "Orc", "Guard")
+        assert query_npc_reaction(*args) is True
+        assert query_npc_reaction(*args) is True
+        assert query_npc_reaction(*args, fresh=True) is False
+    finally:
+        db.close()
+    assert llm_cache.stats()["session"]["reaction"]["bypassed"] == 1
@@ -0,0 +1,188 @@
+"""Tests for npc/consolidate.py -- memory tiers, consolidation and the per-NPC cap."""
+
+import json
+import re
+from unittest.mock import patch
+
+import pytest
+
+import lorekit.npc.memory as npc_memory
+from lorekit.npc.consolidate import (
+    apply_consolidation,
+    cluster_memories,
+    consolidate_memories,
+    parse_consolidation_output,
+    prepare_consolidation,
+)
+
+
+@pytest.fixture
+def npc(make_session):
+    from lorekit.db import require_db
+    from lorekit.tools.character import character_build
+
+    sid = make_session()
+    npc_id = int(re.search(r":\s*(\d+)", character_build(session=sid, name="Mara", level=1, type="npc")).group(1))
+    db = require_db()
+    yield db, sid, npc_id
+    db.close()
+
+
+def _fill(db, sid, npc_id, count, entities=("Bob",), narrative_time="1347-01-01T10:00", importance=0.4):
+    return [
+        npc_memory.add_memory(
+            db, sid, npc_id, f"Memory {i}", importance, "experience", list(entities), narrative_time, commit=False
+        )
+        for i in range(count)
+    ]
+
+
+NOW = "1347-03-01T10:00"
+
+
+def test_parse_consolidation_output():
+    text = (
+        "[SUMMARIES]\n"
+        '- group: 1 | content: "Bob owes me: ten gold" | importance: 0.6\n'
+        '- group: 7 | content: "out of range" | importance: 0.5\n'
+        '- group: 2 | content: "No importance"\n'
+        "- group: x | content: nope\n"
+    )
+    assert parse_consolidation_output(text, 2) == {1: ("Bob owes me: ten gold", 0.6), 2: ("No importance", None)}
+    assert parse_consolidation_output("no block", 2) == {}
+
+
+def test_cluster_memories_groups_by_shared_entity(npc):
+    db, sid, npc_id = npc
+    _fill(db, sid, npc_id, 4, entities=("Bob", "Tavern"))
+    _fill(db, sid, npc_id, 3, entities=("Tavern",))
+    _fill(db, sid, npc_id, 2, entities=("Guard",))
+    _fill(db, sid, npc_id, 30, entities=())
+    rows = db.execute(f"SELECT {npc_memory.MEMORY_SELECT} FROM npc_memories WHERE npc_id = ?", (npc_id,))
+    clusters = cluster_memories(db, npc_id, [npc_memory.memory_row_to_dict(r) for r in rows])
+
+    subjects = [(c["subject"], len(c["memories"])) for c in clusters]
+    # "tavern" is shared by 7 memories, so it wins over "bob"; the 2 guard memories are too few;
+    # the 30 entity-less memories split into chunks of 12, 12 and 6
+    assert subjects == [("tavern", 7), ("(experience)", 12), ("(experience)", 12), ("(experience)", 6)]
+
+
+def test_prepare_skips_small_recent_or_accessed(npc):
+    db, sid, npc_id = npc
+    _fill(db, sid, npc_id, 10)
+    assert prepare_consolidation(db, sid, npc_id, NOW)["prompt"] is None  # below CONSOLIDATE_MIN_MEMORIES
+
+    _fill(db, sid, npc_id, 60, narrative_time="1347-02-28T10:00")
+    job = prepare_consolidation(db, sid, npc_id, NOW)
+    assert [len(c["memories"]) for c in job["clusters"]] == [10]  # only the old ten
+    assert "Group 1 (about: bob)" in job["prompt"]
+
+
+def test_apply_replaces_cluster_with_summary(npc):
+    db, sid, npc_id = npc
+    old = _fill(db, sid, npc_id, 12)
+    _fill(db, sid, npc_id, 50, entities=(), narrative_time=NOW)
+    core = _fill(db, sid, npc_id, 1, importance=0.95, narrative_time=NOW)
+    for memory_id in old:  # present already when an embedder is installed
+        db.execute(
+            "INSERT OR IGNORE INTO embeddings (source, source_id, session_id, npc_id, content) "
+            "VALUES ('npc_memory', ?, ?, ?, 'x')",
+            (memory_id, sid, npc_id),
+        )
+    db.commit()
+
+    job = prepare_consolidation(db, sid, npc_id, NOW)
+    result = apply_consolidation(
+        db, sid, npc_id, job, '[SUMMARIES]\n- group: 1 | content: "Bob and I go way back" | importance: 0.7'
+    )
+    assert result == {"npc_name": "Mara", "merged": 12, "summaries": 1, "promoted": 1}
+
+    ph = ",".join("?" * len(old))
+    assert db.execute(f"SELECT COUNT(*) FROM npc_memories WHERE id IN ({ph})", old).fetchone()[0] == 0
+    assert db.execute(f"SELECT COUNT(*) FROM memory_entities WHERE memory_id IN ({ph})", old).fetchone()[0] == 0
+    assert db.execute(f"SELECT COUNT(*) FROM embeddings WHERE source_id IN ({ph})", old).fetchone()[0] == 0
+
+    summary = db.execute(
+        "SELECT id, importance, tier, source_ids, entities FROM npc_memories WHERE content = 'Bob and I go way back'"
+    ).fetchone()
+    assert summary[1:3] == (0.7, "summary")
+    assert json.loads(summary[3]) == old
+    assert summary[4] == '["Bob"]'
+    assert db.execute("SELECT tier FROM npc_memories WHERE id = ?", (core[0],)).fetchone()[0] == "core"
+
+    # Summaries are neither fed back into reflection nor re-consolidated
+    from lorekit.npc.reflect import get_unprocessed_memories
+
+    assert summary[0] not in [m["id"] for m in get_unprocessed_memories(db, sid, npc_id)]
+    assert prepare_consolidation(db, sid, npc_id, NOW)["prompt"] is None
+
+
+def test_unsummarized_cluster_is_kept(npc):
+    db, sid, npc_id = npc
+    _fill(db, sid, npc_id, 60)
+    with patch("lorekit.npc.reflect._call_llm", return_value="I refuse."):
+        result = consolidate_memories(db, sid, npc_id, NOW)
+    assert result["merged"] == 0
+    assert db.execute("SELECT COUNT(*) FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchone()[0] == 60
+
+
+def test_memory_cap_evicts_weakest_first(npc):
+    db, sid, npc_id = npc
+    core = _fill(db, sid, npc_id, 2, importance=0.1)
+    db.execute(f"UPDATE npc_memories SET tier = 'core' WHERE id IN ({core[0]}, {core[1]})")
+    strong = _fill(db, sid, npc_id, 2, importance=0.8)
+    _fill(db, sid, npc_id, 3, importance=0.2)
+    with patch("lorekit.npc.memory.MEMORY_CAP", 5):
+        newest = _fill(db, sid, npc_id, 1, importance=0.1)
+
+    # Raw before core, weakest first; the memory being added is never its own victim
+    left = {r[0] for r in db.execute("SELECT id FROM npc_memories WHERE npc_id = ?", (npc_id,))}
+    assert left == {*core, *strong, *newest}
+
+
+def test_memory_cap_with_async_embeddings(npc, monkeypatch):
+    """Evicting inside an open transaction drops queued embeddings instead of waiting on the worker."""
+    import time
+
+    from lorekit.support import vectordb
+
+    class FakeVectors(list):
+        def tolist(self):
+            return list(self)
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            return FakeVectors([[1.0] + [0.0] * 383 for _ in texts])
+
+    monkeypatch.setattr(vectordb, "_get_model", lambda: FakeModel())
+    monkeypatch.setenv(vectordb.ASYNC_ENV, "1")
+    db, sid, npc_id = npc
+    start = time.monotonic()
+    with patch("lorekit.npc.memory.MEMORY_CAP", 4):
+        _fill(db, sid, npc_id, 10)
+    assert db.in_transaction
+    assert time.monotonic() - start < 2
+    db.commit()
+    vectordb.flush_embeddings()
+
+    left = {r[0] for r in db.execute("SELECT id FROM npc_memories WHERE npc_id = ?", (npc_id,))}
+    indexed = {r[0] for r in db.execute("SELECT source_id FROM embeddings WHERE source = 'npc_memory'")}
+    assert len(left) == 4
+    assert indexed == left
+
+
+def test_reflect_all_consolidates(npc):
+    db, sid, npc_id = npc
+    _fill(db, sid, npc_id, 60, importance=0.01)
+    db.execute(
+        "INSERT INTO session_meta (session_id, key, value) VALUES (?, 'narrative_time', ?)",
+        (sid, NOW),
+    )
+    db.commit()
+    from lorekit.npc.reflect import reflect_all
+
+    output = '[SUMMARIES]\n- group: 1 | content: "Bob, always Bob" | importance: 0.5'
+    with patch("lorekit.npc.reflect._call_llm", return_value=output):
+        result = reflect_all(db, sid, threshold=100.0)
+    assert "Consolidated 12 memories into 1 summaries." in result
+    assert db.execute("SELECT COUNT(*) FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchone()[0] == 49
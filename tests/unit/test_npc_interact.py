@@ -0,0 +1,155 @@
+"""Tests for npc_interact_many -- concurrent multi-NPC interaction."""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+class FakeNpcProvider:
+    """Provider double: each call sleeps, records peak concurrency and answers with a memory block."""
+
+    def __init__(self, delay=0.2, fail_for=()):
+        self.delay = delay
+        self.fail_for = set(fail_for)
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run_ephemeral_sync(self, system_prompt, model, message):
+        name = re.search(r"^You are ([^,\n]+), ", system_prompt, re.M).group(1)
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls.append(name)
+        try:
+            time.sleep(self.delay)
+            if name in self.fail_for:
+                raise RuntimeError(f"{name} crashed")
+            return (
+                f"{name} raises a mug.\n\n"
+                "[MEMORIES]\n"
+                f'- content: "{name} toasted the stranger" | importance: 0.6 | type: experience | entities: ["stranger"]\n'
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def tavern(make_session, make_character, npc_model):
+    sid = make_session()
+    names = ["Bartender Bob", "Mira", "Old Tom", "Grizelda", "Pip"]
+    ids = [make_character(sid, name=n, char_type="npc", model=npc_model) for n in names]
+    return sid, dict(zip(names, ids))
+
+
+def _use_provider(monkeypatch, provider):
+    from lorekit.tools import npc
+
+    monkeypatch.setattr(npc, "_get_provider", lambda: provider)
+
+
+def test_runs_concurrently_and_keeps_order(tavern, monkeypatch):
+    from lorekit.db import require_db
+    from lorekit.tools.npc import npc_interact_many
+
+    sid, ids = tavern
+    provider = FakeNpcProvider(delay=0.3)
+    _use_provider(monkeypatch, provider)
+    monkeypatch.setattr("lorekit.npc.config.INTERACT_CONCURRENCY", 4)
+
+    order = ["Mira", "Bartender Bob", "Old Tom", "Grizelda"]
+    start = time.perf_counter()
+    result = npc_interact_many(session_id=sid, npc_ids=json.dumps(order), message="A stranger walks in.")
+    elapsed = time.perf_counter() - start
+
+    assert provider.peak == 4
+    assert elapsed < 0.3 * 3  # sequential would take 1.2s
+    headers = [line for line in result.splitlines() if line.startswith("[")]
+    assert headers == [f"[{n}]" for n in order]
+    assert "[MEMORIES]" not in result
+    assert "Old Tom raises a mug." in result
+
+    db = require_db()
+    stored = db.execute(
+        "SELECT npc_id FROM npc_memories WHERE session_id = ? AND content LIKE '%toasted the stranger'", (sid,)
+    ).fetchall()
+    db.close()
+    assert sorted(r[0] for r in stored) == sorted(ids[n] for n in order)
+
+
+def test_concurrency_cap(tavern, monkeypatch):
+    from lorekit.tools.npc import npc_interact_many
+
+    sid, ids = tavern
+    provider = FakeNpcProvider(delay=0.1)
+    _use_provider(monkeypatch, provider)
+    monkeypatch.setattr("lorekit.npc.config.INTERACT_CONCURRENCY", 2)
+
+    npc_interact_many(session_id=sid, npc_ids=json.dumps(list(ids.values())), message="Last call!")
+
+    assert provider.peak == 2
+    assert len(provider.calls) == 5
+
+
+def test_failures_and_unknown_npcs_reported_per_npc(tavern, monkeypatch):
+    from lorekit.db import require_db
+    from lorekit.tools.npc import npc_interact_many
+
+    sid, ids = tavern
+    _use_provider(monkeypatch, FakeNpcProvider(delay=0, fail_for={"Pip"}))
+
+    result = npc_interact_many(session_id=sid, npc_ids=json.dumps(["Pip", "Nobody", "Mira", "mira"]), message="Hello")
+
+    sections = result.split("\n\n")
+    assert sections[0].startswith("[Pip]\nERROR: NPC process failed: Pip crashed")
+    assert sections[1].startswith("[Nobody]\nERROR:")
+    assert sections[2] == "[Mira]\nMira raises a mug."
+    assert len(sections) == 3  # duplicate Mira dropped
+
+    db = require_db()
+    counts = dict(db.execute("SELECT npc_id, COUNT(*) FROM npc_memories GROUP BY npc_id").fetchall())
+    db.close()
+    assert counts == {ids["Mira"]: 1}
+
+
+def test_post_processing_commits_once(tavern, monkeypatch):
+    """Another connection sees no NPC memories until every response is processed."""
+    from lorekit.db import require_db
+    from lorekit.npc import postprocess
+    from lorekit.tools.npc import npc_interact_many
+
+    sid, ids = tavern
+    _use_provider(monkeypatch, FakeNpcProvider(delay=0))
+    real = postprocess.process_npc_response
+    seen = []
+
+    def watching(*args, **kwargs):
+        observer = sqlite3.connect(os.environ["LOREKIT_DB"])
+        try:
+            seen.append(observer.execute("SELECT COUNT(*) FROM npc_memories").fetchone()[0])
+        finally:
+            observer.close()
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(postprocess, "process_npc_response", watching)
+    npc_interact_many(session_id=sid, npc_ids=json.dumps(["Mira", "Old Tom", "Pip"]), message="Hello")
+
+    db = require_db()
+    stored = db.execute("SELECT COUNT(*) FROM npc_memories").fetchone()[0]
+    db.close()
+    assert seen == [0, 0, 0]
+    assert stored == 3
+
+
+def test_rejects_bad_npc_ids():
+    from lorekit.tools.npc import npc_interact_many
+
+    assert npc_interact_many(session_id=1, npc_ids="Mira", message="Hi").startswith("ERROR:")
+    assert npc_interact_many(session_id=1, npc_ids="[]", message="Hi").startswith("ERROR:")
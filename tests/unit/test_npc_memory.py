@@ -113,6 +113,73 @@ class TestScoreMemories:
 
         assert score_memories([], None, "") == []
 
+    def test_numpy_path_matches_python(self, monkeypatch):
+        """Vectorized scoring ranks and scores like the pure-Python scorer."""
+        import random
+
+        pytest.importorskip("numpy")
+        from lorekit.npc import memory
+        from lorekit.npc.config import NUMPY_SCORING_MIN
+
+        rng = random.Random(7)
+        memories = []
+        for i in range(NUMPY_SCORING_MIN * 3):
+            emb = [rng.uniform(-1, 1) for _ in range(16)]
+            memories.append(
+                {
+                    "id": i,
+                    "importance": round(rng.random(), 2),
+                    "narrative_time": f"1347-03-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00",
+                    "last_accessed": None,
+                    # a few without vectors, one zero vector, one of the wrong size
+                    "embedding": None if i % 11 == 0 else [0.0] * 16 if i == 5 else emb[:8] if i == 7 else emb,
+                }
+            )
+        query = [rng.uniform(-1, 1) for _ in range(16)]
+
+        fast = memory.score_memories(memories, query, "1347-04-01T00:00")
+        monkeypatch.setattr(memory, "_numpy", lambda: None)
+        slow = memory.score_memories(memories, query, "1347-04-01T00:00")
+
+        assert [(m["id"], score) for m, score in fast] == [(m["id"], score) for m, score in slow]
+
+    def test_numpy_path_orders_near_ties_like_python(self, monkeypatch):
+        """Permuted copies of one vector differ only in summation rounding; both paths rank them alike."""
+        import random
+
+        np = pytest.importorskip("numpy")
+        from lorekit.npc import memory
+        from lorekit.npc.config import NUMPY_SCORING_MIN
+
+        rng = random.Random(3)
+        terms = [rng.uniform(-1, 1) for _ in range(384)]
+        query = [rng.uniform(0.5, 1) * rng.choice((-1, 1)) for _ in range(384)]
+        memories = []
+        for i in range(NUMPY_SCORING_MIN * 2):
+            order = list(range(384))
+            rng.shuffle(order)
+            memories.append(
+                {
+                    "id": i,
+                    "importance": 0.5,
+                    "narrative_time": "1347-03-01T00:00",
+                    "last_accessed": None,
+                    # the same dot-product terms summed in another order: near-identical relevance
+                    "embedding": [terms[order[j]] / query[j] for j in range(384)],
+                }
+            )
+        as_lists = [{**m, "embedding": list(m["embedding"])} for m in memories]
+        as_arrays = [{**m, "embedding": np.asarray(m["embedding"], dtype=np.float32)} for m in memories]
+        for m, arr in zip(as_lists, as_arrays):
+            m["embedding"] = [float(x) for x in arr["embedding"]]  # what stored_vectors yields without NumPy
+
+        fast = memory.score_memories(as_arrays, query, "1347-04-01T00:00")
+        monkeypatch.setattr(memory, "_numpy", lambda: None)
+        slow = memory.score_memories(as_lists, query, "1347-04-01T00:00")
+
+        assert len({score for _, score in slow}) > 1  # the near-ties really differ in the last bits
+        assert [(m["id"], score) for m, score in fast] == [(m["id"], score) for m, score in slow]
+
 
 # ---------------------------------------------------------------------------
 # npc_memory_add round-trip
@@ -151,6 +218,30 @@ class TestNpcMemoryAdd:
         assert row[1] == 0.8
         assert row[2] == "experience"
 
+    def test_add_indexes_entities(self, make_npc, make_character):
+        """Entities land in memory_entities and drive entity-matched prefetch."""
+        session_id, npc_id = make_npc()
+        other_id = make_character(session_id, name="Other", char_type="npc")
+
+        from lorekit.db import require_db
+        from lorekit.npc.memory import add_memory
+        from lorekit.npc.prefetch import _get_entity_memories
+
+        db = require_db()
+        m1 = add_memory(db, session_id, npc_id, "Hero helped", 0.5, "experience", ["Hero", "hero"], "day 1")
+        m2 = add_memory(db, session_id, npc_id, "Village burned", 0.5, "experience", '["Village"]', "day 2")
+        add_memory(db, session_id, npc_id, "No names", 0.5, "observation", [], "day 3")
+        add_memory(db, session_id, other_id, "Hero again", 0.5, "experience", ["Hero"], "day 3")
+
+        keys = db.execute(
+            "SELECT memory_id, entity FROM memory_entities WHERE npc_id = ? ORDER BY memory_id", (npc_id,)
+        ).fetchall()
+        found = _get_entity_memories(db, npc_id, session_id, ["HERO", "village", "Nobody"])
+        db.close()
+
+        assert keys == [(m1, "hero"), (m2, "village")]
+        assert [m["id"] for m in found] == [m1, m2]
+
     def test_add_by_name(self, make_npc):
         """Can add memory by NPC name instead of ID."""
         session_id, npc_id = make_npc(name="Bartender Bob")
@@ -410,6 +501,7 @@ class TestCheckpointNpcMemory:
             npc_id=npc_id,
             content="First memory",
             importance=0.8,
+            entities='["Tavern"]',
             narrative_time="day 1",
         )
 
@@ -431,6 +523,7 @@ class TestCheckpointNpcMemory:
             npc_id=npc_id,
             content="Second memory",
             importance=0.5,
+            entities='["Harbor"]',
             narrative_time="day 2",
         )
 
@@ -448,6 +541,8 @@ class TestCheckpointNpcMemory:
         assert count == 1
         row = db.execute("SELECT content FROM npc_memories WHERE session_id = ?", (session_id,)).fetchone()
         assert row[0] == "First memory"
+        entities = db.execute("SELECT entity FROM memory_entities WHERE npc_id = ?", (npc_id,)).fetchall()
+        assert entities == [("tavern",)]
 
         # Core should still be present
         core = db.execute(
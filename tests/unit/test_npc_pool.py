@@ -0,0 +1,172 @@
+"""Tests for the warm NPC process pool."""
+
+import threading
+
+import pytest
+
+from lorekit.npc.pool import NpcProcessPool, get_pool, shutdown_pool
+
+
+class FakeProcess:
+    def __init__(self, model, system_prompt, number):
+        self.model = model
+        self.system_prompt = system_prompt
+        self.number = number
+        self.alive = True
+        self.turns = []
+
+    def send_sync(self, message, context="", timeout=120):
+        self.turns.append((context, message))
+        return f"{self.model}#{self.number}: {message}"
+
+    def stop(self):
+        self.alive = False
+
+
+class FakePoolProvider:
+    def __init__(self):
+        self.spawned = []
+        self._lock = threading.Lock()
+
+    def spawn_pooled(self, model, system_prompt):
+        with self._lock:
+            proc = FakeProcess(model, system_prompt, len(self.spawned))
+            self.spawned.append(proc)
+        return proc
+
+    def run_ephemeral_sync(self, system_prompt, model, message):
+        raise AssertionError("pool should be used")
+
+
+@pytest.fixture
+def pool():
+    # Huge interval: the test drives maintain() by hand.
+    p = NpcProcessPool(FakePoolProvider(), size=2, idle_ttl=600, interval=3600)
+    yield p
+    p.shutdown()
+
+
+def test_first_call_is_cold_then_warm(pool):
+    assert pool.run("You are Grom.", "sonnet", "hi") == "sonnet#0: hi"
+    assert pool.stats["cold"] == 1
+    pool.maintain()
+    assert pool.idle_count("sonnet") == 2
+
+    assert pool.run("You are Grom.", "sonnet", "hello").startswith("sonnet#")
+    assert pool.stats["warm"] == 1
+    pool.run("You are Mira.", "sonnet", "hello")
+    assert pool.stats["cold"] == 2  # another NPC's prompt is another key
+
+
+def test_process_serves_one_turn_then_retires(pool):
+    pool.maintain()  # nothing wanted yet
+    assert pool.idle_count() == 0
+    pool.run("You are Grom.", "sonnet", "hi")
+    first = pool.provider.spawned[0]
+    assert not first.alive
+    assert first.system_prompt == "You are Grom."
+    assert first.turns == [("", "hi")]
+
+
+def test_stable_prefix_is_the_system_prompt(pool):
+    pool.run("You are Grom.\n\nYou recall: the bridge", "sonnet", "hi", prefix="You are Grom.")
+    pool.maintain()
+    pool.run("You are Grom.\n\nYou recall: the mill", "sonnet", "again", prefix="You are Grom.")
+    assert pool.stats["warm"] == 1
+    first, second = pool.provider.spawned[:2]
+    assert first.system_prompt == second.system_prompt == "You are Grom."
+    assert first.turns == [("You recall: the bridge", "hi")]
+    assert second.turns == [("You recall: the mill", "again")]
+
+
+def test_dead_idle_process_is_skipped(pool):
+    pool.run("s", "sonnet", "warmup")
+    pool.maintain()
+    for proc, _ in pool._idle[("sonnet", "s")]:
+        proc.alive = False
+    pool.run("s", "sonnet", "again")
+    assert pool.stats["cold"] == 2
+    assert pool.stats["evicted"] == 2
+
+
+def test_size_cap_is_shared_across_models(pool):
+    pool.run("s", "sonnet", "a")
+    pool.run("s", "haiku", "b")
+    pool.run("s", "opus", "c")
+    pool.maintain()
+    assert pool.idle_count() == 2
+
+
+def test_idle_eviction(pool):
+    pool.run("s", "sonnet", "a")
+    pool.maintain()
+    idle = [proc for proc, _ in pool._idle[("sonnet", "s")]]
+    pool.idle_ttl = 0
+    pool.maintain()
+    assert pool.idle_count() == 0
+    assert all(not proc.alive for proc in idle)
+
+
+def test_shutdown_stops_idle_processes(pool):
+    pool.run("s", "sonnet", "a")
+    pool.maintain()
+    idle = [proc for proc, _ in pool._idle[("sonnet", "s")]]
+    pool.shutdown()
+    assert all(not proc.alive for proc in idle)
+
+
+def test_get_pool_requires_env_and_support(monkeypatch):
+    monkeypatch.delenv("LOREKIT_NPC_POOL", raising=False)
+    assert get_pool(FakePoolProvider()) is None
+    monkeypatch.setenv("LOREKIT_NPC_POOL", "2")
+    assert get_pool(object()) is None
+    try:
+        provider = FakePoolProvider()
+        assert get_pool(provider) is get_pool(provider)
+    finally:
+        shutdown_pool()
+
+
+def test_call_npc_uses_pool(monkeypatch):
+    from lorekit.tools.npc import _call_npc
+
+    monkeypatch.setenv("LOREKIT_NPC_POOL", "1")
+    try:
+        text, error, _cached = _call_npc(FakePoolProvider(), "You are Grom.", "sonnet", "hi", "Grom")
+    finally:
+        shutdown_pool()
+    assert error is None
+    assert text == "sonnet#0: hi"
+
+
+def test_pooled_turn_matches_ephemeral_prompt(make_session, make_character, monkeypatch):
+    """The pooled system prompt plus per-call context is exactly the ephemeral system prompt."""
+    from lorekit.db import require_db
+    from lorekit.tools.npc import _assemble_npc_prompt, _load_npc_guides, _run_provider_turn
+
+    sid = make_session()
+    npc_id = make_character(sid, name="Grom", char_type="npc", model="sonnet")
+    db = require_db()
+    try:
+        db.execute(
+            "INSERT INTO combat_state (character_id, source, target_stat, modifier_type, value) "
+            "VALUES (?, 'Bless', 'attack', 'buff', 1)",
+            (npc_id,),
+        )
+        db.commit()
+        prefix, system_prompt, model, _ = _assemble_npc_prompt(db, npc_id, sid, "Hello")
+    finally:
+        db.close()
+
+    monkeypatch.setenv("LOREKIT_NPC_POOL", "1")
+    provider = FakePoolProvider()
+    try:
+        _run_provider_turn(provider, system_prompt, model, "Hello", prefix)
+    finally:
+        shutdown_pool()
+    (proc,) = provider.spawned
+    ((context, message),) = proc.turns
+    assert proc.system_prompt.startswith(_load_npc_guides())
+    assert "Active conditions" in context
+    assert f"{proc.system_prompt}\n\n{context}" == system_prompt
+    assert message == "Hello"
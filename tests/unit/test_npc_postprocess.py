@@ -168,7 +168,14 @@ def db():
             importance REAL, memory_type TEXT, entities TEXT,
             narrative_time TEXT, source_ids TEXT,
             access_count INTEGER DEFAULT 0, last_accessed TEXT,
-            created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+            created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+            tier TEXT NOT NULL DEFAULT 'raw'
+        )"""
+    )
+    conn.execute(
+        """CREATE TABLE memory_entities (
+            memory_id INTEGER, npc_id INTEGER, entity TEXT,
+            PRIMARY KEY (npc_id, entity, memory_id)
         )"""
     )
     conn.execute(
@@ -322,6 +322,58 @@ class TestReflectAll:
         finally:
             db.close()
 
+    def test_llm_calls_run_in_parallel_and_failures_are_isolated(self, make_session):
+        """LLM calls overlap up to the concurrency cap; one NPC failing leaves the rest stored."""
+        import threading
+        import time
+
+        sid = make_session()
+        from lorekit.db import require_db
+        from lorekit.tools.character import character_build
+
+        names = [f"NPC{i}" for i in range(6)]
+        ids = {n: _extract_id(character_build(session=sid, name=n, level=1, type="npc")) for n in names}
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_llm(prompt, kind="reflection", fresh=False):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            try:
+                time.sleep(0.2)
+                if "NPC3" in prompt:
+                    raise RuntimeError("provider down")
+                return CANNED_REFLECTION_OUTPUT
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        db = require_db()
+        try:
+            for n in names:
+                _add_memory(db, sid, ids[n], f"{n} saw the dragon", importance=0.9)
+
+            start = time.perf_counter()
+            with patch("lorekit.npc.reflect._call_llm", side_effect=fake_llm):
+                result = reflect_all(db, sid, threshold=0.0, concurrency=3)
+            elapsed = time.perf_counter() - start
+
+            assert state["peak"] == 3
+            assert elapsed < 0.2 * 6 * 0.75  # sequential would be 1.2s; two waves ≈ 0.4s
+            assert "Reflected on 5 NPCs" in result
+            assert "Failed for 1 NPCs (NPC3: provider down)" in result
+            counts = dict(
+                db.execute(
+                    "SELECT npc_id, COUNT(*) FROM npc_memories WHERE memory_type = 'reflection' GROUP BY npc_id"
+                ).fetchall()
+            )
+            assert ids["NPC3"] not in counts
+            assert len(counts) == 5
+        finally:
+            db.close()
+
 
 # ---------------------------------------------------------------------------
 # Pruning tests
@@ -398,6 +450,35 @@ class TestPruneMemories:
         finally:
             db.close()
 
+    def test_prune_deletes_embeddings_and_spares_summaries(self, make_npc):
+        """Pruned memories lose their embedding rows; consolidated summaries are never pruned."""
+        session_id, npc_id = make_npc()
+        from lorekit.db import require_db
+
+        db = require_db()
+        try:
+            ids = []
+            for content, tier in (("Forgettable", "raw"), ("Old summary", "summary")):
+                cur = db.execute(
+                    "INSERT INTO npc_memories (session_id, npc_id, content, importance, memory_type, "
+                    "entities, narrative_time, access_count, tier) VALUES (?, ?, ?, 0.1, 'observation', '[]', "
+                    "'1347-01-01T10:00', 0, ?)",
+                    (session_id, npc_id, content, tier),
+                )
+                ids.append(cur.lastrowid)
+                db.execute(
+                    "INSERT INTO embeddings (source, source_id, session_id, npc_id, content) "
+                    "VALUES ('npc_memory', ?, ?, ?, ?)",
+                    (cur.lastrowid, session_id, npc_id, content),
+                )
+            db.commit()
+
+            assert prune_memories(db, session_id, npc_id, narrative_now="1347-02-15T10:00") == 1
+            left = db.execute("SELECT source_id FROM embeddings WHERE source = 'npc_memory'").fetchall()
+            assert [r[0] for r in left] == [ids[1]]
+        finally:
+            db.close()
+
 
 # ---------------------------------------------------------------------------
 # Auto-trigger tests (via MCP tools)
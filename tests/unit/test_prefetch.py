@@ -288,6 +288,58 @@ class TestEntityExtraction:
         assert result["region_ids"] == []
         assert result["matched_names"] == []
 
+    def test_matches_whole_words_only(self, make_npc, make_region):
+        """Names match on word boundaries; overlapping names are all found."""
+        session_id, npc_id = make_npc(name="Bob", aliases=["Bo"])
+        region_id = make_region(session_id, name="Bobby's Tavern")
+
+        from lorekit.db import require_db
+        from lorekit.npc.prefetch import extract_entities
+
+        db = require_db()
+        miss = extract_entities(db, session_id, "Bobby waves; the bobcat hisses")
+        hit = extract_entities(db, session_id, "Bob, meet me at bobby's tavern.")
+        db.close()
+
+        assert miss["character_ids"] == []
+        assert hit["character_ids"] == [npc_id]
+        assert hit["region_ids"] == [region_id]
+        assert hit["matched_names"] == [("Bob", "character", npc_id), ("Bobby's Tavern", "region", region_id)]
+
+    def test_matcher_rebuilt_when_names_change(self, make_npc):
+        """The cached matcher picks up new aliases, renames and deletions."""
+        session_id, npc_id = make_npc(name="Bartender Bob")
+
+        from lorekit.db import require_db
+        from lorekit.npc import prefetch
+
+        db = require_db()
+        assert prefetch.extract_entities(db, session_id, "Ask Grim")["character_ids"] == []
+        _, first = prefetch._session_matcher(db, session_id)
+        assert prefetch._session_matcher(db, session_id)[1] is first
+
+        db.execute("INSERT INTO character_aliases (character_id, alias) VALUES (?, 'Grim')", (npc_id,))
+        db.commit()
+        assert prefetch.extract_entities(db, session_id, "Ask Grim")["character_ids"] == [npc_id]
+
+        db.execute("UPDATE characters SET name = 'Barkeep Bob' WHERE id = ?", (npc_id,))
+        db.commit()
+        assert prefetch.extract_entities(db, session_id, "the bartender bob")["character_ids"] == []
+        assert prefetch.extract_entities(db, session_id, "the barkeep bob")["character_ids"] == [npc_id]
+
+        db.execute("DELETE FROM character_aliases WHERE character_id = ?", (npc_id,))
+        db.commit()
+        assert prefetch.extract_entities(db, session_id, "Ask Grim")["character_ids"] == []
+        db.close()
+
+    def test_matcher_overlapping_names(self):
+        """Names that are suffixes/prefixes of each other are all reported."""
+        from lorekit.npc.prefetch import EntityMatcher
+
+        matcher = EntityMatcher(["she", "he", "hers", "ushers", "his"])
+        assert matcher.matches("ushers") == {3}
+        assert matcher.matches("he said hers, she said his") == {0, 1, 2, 4}
+
 
 # ---------------------------------------------------------------------------
 # Pre-fetch pipeline
@@ -447,6 +499,51 @@ class TestPreFetch:
 
         assert after > initial
 
+    def test_access_counts_single_update_joins_open_transaction(self, seed_memories):
+        """All retrieved IDs are bumped by one statement, committed with the caller's transaction."""
+        session_id, npc_id = seed_memories()
+
+        from lorekit.db import require_db
+        from lorekit.npc.prefetch import _update_access_counts
+
+        db = require_db()
+        ids = [r[0] for r in db.execute("SELECT id FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchall()]
+        statements = []
+        db.set_trace_callback(statements.append)
+        db.execute("UPDATE sessions SET name = name WHERE id = ?", (session_id,))  # caller's open transaction
+        _update_access_counts(db, ids, "1347-03-15T14:00")
+        db.set_trace_callback(None)
+
+        assert sum(s.startswith("UPDATE npc_memories") for s in statements) == 1
+        assert db.in_transaction
+        db.commit()
+        rows = db.execute("SELECT access_count, last_accessed FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchall()
+        db.close()
+        assert rows == [(1, "1347-03-15T14:00")] * len(ids)
+
+    def test_large_recall_sets_are_chunked(self, seed_memories):
+        """IN lists stay at 500 values, so huge recall sets never hit SQLite's variable limit."""
+        session_id, npc_id = seed_memories()
+
+        from lorekit.db import require_db
+        from lorekit.npc.prefetch import _get_entity_memories, _update_access_counts
+
+        db = require_db()
+        ids = [r[0] for r in db.execute("SELECT id FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchall()]
+        names = [r[0] for r in db.execute("SELECT DISTINCT entity FROM memory_entities WHERE npc_id = ?", (npc_id,))]
+        statements = []
+        db.set_trace_callback(statements.append)
+        _update_access_counts(db, [*range(-40000, 0), *ids], "1347-03-15T14:00")
+        found = _get_entity_memories(db, npc_id, session_id, [f"nobody{i}" for i in range(40000)] + names)
+        db.set_trace_callback(None)
+        rows = db.execute("SELECT access_count FROM npc_memories WHERE npc_id = ?", (npc_id,)).fetchall()
+        db.close()
+
+        assert sum(s.startswith("UPDATE npc_memories") for s in statements) == 81
+        assert rows == [(1,)] * len(ids)
+        assert names and found
+        assert [m["id"] for m in found] == sorted(m["id"] for m in found)
+
     def test_empty_npc_no_crash(self, make_npc):
         """NPC with no memories or core identity returns valid result."""
         session_id, npc_id = make_npc()
@@ -540,6 +637,44 @@ class TestNpcPromptIntegration:
         assert "artifact is hidden" in system_prompt
         assert npc_name == "Roderick"
 
+    def test_build_npc_prompt_stable_prefix_across_turns(self, seed_memories):
+        """Guides, world, sheet and core identity form a byte-identical prefix; recalled context comes last."""
+        import os
+        import sqlite3
+
+        from lorekit.db import require_db
+        from lorekit.tools.npc import _build_npc_prompt, _load_npc_guides, npc_memory_add
+
+        session_id, npc_id = seed_memories()
+
+        def build(message):
+            db = require_db()
+            db.row_factory = sqlite3.Row
+            try:
+                return _build_npc_prompt(db, npc_id, session_id, gm_message=message)[0]
+            finally:
+                db.close()
+
+        first = build("Tell me about the artifact")
+        npc_memory_add(
+            session_id=session_id,
+            npc_id=npc_id,
+            content="The hero paid double for the map",
+            importance=0.7,
+            entities='["Hero"]',
+            narrative_time="1347-03-16T09:00",
+        )
+        second = build("What do you think of the hero?")
+
+        assert first != second
+        recall_start = first.index("## Your Memories")
+        assert len(os.path.commonprefix([first, second])) >= recall_start
+        stable = first[:recall_start]
+        assert first.startswith(_load_npc_guides())
+        assert "You are Roderick" in stable
+        assert "A distrustful merchant" in stable  # core identity
+        assert "artifact is hidden" not in stable
+
     def test_npc_allowed_tools_empty(self):
         """NPCs should have no allowed tools."""
         from lorekit.tools.npc import _NPC_ALLOWED_TOOLS
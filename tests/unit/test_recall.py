@@ -1,5 +1,7 @@
 """Tests for recall (semantic search)."""
 
+import sqlite3
+
 import pytest
 
 pytest.importorskip("sqlite_vec")
@@ -201,3 +203,218 @@ def test_journal_auto_indexes(make_session):
     journal_add(session_id=sid, type="note", content="The dragon attacked the village")
     result = recall_search(session_id=sid, query="dragon attack")
     assert "dragon" in result
+
+
+# -- Batched indexing --
+
+
+def test_reindex_batches_encoding(make_session, monkeypatch):
+    """Reindex encodes many texts per model call and writes every vector."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    batches = []
+
+    def fake_embed(texts, db=None):
+        batches.append(len(texts))
+        return [[1.0] + [0.0] * 383 for _ in texts]
+
+    monkeypatch.setattr(vectordb, "_embed_passages", fake_embed)
+    sid = make_session()
+    for i in range(6):
+        journal_add(session_id=sid, type="note", content=f"Note number {i}")
+    batches.clear()
+
+    result = recall_reindex(session_id=sid)
+    assert "6 journal entries" in result
+    assert batches == [6]
+
+    db = require_db()
+    try:
+        assert vectordb.index_many(db, [("journal", i, sid, "x", None, None) for i in range(100, 109)], batch_size=4)
+        assert batches[1:] == [4, 4, 1]
+        n_vec = db.execute("SELECT COUNT(*) FROM vec_embeddings").fetchone()[0]
+        assert n_vec == 15
+    finally:
+        db.close()
+
+
+def test_embedding_cache_reuses_vectors(make_session, monkeypatch):
+    """Identical text is encoded once; later requests are served from embedding_cache."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    encoded = []
+
+    class FakeVectors(list):
+        def tolist(self):
+            return list(self)
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            encoded.extend(texts)
+            return FakeVectors([[1.0] + [0.0] * 383 for _ in texts])
+
+    monkeypatch.setattr(vectordb, "_get_model", lambda: FakeModel())
+    sid = make_session()
+    db = require_db()
+    try:
+        before = vectordb.cache_stats()
+        vectordb.index_journal(db, sid, 1, "note", "The dragon  sleeps")
+        vectordb.index_journal(db, sid, 2, "note", "The dragon sleeps")
+        vectordb.search("dragon", sid, db)
+        vectordb.clear_query_cache()  # bypass the in-process LRU to exercise the table
+        vectordb.search("dragon", sid, db)
+        after = vectordb.cache_stats()
+    finally:
+        db.close()
+
+    assert encoded == ["passage: The dragon sleeps", "query: dragon"]
+    assert after["misses"] - before["misses"] == 2
+    assert after["hits"] - before["hits"] == 2
+
+
+def test_query_lru_skips_encoding(make_session, monkeypatch):
+    """Repeated queries are served from the in-process LRU, which is bounded."""
+    from lorekit.support import vectordb
+
+    encoded = []
+
+    class FakeModel:
+        def encode(self, texts):
+            encoded.extend(texts)
+            return [[1.0] + [0.0] * 383 for _ in texts]
+
+    monkeypatch.setattr(vectordb, "_get_model", lambda: FakeModel())
+    monkeypatch.setattr(vectordb, "QUERY_CACHE_SIZE", 2)
+    before = vectordb.query_cache_stats()
+    vectordb._embed_query("Mira at the docks")
+    vectordb._embed_query("  Mira   at the docks ")
+    vectordb._embed_query("the old mill")
+    vectordb._embed_query("the lighthouse")  # evicts "Mira at the docks"
+    vectordb._embed_query("Mira at the docks")
+    after = vectordb.query_cache_stats()
+
+    assert encoded.count("query: Mira at the docks") == 2
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 4
+    assert after["size"] == 2
+
+
+def test_async_embeddings_flush_before_search(make_session, monkeypatch):
+    """With the background embedder on, writes return at once and search waits for the queue."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    class FakeVectors(list):
+        def tolist(self):
+            return list(self)
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            return FakeVectors([[1.0] + [0.0] * 383 for _ in texts])
+
+    monkeypatch.setattr(vectordb, "_get_model", lambda: FakeModel())
+    monkeypatch.setenv(vectordb.ASYNC_ENV, "1")
+    sid = make_session()
+    for i in range(5):
+        journal_add(session_id=sid, type="note", content=f"Queued note {i}")
+
+    db = require_db()
+    try:
+        results = vectordb.search("queued note", sid, db, collection_name="journal", n_results=10)
+        assert vectordb._worker.pending() == 0
+        assert len(results) == 5
+        n_vec = db.execute("SELECT COUNT(*) FROM vec_embeddings").fetchone()[0]
+        assert n_vec == 5
+    finally:
+        db.close()
+
+
+def test_async_embedding_failure_is_logged_and_retried(make_session, monkeypatch, caplog):
+    """A batch the worker cannot write is logged and re-queued instead of lost."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    real_index_many = vectordb.index_many
+    calls = []
+
+    def flaky_index_many(db, items, **kwargs):
+        calls.append(len(items))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_index_many(db, items, **kwargs)
+
+    monkeypatch.setattr(vectordb, "index_many", flaky_index_many)
+    monkeypatch.setenv(vectordb.ASYNC_ENV, "1")
+    sid = make_session()
+    with caplog.at_level("WARNING", logger="lorekit.embeddings"):
+        journal_add(session_id=sid, type="note", content="Retried note")
+        vectordb.flush_embeddings()
+
+    assert len(calls) == 2
+    assert "retrying" in caplog.text
+    db = require_db()
+    try:
+        assert db.execute("SELECT COUNT(*) FROM embeddings WHERE source = 'journal'").fetchone()[0] == 1
+    finally:
+        db.close()
+
+
+def test_search_is_partitioned_by_session(make_session, monkeypatch):
+    """A busy session cannot crowd another session's vectors out of the KNN."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    class FakeVectors(list):
+        def tolist(self):
+            return list(self)
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            return FakeVectors([[1.0] + [0.0] * 383 for _ in texts])
+
+    monkeypatch.setattr(vectordb, "_get_model", lambda: FakeModel())
+    busy = make_session()
+    quiet = make_session()
+    db = require_db()
+    try:
+        vectordb.index_many(db, [("journal", i, busy, f"Busy note {i}", None, None) for i in range(1, 101)])
+        vectordb.index_many(db, [("journal", 1000, quiet, "Quiet note", None, None)])
+        results = vectordb.search("note", quiet, db, n_results=3)
+    finally:
+        db.close()
+    assert [r["content"] for r in results] == ["Quiet note"]
+
+
+def test_keyword_search_fts_ranking_and_sync(make_session):
+    """keyword_search ranks by bm25 and follows inserts, edits and deletes via triggers."""
+    from lorekit.db import require_db
+    from lorekit.support import vectordb
+
+    sid = make_session()
+    other = make_session()
+    journal_add(session_id=sid, type="note", content="The dragon circled the tower")
+    journal_add(session_id=sid, type="note", content="Dragon! Dragon! The dragon lands at the gate")
+    journal_add(session_id=sid, type="note", content="A quiet morning at the inn")
+    journal_add(session_id=other, type="note", content="Another campaign's dragon")
+
+    db = require_db()
+    try:
+        hits = vectordb.keyword_search("dragon", sid, db, collection_name="journal")
+        assert [h["content"] for h in hits] == [
+            "Dragon! Dragon! The dragon lands at the gate",
+            "The dragon circled the tower",
+        ]
+        assert vectordb.keyword_search("drag tow", sid, db, collection_name="journal")[0]["content"] == (
+            "The dragon circled the tower"
+        )
+
+        db.execute("UPDATE journal SET content = 'The wyvern circled the tower' WHERE content LIKE '%circled%'")
+        db.execute("DELETE FROM journal WHERE content LIKE '%lands at the gate%'")
+        db.commit()
+        assert vectordb.keyword_search("dragon", sid, db, collection_name="journal") == []
+        assert len(vectordb.keyword_search("wyvern", sid, db, collection_name="journal")) == 1
+        assert vectordb.keyword_search("!!!", sid, db) == []
+    finally:
+        db.close()